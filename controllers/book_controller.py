@@ -1,5 +1,6 @@
 from database.db_config import SessionLocal
-from sqlalchemy.orm import joinedload
+from database.catalog_version import has_catalog_version
+from sqlalchemy.orm import contains_eager, make_transient_to_detached
 from models.libraries import Library
 from models.book import Book
 from models.author import Author
@@ -7,6 +8,9 @@ from models.publisher import Publisher
 from models.theme import Theme
 from models.location import Location
 from models.collection import Collection
+from controllers import book_filters, lookup_cache
+from controllers.book_rows import BookRow, BookChange
+from sqlalchemy import Integer, String, and_, bindparam, case, cast, false, func, literal, null, or_, select, true, union_all
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -29,70 +33,279 @@ def _apply_year_range(q, col, vmin, vmax):
 
 # -------- MAIN LIST (with relationships preloaded) --------
 
+# Tamaño de página por defecto para la lista paginada (keyset)
+PAGE_SIZE = 200
+
+# Los filtros son un árbol de predicados (controllers/book_filters.py) y las
+# sentencias se construyen una vez por forma de filtro + orden: cada llamada
+# solo aporta los valores (bindparam), sin rehacer la Query ni recompilar.
+
+# tablas relacionadas, en el orden en que se unen (outer join)
+_JOINS = (
+    (Author, Book.author_id == Author.id, Book.author),
+    (Publisher, Book.publisher_id == Publisher.id, Book.publisher),
+    (Theme, Book.theme_id == Theme.id, Book.theme),
+    (Collection, Book.collection_id == Collection.id, Book.collection),
+    (Location, Book.location_id == Location.id, Book.location),
+)
+
+# columnas de BookRow.from_result
+_ROW_COLUMNS = (
+    Book.id, Book.title,
+    Author.name, Publisher.name, Theme.name, Collection.name,
+    Location.id, Location.place, Location.furniture, Location.module, Location.shelf,
+    Book.publication_year, Book.edition_year,
+)
+
+
+def _where(stmt, pred, s):
+    return stmt.where(pred.sql_for(s)) if pred.children else stmt
+
+
+def _books_select(s, pred):
+    """Libros (relaciones precargadas) + filtros, sin ORDER BY."""
+    stmt = select(Book)
+    for _model, _on, rel in _JOINS:
+        stmt = stmt.outerjoin(rel).options(contains_eager(rel))
+    return _where(stmt, pred, s)
+
+
+def _rows_select(s, pred):
+    """Proyección de filas (BookRow) + filtros, sin ORDER BY."""
+    stmt = select(*_ROW_COLUMNS).select_from(Book)
+    for model, on, _rel in _JOINS:
+        stmt = stmt.outerjoin(model, on)
+    return _where(stmt, pred, s)
+
+
+# -------- ORDEN (columnas de la tabla) + KEYSET --------
+
+# Columnas por las que se puede ordenar (mismas claves que el Treeview)
+SORT_COLUMNS = ("title", "author", "publisher", "theme", "location",
+                "collection", "publication_year", "edition_year")
+_NUMERIC_SORT = {"publication_year", "edition_year"}
+
+
+def _location_label_sql():
+    """
+    Misma etiqueta que book_rows.location_label, compuesta en SQL ("-" sin
+    ubicación). Como allí, un texto vacío cuenta como ausente ("-") y el
+    paréntesis va siempre (el módulo ya vale "-" si falta).
+    """
+    def or_dash(col):
+        return case((col.is_(None), "-"), (func.length(col) == 0, "-"), else_=col)
+
+    label = (
+        or_dash(Location.place) + "/" + or_dash(Location.furniture)
+        + " (" + or_dash(Location.module) + ","
+        + func.coalesce(cast(Location.shelf, String), "None") + ")"
+    )
+    return case((Location.id.is_(None), "-"), else_=label)
+
+
+def _sort_keys(s, order_by: str | None, desc: bool) -> list:
+    """
+    Expresiones de ORDER BY [(expr, descendente), ...] + id como desempate.
+    - Texto: NULL se ordena como "-" (igual que se muestra); sin distinguir
+      mayúsculas (MySQL ya lo hace por collation, en SQLite con COLLATE NOCASE,
+      que además deja usar el índice de título para el ORDER BY).
+    - Años: primero (año IS NULL) y luego la columna tal cual: los vacíos van
+      al final en las dos direcciones (como siempre en la tabla) y el índice
+      (library_id, año IS NULL, año) sirve el orden.
+    """
+    order_by = order_by or "title"
+    if order_by not in SORT_COLUMNS:
+        raise ValueError(f"No se puede ordenar por '{order_by}'.")
+
+    if order_by in _NUMERIC_SORT:
+        col = getattr(Book, order_by)
+        keys = [(col.is_(None), False), (col, desc)]
+    else:
+        expr = {
+            "title": Book.title,
+            "author": func.coalesce(Author.name, "-"),
+            "publisher": func.coalesce(Publisher.name, "-"),
+            "theme": func.coalesce(Theme.name, "-"),
+            "collection": func.coalesce(Collection.name, "-"),
+            "location": _location_label_sql(),
+        }[order_by]
+        if s.get_bind().dialect.name == "sqlite":
+            expr = expr.collate("NOCASE")
+        keys = [(expr, desc)]
+
+    return keys + [(Book.id, False)]
+
+
+def _order_and_seek(stmt, keys: list, paged: bool, seek: tuple | None):
+    """
+    ORDER BY por las claves. paged=True: añade las claves como columnas (para
+    el cursor) y LIMIT :limit; seek: WHERE (claves) > (:after_0, ...), con una
+    marca por clave de si el valor del cursor es NULL (esas claves no llevan
+    parámetro: tras un año NULL solo quedan años NULL, que desempata el id).
+    """
+    if paged:
+        stmt = stmt.add_columns(*[e for e, _ in keys]).limit(bindparam("limit", type_=Integer))
+    if seek is not None:
+        def equal(j, expr):
+            return expr.is_(None) if seek[j] else expr == bindparam(f"after_{j}", type_=expr.type)
+
+        def beyond(i, expr, desc):
+            if seek[i]:
+                return false()
+            after = bindparam(f"after_{i}", type_=expr.type)
+            return expr < after if desc else expr > after
+
+        ors = []
+        for i, (expr, desc) in enumerate(keys):
+            eqs = [equal(j, k) for j, (k, _) in enumerate(keys[:i])]
+            ors.append(and_(*eqs, beyond(i, expr, desc)))
+        stmt = stmt.where(or_(*ors))
+    return stmt.order_by(*[(e.desc() if d else e.asc()) for e, d in keys])
+
+
+def _statement(s, kind: str, pred, order_by=None, desc=False, paged=False, seek=None):
+    """
+    (sentencia, nº de claves de orden), cacheada por (tipo, forma del filtro,
+    orden, ¿página?, forma del cursor). Con paged=True las claves van al final
+    de cada fila.
+    """
+    base = {"books": _books_select, "rows": _rows_select}[kind]
+
+    def build():
+        keys = _sort_keys(s, order_by, desc)
+        return _order_and_seek(base(s, pred), keys, paged, seek), len(keys)
+
+    return book_filters.cached_statement(
+        s, (kind, pred.shape(s), order_by or "title", bool(desc), paged, seek), build)
+
+
+def _run_page(s, kind: str, pred, order_by, desc, after: tuple | None, limit: int):
+    """Ejecuta una página keyset: devuelve (filas sin las claves, cursor)."""
+    seek = tuple(v is None for v in after) if after is not None else None
+    stmt, n_keys = _statement(s, kind, pred, order_by, desc, paged=True, seek=seek)
+    params = {**pred.params(s), "limit": limit}
+    if after is not None:
+        params.update({f"after_{i}": v for i, v in enumerate(after) if v is not None})
+    result = s.execute(stmt, params).all()
+    cursor = tuple(result[-1][-n_keys:]) if len(result) == limit else None
+    return [r[:-n_keys] for r in result], cursor
+
+
+def list_books(filters: dict | None = None, library_id: int | None = None,
+               order_by: str | None = None, desc: bool = False):
+    """order_by: una de SORT_COLUMNS (por defecto "title"); desc=True invierte."""
+    pred = book_filters.from_filters(filters, library_id)
 
-def list_books(filters: dict | None = None, library_id: int | None = None):
-    filters = filters or {}
-    
     with SessionLocal() as s:
-        q = (
-            s.query(Book)
-            .options(
-                joinedload(Book.author),
-                joinedload(Book.publisher),
-                joinedload(Book.theme),
-                joinedload(Book.collection),
-                joinedload(Book.location),
-            )
-        )
+        stmt, _ = _statement(s, "books", pred, order_by, desc)
+        return s.execute(stmt, pred.params(s)).scalars().all()
 
-        if library_id is not None:
-            q = q.filter(Book.library_id == library_id)
-
-        # --- Filtro por título ---
-        if t := filters.get("title"):
-            q = q.filter(Book.title.ilike(f"%{t}%"))
-
-        # --- Autor ---
-        if a := filters.get("author_name"):
-            q = q.join(Book.author, isouter=True).filter(
-                Author.name.ilike(f"%{a}%"))
-
-        # --- Editorial ---
-        if p := filters.get("publisher_name"):
-            q = q.join(Book.publisher, isouter=True).filter(
-                Publisher.name.ilike(f"%{p}%"))
-
-        # --- Tema ---
-        if th := filters.get("theme_name"):
-            q = q.join(Book.theme, isouter=True).filter(
-                Theme.name.ilike(f"%{th}%"))
-
-        # --- Colección ---
-        if c := filters.get("collection_name"):
-            q = q.join(Book.collection, isouter=True).filter(
-                Collection.name.ilike(f"%{c}%"))
-
-        # --- Año publicación ---
-        q = _apply_year_exact_or_range(q, Book.publication_year,
-                                       filters.get("pub_year_min"), filters.get("pub_year_max"))
-
-        # --- Año edición ---
-        q = _apply_year_exact_or_range(q, Book.edition_year,
-                                       filters.get("edi_year_min"), filters.get("edi_year_max"))
-
-        # --- Ubicación ---
-        if any(filters.get(k) not in (None, "") for k in ("place", "furniture", "module", "shelf")):
-            q = q.join(Book.location, isouter=True)
-            if v := filters.get("place"):
-                q = q.filter(Location.place.ilike(f"%{v}%"))
-            if v := filters.get("furniture"):
-                q = q.filter(Location.furniture.ilike(f"%{v}%"))
-            if v := filters.get("module"):
-                q = q.filter(Location.module.ilike(f"%{v}%"))
-            if (v := filters.get("shelf")) is not None:
-                q = q.filter(Location.shelf == v)
-
-        return q.order_by(Book.title.asc()).all()
+
+def list_books_page(filters: dict | None = None, library_id: int | None = None,
+                    after: tuple | None = None, limit: int = PAGE_SIZE,
+                    order_by: str | None = None, desc: bool = False):
+    """
+    Una página de libros en el orden pedido (por defecto título), paginada por keyset:
+      - after: cursor devuelto por la página anterior (None = primera)
+      - devuelve (books, cursor); cursor es None cuando no quedan más páginas
+    A diferencia de OFFSET, cada página cuesta lo mismo esté donde esté.
+    """
+    pred = book_filters.from_filters(filters, library_id)
+
+    with SessionLocal() as s:
+        rows, cursor = _run_page(s, "books", pred, order_by, desc, after, limit)
+        return [r[0] for r in rows], cursor
+
+
+# -------- ROW PROJECTION (sin ORM: solo columnas de la tabla) --------
+
+
+def list_book_rows(filters: dict | None = None, library_id: int | None = None,
+                   order_by: str | None = None, desc: bool = False) -> list[BookRow]:
+    """
+    Igual que list_books pero devuelve BookRow (columnas planas, ubicación ya
+    compuesta): no hidrata objetos ORM ni llena el identity map.
+    """
+    pred = book_filters.from_filters(filters, library_id)
+
+    with SessionLocal() as s:
+        stmt, _ = _statement(s, "rows", pred, order_by, desc)
+        return [BookRow.from_result(r) for r in s.execute(stmt, pred.params(s)).all()]
+
+
+def list_book_rows_page(filters: dict | None = None, library_id: int | None = None,
+                        after: tuple | None = None, limit: int = PAGE_SIZE,
+                        order_by: str | None = None, desc: bool = False):
+    """Versión keyset de list_book_rows; misma semántica que list_books_page."""
+    pred = book_filters.from_filters(filters, library_id)
+
+    with SessionLocal() as s:
+        rows, cursor = _run_page(s, "rows", pred, order_by, desc, after, limit)
+    return [BookRow.from_result(r) for r in rows], cursor
+
+
+def book_change(book_id: int, filters: dict | None = None,
+                library_id: int | None = None) -> BookChange:
+    """
+    Estado actual de UN libro tal y como lo vería la tabla con esos filtros.
+    Sirve para parchear la fila tras crear/editar/prestar sin recargar la lista.
+    """
+    pred = book_filters.from_filters(filters, library_id)
+
+    with SessionLocal() as s:
+        stmt = book_filters.cached_statement(
+            s, ("change", pred.shape(s)),
+            lambda: _rows_select(s, pred).where(Book.id == bindparam("book_id")))
+        r = s.execute(stmt, {**pred.params(s), "book_id": book_id}).first()
+    return BookChange(book_id, BookRow.from_result(r) if r is not None else None)
+
+
+def count_books(filters: dict | None = None, library_id: int | None = None) -> int:
+    """Total de libros que cumplen los filtros (sin cargar filas)."""
+    pred = book_filters.from_filters(filters, library_id)
+
+    with SessionLocal() as s:
+        def build():
+            # solo se unen las tablas que usa el filtro
+            stmt = select(func.count(Book.id)).select_from(Book)
+            needed = pred.joins
+            for model, on, _rel in _JOINS:
+                if model in needed:
+                    stmt = stmt.outerjoin(model, on)
+            return _where(stmt, pred, s)
+
+        stmt = book_filters.cached_statement(s, ("count", pred.shape(s)), build)
+        return s.execute(stmt, pred.params(s)).scalar() or 0
+
+
+# nº de libros por (BD, biblioteca) -> (catalog_version, total). Toda alta o
+# baja de libros incrementa el contador (el hook del ORM o bump_catalog_version
+# en las escrituras masivas), así que con la misma versión el total no cambia.
+_totals: dict[tuple, tuple] = {}
+
+
+def catalog_stamp(library_id: int) -> tuple | None:
+    """
+    (catalog_version, nº de libros) de la biblioteca. Si no ha cambiado, un
+    catálogo cargado antes sigue valiendo. None si la BD no tiene el contador
+    (migration/add_catalog_version.sql sin aplicar): entonces no hay forma
+    barata de saberlo y hay que recargar.
+    Con la versión ya vista es una consulta por clave primaria: el COUNT solo
+    se repite cuando la versión cambia.
+    """
+    with SessionLocal() as s:
+        conn = s.connection()
+        if not has_catalog_version(conn):
+            return None
+        version = s.query(Library.catalog_version).filter(Library.id == library_id).scalar()
+        key = (str(conn.engine.url), library_id)
+        cached = _totals.get(key)
+        if cached is not None and cached[0] == version:
+            return cached
+        # misma transacción que la versión: el total corresponde a esa versión
+        total = s.query(func.count(Book.id)).filter(Book.library_id == library_id).scalar()
+        _totals[key] = (version, total)
+        return (version, total)
 
 # -------- GENERAL HELPERS --------
 
@@ -106,21 +319,23 @@ def _get_all(Model, order_attr="id"):
         s.close()
 
 # -------- GET ALL to fill combobox --------
+# Pasan por la caché de proceso (controllers/lookup_cache.py); los create_*
+# de más abajo hacen bump de la tabla que modifican.
 
 
 def get_all_authors():
-    return _get_all(Author, "name")
+    return lookup_cache.get_cached("authors", lambda: _get_all(Author, "name"))
 
 
 def get_all_publishers():
-    return _get_all(Publisher, "name")
+    return lookup_cache.get_cached("publishers", lambda: _get_all(Publisher, "name"))
 
 
 def get_all_themes():
-    return _get_all(Theme, "name")
+    return lookup_cache.get_cached("themes", lambda: _get_all(Theme, "name"))
 
 
-def get_all_collections(library_id: int | None = None):
+def _load_collections(library_id: int | None):
     s = SessionLocal()
     try:
         q = s.query(Collection)
@@ -131,7 +346,12 @@ def get_all_collections(library_id: int | None = None):
         s.close()
 
 
-def get_all_locations(library_id: int | None = None):
+def get_all_collections(library_id: int | None = None):
+    return lookup_cache.get_cached(
+        "collections", lambda: _load_collections(library_id), library_id)
+
+
+def _load_locations(library_id: int | None):
     s = SessionLocal()
     try:
         q = s.query(Location).order_by(Location.id.asc())
@@ -141,6 +361,114 @@ def get_all_locations(library_id: int | None = None):
     finally:
         s.close()
 
+
+def get_all_locations(library_id: int | None = None):
+    return lookup_cache.get_cached(
+        "locations", lambda: _load_locations(library_id), library_id)
+
+# -------- FORMULARIO DE LIBRO (todo en una consulta) --------
+
+class BookFormData:
+    """Lo que necesita FormBook: el libro (en edición) y las listas de los combos."""
+
+    __slots__ = ("book", "authors", "publishers", "themes", "collections", "locations")
+
+    def __init__(self, book, authors, publishers, themes, collections, locations):
+        self.book = book
+        self.authors = authors
+        self.publishers = publishers
+        self.themes = themes
+        self.collections = collections
+        self.locations = locations
+
+
+# columnas comunes de la UNION ALL de load_book_form
+_FORM_COLUMNS = ("id", "name", "furniture", "module", "shelf", "library_id",
+                 "author_id", "publisher_id", "theme_id", "location_id", "collection_id",
+                 "publication_year", "edition_year")
+
+# tabla de la caché -> (modelo, ¿por biblioteca?, columna de orden como en get_all_*)
+_FORM_LOOKUPS = {
+    "authors": (Author, False, "name"),
+    "publishers": (Publisher, False, "name"),
+    "themes": (Theme, False, "name"),
+    "collections": (Collection, True, "name"),
+    "locations": (Location, True, None),  # por id, como _load_locations
+}
+
+
+def _form_branch(kind: str, Model, columns: dict, where, sort_col):
+    cols = [literal(kind).label("kind")]
+    cols += [columns.get(c, null()).label(c) for c in _FORM_COLUMNS]
+    cols.append((sort_col if sort_col is not None else null()).label("sort_name"))
+    return select(*cols).select_from(Model).where(where)
+
+
+def _detached(Model, values: dict):
+    """Instancia como la que devuelve una sesión ya cerrada (detached)."""
+    obj = Model(**values)
+    make_transient_to_detached(obj)
+    return obj
+
+
+def load_book_form(library_id: int, book_id: int | None = None) -> BookFormData:
+    """
+    Libro + autores, editoriales, temas, colecciones y ubicaciones de la
+    biblioteca para FormBook. Lo que ya está en la caché de tablas de
+    referencia no se pide; el resto y el libro van en UNA sola sentencia
+    (UNION ALL) y se guardan en la caché para la próxima vez. Con todo en
+    caché, abrir el formulario de edición es una única consulta (el libro).
+    """
+    lists, stale = {}, {}
+    for table, (Model, per_library, _) in _FORM_LOOKUPS.items():
+        key = library_id if per_library else None
+        items = lookup_cache.peek(table, key)
+        if items is not None:
+            lists[table] = items
+        else:
+            stale[table] = lookup_cache.version(table)  # antes de consultar
+
+    branches = []
+    for table in stale:
+        Model, per_library, order_attr = _FORM_LOOKUPS[table]
+        columns = {c.name: c for c in Model.__table__.c}
+        if Model is Location:
+            columns["name"] = Location.place
+        where = (Model.library_id == library_id) if per_library else true()
+        branches.append(_form_branch(table, Model, columns, where,
+                                     getattr(Model, order_attr) if order_attr else None))
+    if book_id is not None:
+        columns = {c.name: c for c in Book.__table__.c}
+        columns["name"] = Book.title
+        branches.append(_form_branch("book", Book, columns, Book.id == book_id, None))
+
+    rows = []
+    if branches:
+        stmt = union_all(*branches) if len(branches) > 1 else branches[0]
+        stmt = stmt.order_by("kind", "sort_name", "id")
+        with SessionLocal() as s:
+            rows = s.execute(stmt).all()
+
+    loaded = {table: [] for table in stale}
+    book = None
+    for r in rows:
+        values = r._mapping
+        if r.kind == "book":
+            book = _detached(Book, {c.name: values["name" if c.name == "title" else c.name]
+                                    for c in Book.__table__.c})
+            continue
+        Model = _FORM_LOOKUPS[r.kind][0]
+        data = {c.name: values["name" if c.name == "place" else c.name] for c in Model.__table__.c}
+        loaded[r.kind].append(_detached(Model, data))
+
+    for table, items in loaded.items():
+        per_library = _FORM_LOOKUPS[table][1]
+        lookup_cache.store(table, items, library_id if per_library else None, stale[table])
+        lists[table] = list(items)
+
+    return BookFormData(book, lists["authors"], lists["publishers"], lists["themes"],
+                        lists["collections"], lists["locations"])
+
 # -------- CREATE (form “Añadir libro”) --------
 
 
@@ -175,7 +503,8 @@ def create_book(data: dict) -> int:
 # -------- DELETE --------
 
 
-def delete_book(book_id: int) -> None:
+def delete_book(book_id: int) -> BookChange:
+    """Borra el libro y devuelve el cambio (fila eliminada) para la tabla."""
     if not book_id:
         raise ValueError("ID del libro no válido")
     with SessionLocal() as session:
@@ -185,6 +514,7 @@ def delete_book(book_id: int) -> None:
                 raise ValueError("El libro ya no existe (ID no encontrado)")
             session.delete(book)
             session.commit()
+            return BookChange(book_id)
         except SQLAlchemyError as e:
             session.rollback()
             raise ValueError("No se pudo eliminar el libro. " + str(e))
@@ -229,20 +559,6 @@ def get_book(book_id: int) -> Book | None:
         return s.get(Book, book_id)
 
 
-def _apply_year_exact_or_range(q, col, vmin, vmax):
-    # 1) Ambos: rango (con auto-swap)
-    if vmin is not None and vmax is not None:
-        if vmin > vmax:
-            vmin, vmax = vmax, vmin
-        return q.filter(col.between(vmin, vmax))
-    # 2) Solo uno: igualdad exacta
-    if vmin is not None:
-        return q.filter(col == vmin)
-    if vmax is not None:
-        return q.filter(col == vmax)
-    # 3) Ninguno: sin filtro
-    return q
-
 # -------- CREATE: helpers for "+" modals --------
 
 def _norm(s: str | None) -> str:
@@ -264,6 +580,7 @@ def create_author(name: str) -> int:
         s.add(obj)
         s.commit()
         s.refresh(obj)
+        lookup_cache.bump("authors")
         return obj.id
     except Exception:
         s.rollback()
@@ -287,6 +604,7 @@ def create_publisher(name: str) -> int:
         s.add(obj)
         s.commit()
         s.refresh(obj)
+        lookup_cache.bump("publishers")
         return obj.id
     except Exception:
         s.rollback()
@@ -310,6 +628,7 @@ def create_theme(name: str) -> int:
         s.add(obj)
         s.commit()
         s.refresh(obj)
+        lookup_cache.bump("themes")
         return obj.id
     except Exception:
         s.rollback()
@@ -341,6 +660,7 @@ def create_collection(name: str, library_id: int) -> int:
         s.add(obj)
         s.commit()
         s.refresh(obj)
+        lookup_cache.bump("collections")
         return obj.id
     except Exception:
         s.rollback()
@@ -394,6 +714,7 @@ def create_location(
         s.add(obj)
         s.commit()
         s.refresh(obj)
+        lookup_cache.bump("locations")
         return obj.id
     except Exception:
         s.rollback()
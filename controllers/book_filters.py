@@ -0,0 +1,299 @@
+# controllers/book_filters.py
+"""
+Filtros de libros como árbol de predicados.
+
+from_filters(filtros, library_id) convierte el dict de FilterWindow en un
+árbol pequeño (All de Contains / YearIs / ShelfIs / LibraryIs) que sirve para
+dos cosas:
+
+  - SQL: pred.sql_for(session) devuelve la cláusula con bindparam() en vez
+    de valores y pred.params(session) los valores. La forma (shape) del árbol
+    -qué campos filtran, no con qué texto- más el orden y el motor identifican
+    la sentencia: cached_statement() la construye una vez por forma y las
+    siguientes llamadas solo cambian los parámetros (sin rehacer la Query ni
+    recompilar el SQL).
+  - Memoria: pred.narrow(index, posiciones) evalúa el mismo árbol sobre las
+    filas ya cargadas de un CatalogIndex (en vectorial), y pred.local_ok()
+    dice si el resultado sería exactamente el de la BD.
+
+Semántica (la de siempre): texto = col ILIKE '%texto%' (acelerado con el
+índice de texto completo si existe, ver fulltext.py), años = exacto si solo
+viene uno, rango si vienen los dos, y balda = igualdad.
+"""
+import abc
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import and_, bindparam, true
+
+from controllers import fulltext
+from models.author import Author
+from models.book import Book
+from models.collection import Collection
+from models.location import Location
+from models.publisher import Publisher
+from models.theme import Theme
+
+# campo -> (columna, tabla que hay que unir o None si es de books)
+_TEXT_FIELDS = {
+    "title": (Book.title, None),
+    "author_name": (Author.name, Author),
+    "publisher_name": (Publisher.name, Publisher),
+    "theme_name": (Theme.name, Theme),
+    "collection_name": (Collection.name, Collection),
+    "place": (Location.place, Location),
+    "furniture": (Location.furniture, Location),
+    "module": (Location.module, Location),
+}
+_YEAR_FIELDS = {"pub_year": "publication_year", "edi_year": "edition_year"}
+
+
+# -------- NODOS --------
+
+class Predicate(abc.ABC):
+    """Nodo del árbol. shape() no incluye valores: dos filtros con la misma forma comparten SQL."""
+
+    __slots__ = ()
+    joins: tuple = ()  # tablas que hay que unir a books (outer join)
+
+    @abc.abstractmethod
+    def shape(self, session) -> tuple:
+        """Qué filtra el nodo, sin los valores (parte de la clave de cached_statement)."""
+
+    @abc.abstractmethod
+    def sql_for(self, session):
+        """Cláusula WHERE con bindparam(); los valores los da params()."""
+
+    def params(self, session) -> dict:
+        return {}
+
+    @abc.abstractmethod
+    def narrow(self, index, positions):
+        """
+        En memoria: las de positions (filas de un CatalogIndex, array de
+        NumPy) que cumplen el nodo, con la misma semántica que sql_for.
+        """
+
+    cost = 0  # All evalúa primero los nodos baratos: los caros ven menos filas
+
+    def local_ok(self) -> bool:
+        """¿Se puede evaluar en memoria con exactamente el mismo resultado?"""
+        return True
+
+
+class Contains(Predicate):
+    """campo ILIKE '%texto%'."""
+
+    __slots__ = ("field", "value")
+
+    def __init__(self, field: str, value: str):
+        self.field = field
+        self.value = value
+
+    @property
+    def joins(self):
+        tbl = _TEXT_FIELDS[self.field][1]
+        return (tbl,) if tbl is not None else ()
+
+    def _fulltext(self, session) -> bool:
+        return fulltext.can_match(session, _TEXT_FIELDS[self.field][0], self.value)
+
+    def shape(self, session):
+        return ("contains", self.field, self._fulltext(session))
+
+    def sql_for(self, session):
+        col = _TEXT_FIELDS[self.field][0]
+        like = col.ilike(bindparam(f"{self.field}_like"))
+        if not self._fulltext(session):
+            return like
+        return fulltext.match_expr(session, col, bindparam(f"{self.field}_match")) & like
+
+    def params(self, session):
+        out = {f"{self.field}_like": f"%{self.value}%"}
+        if self._fulltext(session):
+            out[f"{self.field}_match"] = fulltext.phrase(self.value)
+        return out
+
+    @property
+    def cost(self):
+        return 1 if self.field == "title" else 0  # un texto por fila, no por valor distinto
+
+    def narrow(self, index, positions):
+        if self.field == "title":
+            return index.title_positions(positions, self.value)
+        return positions[index.text_mask(self.field, self.value)[positions]]
+
+    def local_ok(self):
+        # comodines de LIKE o la barra de escape: mejor que lo resuelva la BD
+        return not any(ch in self.value for ch in "%_\\")
+
+
+class YearIs(Predicate):
+    """Año exacto (solo vmin o solo vmax) o rango (los dos, se intercambian si vienen cruzados)."""
+
+    __slots__ = ("field", "vmin", "vmax")
+
+    def __init__(self, field: str, vmin: int | None, vmax: int | None):
+        self.field = field  # "publication_year" | "edition_year"
+        if vmin is not None and vmax is not None and vmin > vmax:
+            vmin, vmax = vmax, vmin
+        self.vmin = vmin
+        self.vmax = vmax
+
+    def _is_range(self):
+        return self.vmin is not None and self.vmax is not None
+
+    def shape(self, session):
+        return ("year", self.field, self._is_range())
+
+    def sql_for(self, session):
+        col = getattr(Book, self.field)
+        if self._is_range():
+            return col.between(bindparam(f"{self.field}_min"), bindparam(f"{self.field}_max"))
+        return col == bindparam(f"{self.field}_eq")
+
+    def params(self, session):
+        if self._is_range():
+            return {f"{self.field}_min": self.vmin, f"{self.field}_max": self.vmax}
+        return {f"{self.field}_eq": self.vmin if self.vmin is not None else self.vmax}
+
+    def narrow(self, index, positions):
+        return positions[index.year_mask(self.field, self.vmin, self.vmax)[positions]]
+
+
+class ShelfIs(Predicate):
+    """Balda exacta de la ubicación."""
+
+    __slots__ = ("value",)
+    joins = (Location,)
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def shape(self, session):
+        return ("shelf",)
+
+    def sql_for(self, session):
+        return Location.shelf == bindparam("shelf")
+
+    def params(self, session):
+        return {"shelf": self.value}
+
+    def narrow(self, index, positions):
+        return positions[index.shelf_mask(self.value)[positions]]
+
+
+class LibraryIs(Predicate):
+    """Libros de una biblioteca."""
+
+    __slots__ = ("library_id",)
+
+    def __init__(self, library_id: int):
+        self.library_id = library_id
+
+    def shape(self, session):
+        return ("library",)
+
+    def sql_for(self, session):
+        return Book.library_id == bindparam("library_id")
+
+    def params(self, session):
+        return {"library_id": self.library_id}
+
+    def narrow(self, index, positions):
+        # un CatalogIndex es de una sola biblioteca
+        return positions if index.library_id == self.library_id else positions[:0]
+
+
+class All(Predicate):
+    """Conjunción (AND) de predicados; vacía = sin filtro."""
+
+    __slots__ = ("children",)
+
+    def __init__(self, children):
+        self.children = tuple(children)
+
+    @property
+    def joins(self):
+        seen = []
+        for child in self.children:
+            for tbl in child.joins:
+                if tbl not in seen:
+                    seen.append(tbl)
+        return tuple(seen)
+
+    def shape(self, session):
+        return tuple(child.shape(session) for child in self.children)
+
+    def sql_for(self, session):
+        if not self.children:
+            return true()
+        return and_(*[child.sql_for(session) for child in self.children])
+
+    def params(self, session):
+        out = {}
+        for child in self.children:
+            out.update(child.params(session))
+        return out
+
+    def narrow(self, index, positions):
+        for child in sorted(self.children, key=lambda c: c.cost):
+            if not len(positions):
+                break
+            positions = child.narrow(index, positions)
+        return positions
+
+    def local_ok(self):
+        return all(child.local_ok() for child in self.children)
+
+
+# -------- DICT DE FILTROS -> ÁRBOL --------
+
+def from_filters(filters: dict | None, library_id: int | None = None) -> All:
+    """Árbol equivalente al dict de filtros (mismas claves que FilterWindow)."""
+    filters = filters or {}
+    nodes: list[Predicate] = []
+    if library_id is not None:
+        nodes.append(LibraryIs(library_id))
+    for field in ("title", "author_name", "publisher_name", "theme_name", "collection_name"):
+        if v := filters.get(field):
+            nodes.append(Contains(field, v))
+    for key, field in _YEAR_FIELDS.items():
+        vmin, vmax = filters.get(f"{key}_min"), filters.get(f"{key}_max")
+        if vmin is not None or vmax is not None:
+            nodes.append(YearIs(field, vmin, vmax))
+    for field in ("place", "furniture", "module"):
+        if v := filters.get(field):
+            nodes.append(Contains(field, v))
+    if (v := filters.get("shelf")) is not None:
+        nodes.append(ShelfIs(v))
+    return All(nodes)
+
+
+# -------- CACHÉ DE SENTENCIAS --------
+
+_STATEMENT_CACHE_SIZE = 256
+_statements: OrderedDict[tuple, object] = OrderedDict()
+_statements_lock = threading.Lock()
+
+
+def cached_statement(session, key: tuple, build):
+    """
+    Sentencia (o lo que devuelva build(), p. ej. sentencia + datos para leer
+    sus filas) para key, que ya debe incluir la forma del filtro. build() solo
+    se llama la primera vez; el motor forma parte de la clave porque el SQL
+    generado depende del dialecto y de los índices de texto disponibles.
+    """
+    key = (str(session.get_bind().url), *key)
+    with _statements_lock:
+        stmt = _statements.get(key)
+        if stmt is not None:
+            _statements.move_to_end(key)
+            return stmt
+    stmt = build()
+    with _statements_lock:
+        _statements[key] = stmt
+        while len(_statements) > _STATEMENT_CACHE_SIZE:
+            _statements.popitem(last=False)
+    return stmt
+
@@ -0,0 +1,91 @@
+# controllers/book_rows.py
+"""
+Filas ligeras para la tabla principal: solo las columnas que se muestran,
+sin objetos ORM ni identity map detrás.
+"""
+from functools import lru_cache
+from sys import intern
+
+
+@lru_cache(maxsize=8192)
+def location_label(place, furniture, module, shelf) -> str:
+    """
+    Mismo texto de ubicación que pintaba MainWindow a partir de Book.location.
+    Cacheada: todas las filas de una misma balda comparten el mismo str.
+    """
+    place = place or "-"
+    furniture = furniture or "-"
+    module = module or "-"
+    # el módulo ya vale "-" si falta, así que el paréntesis va siempre
+    # (book_controller._location_label_sql compone lo mismo en SQL)
+    return f"{place}/{furniture} ({module},{shelf})"
+
+
+def _i(s):
+    return intern(s) if s is not None else None
+
+
+class BookRow:
+    """Fila de libro proyectada (lo que necesita la tabla, nada más)."""
+
+    __slots__ = ("id", "title", "author", "publisher", "theme", "collection",
+                 "location_id", "location", "publication_year", "edition_year")
+
+    def __init__(self, id, title, author, publisher, theme, collection,
+                 location_id, location, publication_year, edition_year):
+        self.id = id
+        self.title = title
+        self.author = author
+        self.publisher = publisher
+        self.theme = theme
+        self.collection = collection
+        self.location_id = location_id
+        self.location = location          # etiqueta ya compuesta (o None)
+        self.publication_year = publication_year
+        self.edition_year = edition_year
+
+    @classmethod
+    def from_result(cls, r):
+        """r = (id, title, author, publisher, theme, collection,
+                location_id, place, furniture, module, shelf, pub_year, edi_year)"""
+        loc = location_label(r[7], r[8], r[9], r[10]) if r[6] is not None else None
+        # los nombres se repiten muchísimo entre filas: intern() evita una copia por fila
+        return cls(r[0], r[1], _i(r[2]), _i(r[3]), _i(r[4]), _i(r[5]), r[6], loc, r[11], r[12])
+
+    def display_values(self) -> tuple:
+        """Valores para el Treeview de MainWindow (mismo formato de siempre)."""
+        return (
+            self.title,
+            self.author or "-",
+            self.publisher or "-",
+            self.theme or "-",
+            self.location or "-",
+            self.collection or "-",
+            self.publication_year if self.publication_year is not None else "",
+            self.edition_year if self.edition_year is not None else "",
+            "✏️  🗑️  📤",
+        )
+
+    def __repr__(self):
+        return f"<BookRow(id={self.id}, title='{self.title}')>"
+
+
+class BookChange:
+    """
+    Cambio de un libro para parchear la tabla sin recargarla:
+      - row = BookRow con los valores nuevos
+      - row = None -> el libro ya no está (borrado o ya no cumple los filtros)
+    """
+
+    __slots__ = ("book_id", "row")
+
+    def __init__(self, book_id: int, row: BookRow | None = None):
+        self.book_id = book_id
+        self.row = row
+
+    @property
+    def removed(self) -> bool:
+        return self.row is None
+
+    def __repr__(self):
+        return f"<BookChange(book_id={self.book_id}, removed={self.removed})>"
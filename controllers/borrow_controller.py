@@ -1,7 +1,9 @@
 from datetime import date
+from sqlalchemy import case, func
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import contains_eager, joinedload
 from database.db_config import SessionLocal
+from models.book import Book
 from models.borrow_book import BorrowBook
 
 
@@ -26,10 +28,13 @@ def create_borrow(book_id: int, date_of_loan: date, name_person: str):
 def list_loans(library_id: int):
     session = SessionLocal()
     try:
+        # join (no has()): se recorren los libros de la biblioteca y sus
+        # préstamos salen por ix_borrow_books_book_returned_date
         q = (
             session.query(BorrowBook)
-            .options(joinedload(BorrowBook.book))
-            .filter(BorrowBook.book.has(library_id=library_id))
+            .join(BorrowBook.book)
+            .options(contains_eager(BorrowBook.book))
+            .filter(Book.library_id == library_id)
             .order_by(
                 BorrowBook.returned.asc(),      # pendientes primero
                 BorrowBook.date_of_loan.desc(),
@@ -41,6 +46,24 @@ def list_loans(library_id: int):
         session.close()
 
 
+def loan_summary(library_id: int) -> dict:
+    """{"pending": préstamos sin devolver, "total": préstamos} de la biblioteca."""
+    session = SessionLocal()
+    try:
+        total, pending = (
+            session.query(
+                func.count(BorrowBook.id),
+                func.coalesce(func.sum(case((BorrowBook.returned.is_(False), 1), else_=0)), 0),
+            )
+            .join(BorrowBook.book)
+            .filter(Book.library_id == library_id)
+            .one()
+        )
+        return {"pending": int(pending), "total": int(total)}
+    finally:
+        session.close()
+
+
 def mark_returned(borrow_id: int, library_id: int):
     """
     Marca como devuelto SOLO si el préstamo pertenece a la biblioteca actual.
@@ -0,0 +1,284 @@
+# controllers/catalog_index.py
+"""
+Catálogo columnar en memoria (NumPy) para filtrar sin ir a la BD.
+
+MainWindow lo construye una vez por biblioteca (en segundo plano) y, mientras
+la biblioteca no cambie (catalog_stamp), resuelve los filtros de FilterWindow
+aquí en milisegundos. Si NumPy no está instalado o el filtro no se puede
+reproducir exactamente, se usa la consulta SQL de siempre.
+
+Columnas:
+  - ids, años de publicación/edición, balda: arrays de NumPy
+  - autor, editorial, tema, colección, ubicación: códigos int32 sobre la
+    lista de valores distintos (-1 = sin valor). Un filtro de texto se evalúa
+    una vez por valor distinto y luego se expande con una indexación.
+  - títulos: lista de str (se comparan solo las filas que pasan el resto)
+
+Semántica: la de controllers/book_filters (col ILIKE '%texto%' y años
+exacto-o-rango de YearIs). Lo único que depende del motor es cómo compara
+ILIKE mayúsculas y acentos (ver _FOLDS): en SQLite se reproduce tal cual; en
+MySQL el plegado es una aproximación de la collation, así que los textos no
+ASCII los resuelve siempre la BD (supports).
+"""
+import re
+import unicodedata
+
+try:
+    import numpy as np
+except ImportError:  # sin NumPy: siempre SQL
+    np = None
+
+from controllers.book_rows import BookRow, location_label
+
+AVAILABLE = np is not None
+
+_NO_YEAR = -(2**31)  # año vacío (NULL) en los arrays de años y balda
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+_COMBINING = re.compile("[\u0300-\u036f]")  # tildes, diéresis... tras NFD
+
+
+def _fold_ascii(s: str) -> str:
+    # SQLite: ILIKE = lower(a) LIKE lower(b), y lower() solo toca ASCII
+    return s.lower() if s.isascii() else s.translate(_ASCII_LOWER)
+
+
+def fold_ci(s: str) -> str:
+    """Sin mayúsculas ni acentos ("García" -> "garcia"), para buscar en listas."""
+    if s.isascii():
+        return s.lower()
+    return _COMBINING.sub("", unicodedata.normalize("NFD", s)).casefold()
+
+
+def _fold_mysql(s: str) -> str:
+    # utf8mb4_*_ci sin mayúsculas ni tildes; lower() y no casefold(): LIKE
+    # compara letra a letra ("ß" no es "ss"). Ligaduras, anchos completos...
+    # la collation los iguala y esto no: por eso supports() deja a la BD los
+    # textos no ASCII
+    if s.isascii():
+        return s.lower()
+    return _COMBINING.sub("", unicodedata.normalize("NFD", s)).lower()
+
+
+_FOLDS = {"sqlite": _fold_ascii, "mysql": _fold_mysql, "mariadb": _fold_mysql}
+_APPROXIMATE = {"mysql", "mariadb"}  # motores cuyo plegado no es exacto fuera de ASCII
+
+
+def fold_for(dialect: str):
+    """Función que pliega un texto como lo compara ILIKE en ese motor."""
+    return _FOLDS.get(dialect, str.lower)
+
+# filtros de texto -> columna codificada
+_TEXT_FILTERS = {
+    "author_name": "author",
+    "publisher_name": "publisher",
+    "theme_name": "theme",
+    "collection_name": "collection",
+}
+_LOCATION_TEXT = {"place": 0, "furniture": 1, "module": 2}  # posición en la ubicación
+_TEXT_KEYS = ("title", *_TEXT_FILTERS, *_LOCATION_TEXT)
+
+
+class _Encoded:
+    """Columna de texto codificada: codes[i] indexa values (-1 = NULL)."""
+
+    __slots__ = ("values", "folded", "codes")
+
+    def __init__(self, items, fold=None):
+        index: dict = {}
+        self.codes = np.fromiter(
+            (-1 if v is None else index.setdefault(v, len(index)) for v in items),
+            dtype=np.int32, count=len(items),
+        )
+        self.values = list(index)
+        self.folded = [fold(v) for v in self.values] if fold else None
+
+    def contains(self, needle: str) -> "np.ndarray":
+        """Filas cuyo valor (plegado) contiene needle."""
+        return self.mask([needle in v for v in self.folded])
+
+    def mask(self, hit_values) -> "np.ndarray":
+        """Filas cuyo valor está en hit_values (array bool por valor distinto)."""
+        lut = np.append(np.asarray(hit_values, dtype=bool), False)  # -1 -> último (False)
+        return lut[self.codes]
+
+
+def _years(items) -> "np.ndarray":
+    return np.fromiter((_NO_YEAR if v is None else v for v in items), dtype=np.int32, count=len(items))
+
+
+def _year_mask(col, vmin, vmax):
+    """book_filters.YearIs en vectorial (None = sin filtro)."""
+    if vmin is not None and vmax is not None:
+        if vmin > vmax:
+            vmin, vmax = vmax, vmin
+        return (col >= vmin) & (col <= vmax) & (col != _NO_YEAR)
+    if vmin is not None:
+        return col == vmin
+    if vmax is not None:
+        return col == vmax
+    return None
+
+
+class CatalogIndex:
+    """Catálogo de una biblioteca, en el orden (order_by, desc) con el que se leyó."""
+
+    def __init__(self, library_id: int, order: tuple, stamp, dialect: str,
+                 rows: list[BookRow], locations: dict):
+        """
+        rows: BookRow de la biblioteca (list_book_rows, ya ordenadas)
+        locations: {location_id: (place, furniture, module, shelf)}
+        """
+        self.library_id = library_id
+        self.order = order
+        self.stamp = stamp
+        self.dialect = dialect
+        self._fold = fold_for(dialect)
+
+        n = len(rows)
+        self.ids = np.fromiter((r.id for r in rows), dtype=np.int64, count=n)
+        self.titles = [r.title for r in rows]
+        fold = self._fold
+        self.author = _Encoded([r.author for r in rows], fold)
+        self.publisher = _Encoded([r.publisher for r in rows], fold)
+        self.theme = _Encoded([r.theme for r in rows], fold)
+        self.collection = _Encoded([r.collection for r in rows], fold)
+        self.location = _Encoded([r.location_id for r in rows])
+        self.publication_year = _years([r.publication_year for r in rows])
+        self.edition_year = _years([r.edition_year for r in rows])
+
+        parts = [locations.get(loc_id, (None, None, None, None)) for loc_id in self.location.values]
+        self._location_parts = parts
+        shelves = np.array([_NO_YEAR if p[3] is None else p[3] for p in parts] + [_NO_YEAR], dtype=np.int32)
+        self.shelf = shelves[self.location.codes]
+        self._folded_parts = [tuple(fold(x) if x is not None else None for x in p[:3]) for p in parts]
+
+        # se pliegan aquí (en segundo plano) para que el primer filtro no lo pague
+        self._folded_titles = [fold(t) for t in self.titles]
+        self._last_title = None  # (texto plegado, posiciones que lo contienen)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.ids, self.publication_year, self.edition_year, self.shelf,
+                  self.author.codes, self.publisher.codes, self.theme.codes,
+                  self.collection.codes, self.location.codes)
+        return sum(a.nbytes for a in arrays) + sum(2 * len(t) + 100 for t in self.titles)
+
+    # ----- filtros -----
+
+    @staticmethod
+    def supports(filters: dict, dialect: str | None = None) -> bool:
+        """
+        ¿Se puede resolver aquí con el mismo resultado que en SQL? No si el
+        texto trae comodines de LIKE (% _) o la barra de escape, ni, en MySQL,
+        si no es ASCII (ver _fold_mysql).
+        """
+        from controllers.book_filters import from_filters
+        if dialect in _APPROXIMATE and not all(str(filters[k]).isascii() for k in _TEXT_KEYS if filters.get(k)):
+            return False
+        return from_filters(filters).local_ok()
+
+    def filter(self, filters: dict) -> "np.ndarray":
+        """
+        Posiciones (en el orden del catálogo) de los libros que cumplen filters:
+        el árbol de book_filters (el mismo que va a SQL) evaluado sobre estas columnas.
+        """
+        from controllers.book_filters import from_filters
+        pred = from_filters(filters, self.library_id)
+        return pred.narrow(self, np.arange(len(self)))
+
+    # lo que usan los nodos de book_filters (narrow): máscaras sobre todo el catálogo
+
+    def text_mask(self, field: str, value: str) -> "np.ndarray":
+        """Filas cuyo campo de texto (salvo el título) contiene value, como ILIKE."""
+        needle = self._fold(value)
+        if field in _TEXT_FILTERS:
+            return getattr(self, _TEXT_FILTERS[field]).contains(needle)
+        pos = _LOCATION_TEXT[field]
+        return self.location.mask([p[pos] is not None and needle in p[pos] for p in self._folded_parts])
+
+    def year_mask(self, field: str, vmin: int | None, vmax: int | None) -> "np.ndarray":
+        """Filas con el año (publication_year / edition_year) exacto o en el rango."""
+        m = _year_mask(getattr(self, field), vmin, vmax)
+        return np.ones(len(self), dtype=bool) if m is None else m
+
+    def shelf_mask(self, value: int) -> "np.ndarray":
+        return (self.shelf == value) & (self.shelf != _NO_YEAR)
+
+    def title_positions(self, positions, value: str):
+        """Las de positions cuyo título contiene value (se recorren solo esas)."""
+        return self._filter_titles(positions, self._fold(value))
+
+    def _filter_titles(self, positions, needle: str):
+        """Títulos de positions que contienen needle (lo más caro: va al final)."""
+        titles = self._folded_titles
+
+        # tecleando: si el texto anterior está contenido en el nuevo, solo
+        # pueden cumplir los que ya lo contenían (_last_title es sobre todo el catálogo)
+        full = len(positions) == len(self)
+        last = self._last_title
+        if last is not None and last[0] in needle:
+            positions = last[1] if full else np.intersect1d(positions, last[1], assume_unique=True)
+
+        if len(positions) == len(titles):
+            found = [needle in t for t in titles]
+        else:
+            found = [needle in titles[i] for i in positions.tolist()]
+        hits = positions[np.array(found, dtype=bool)]
+        if full:
+            self._last_title = (needle, hits)
+        return hits
+
+    def first_page(self, filters: dict, limit: int | None):
+        """(posiciones que cumplen, BookRow de las primeras limit); limit=None -> todas."""
+        hits = self.filter(filters)
+        return hits, self.rows_at(hits if limit is None else hits[:limit])
+
+    # ----- filas -----
+
+    def rows_at(self, positions) -> list[BookRow]:
+        """BookRow (lo que pinta MainWindow) de esas posiciones."""
+        out = []
+        a, p, th, c, loc = (self.author, self.publisher, self.theme, self.collection, self.location)
+        for i in positions:
+            code = loc.codes[i]
+            if code >= 0:
+                place, furniture, module, shelf = self._location_parts[code]
+                loc_id, label = loc.values[code], location_label(place, furniture, module, shelf)
+            else:
+                loc_id = label = None
+            pub, edi = self.publication_year[i], self.edition_year[i]
+            out.append(BookRow(
+                int(self.ids[i]), self.titles[i],
+                _value(a, i), _value(p, i), _value(th, i), _value(c, i),
+                loc_id, label,
+                None if pub == _NO_YEAR else int(pub),
+                None if edi == _NO_YEAR else int(edi),
+            ))
+        return out
+
+
+def _value(col: _Encoded, i):
+    code = col.codes[i]
+    return col.values[code] if code >= 0 else None
+
+
+def load_catalog_index(library_id: int, order_by: str | None = None,
+                       desc: bool = False) -> CatalogIndex | None:
+    """Lee la biblioteca entera de la BD y construye su CatalogIndex (None sin NumPy)."""
+    if not AVAILABLE:
+        return None
+    from database.db_config import get_engine
+    from controllers.book_controller import catalog_stamp, get_all_locations, list_book_rows
+
+    stamp = catalog_stamp(library_id)  # antes que las filas, como load_first_page
+    rows = list_book_rows(None, library_id=library_id, order_by=order_by, desc=desc)
+    locations = {loc.id: (loc.place, loc.furniture, loc.module, loc.shelf)
+                 for loc in get_all_locations(library_id)}
+    return CatalogIndex(library_id, (order_by, desc), stamp, get_engine().dialect.name,
+                        rows, locations)
@@ -0,0 +1,106 @@
+# controllers/fulltext.py
+"""
+Búsqueda de texto completo para los filtros de list_books.
+
+- MySQL:  índices FULLTEXT con parser ngram  -> MATCH(col) AGAINST('"x"' IN BOOLEAN MODE)
+          (creados sin stopwords: ver migration/add_fulltext_indexes.sql)
+- SQLite: tablas virtuales FTS5 (tokenizer trigram) -> <tabla>_fts MATCH '"x"'
+
+El índice solo sirve para acotar candidatos; el ILIKE original se mantiene
+encima, así que el resultado es exactamente el mismo que sin índice.
+Si el índice no existe (o el texto es demasiado corto para él) se usa solo
+el ILIKE de siempre. En MySQL cuenta cada palabra: ngram descarta las más
+cortas que ngram_token_size, y una frase como "a b" no encontraría nada
+aunque el ILIKE sí.
+"""
+import re
+
+from sqlalchemy import column, literal_column, select, table, text
+
+# Longitud mínima de búsqueda que puede resolver cada índice
+#   - ngram de MySQL: ngram_token_size (2 por defecto)
+#   - trigram de FTS5: 3 caracteres
+_MIN_LEN = {"mysql": 2, "mariadb": 2, "sqlite": 3}
+
+# Separadores de palabra para ngram (espacios y puntuación)
+_WORD_SPLIT = re.compile(r"[\W_]+")
+
+# Caché por engine: {url: frozenset((tabla, columna), ...)}
+_available: dict[str, frozenset] = {}
+
+
+def reset_fulltext_cache():
+    """Olvida qué índices hay (p. ej. tras aplicar la migración en caliente)."""
+    _available.clear()
+
+
+def _fulltext_columns(session) -> frozenset:
+    bind = session.get_bind()
+    key = str(bind.url)
+    if key in _available:
+        return _available[key]
+
+    dialect = bind.dialect.name
+    found = set()
+    try:
+        if dialect in ("mysql", "mariadb"):
+            rows = session.execute(text(
+                "SELECT DISTINCT table_name, column_name FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND index_type = 'FULLTEXT'"
+            )).fetchall()
+            found = {(str(t).lower(), str(c).lower()) for t, c in rows}
+        elif dialect == "sqlite":
+            rows = session.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%\\_fts' ESCAPE '\\'"
+            )).fetchall()
+            # books_fts indexa books.title; el resto de tablas indexan name
+            for (name,) in rows:
+                base = name[:-len("_fts")]
+                found.add((base, "title" if base == "books" else "name"))
+    except Exception:
+        # sin permisos / tabla de sistema inaccesible -> sin índice, ILIKE
+        found = set()
+
+    _available[key] = frozenset(found)
+    return _available[key]
+
+
+def phrase(value: str) -> str | None:
+    """Frase entrecomillada para MATCH; None si el texto no se puede indexar."""
+    if '"' in value or not value.strip():
+        return None
+    return f'"{value}"'
+
+
+def can_match(session, col, value: str) -> bool:
+    """¿Hay índice para col y value se puede buscar en él?"""
+    dialect = session.get_bind().dialect.name
+    if dialect not in ("mysql", "mariadb", "sqlite"):
+        return False
+    if (col.table.name, col.name) not in _fulltext_columns(session):
+        return False
+    min_len = _MIN_LEN.get(dialect, 3)
+    if len(value.strip()) < min_len:
+        return False
+    if dialect in ("mysql", "mariadb"):
+        # trigram de FTS5 indexa el texto entero (espacios incluidos); ngram
+        # trocea por palabras y se salta las cortas
+        if any(len(w) < min_len for w in _WORD_SPLIT.split(value) if w):
+            return False
+    return phrase(value) is not None
+
+
+def match_expr(session, col, query):
+    """
+    Cláusula del índice para col. query es la frase ya entrecomillada
+    (phrase()) o un bindparam() que la recibirá al ejecutar.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        # SQLAlchemy compila .match() como MATCH (col) AGAINST (:q IN BOOLEAN MODE)
+        return col.match(query)
+
+    tbl = col.table.name
+    fts = table(f"{tbl}_fts", column("rowid"))
+    ids = select(fts.c.rowid).where(literal_column(f"{tbl}_fts").op("MATCH")(query))
+    return col.table.c.id.in_(ids)
@@ -0,0 +1,85 @@
+# controllers/lookup_cache.py
+"""
+Caché de proceso para las tablas de referencia (autores, editoriales, temas,
+colecciones y ubicaciones).
+
+Cada tabla tiene un número de versión. Los create_* de book_controller lo
+incrementan (bump) al insertar una fila nueva, y eso invalida solo las
+entradas de esa tabla; el resto sigue sirviéndose sin ir a la BD.
+"""
+import threading
+
+_lock = threading.Lock()
+_versions: dict[str, int] = {}
+# (tabla, library_id) -> (versión con la que se cargó, items)
+_entries: dict[tuple[str, int | None], tuple[int, list]] = {}
+
+
+def version(table: str) -> int:
+    with _lock:
+        return _versions.get(table, 0)
+
+
+def bump(table: str) -> int:
+    """Marca la tabla como modificada; la próxima lectura recarga de la BD."""
+    with _lock:
+        _versions[table] = _versions.get(table, 0) + 1
+        return _versions[table]
+
+
+def invalidate(table: str | None = None):
+    """Vacía la caché entera o solo la de una tabla."""
+    with _lock:
+        if table is None:
+            _entries.clear()
+        else:
+            for key in [k for k in _entries if k[0] == table]:
+                del _entries[key]
+
+
+def get_cached(table: str, loader, library_id: int | None = None) -> list:
+    """
+    Devuelve los items de la tabla (copia de la lista cacheada).
+    loader() solo se llama si no hay entrada o su versión quedó vieja.
+    """
+    key = (table, library_id)
+    with _lock:
+        current = _versions.get(table, 0)
+        hit = _entries.get(key)
+        if hit is not None and hit[0] == current:
+            return list(hit[1])
+
+    items = list(loader())
+
+    with _lock:
+        # si alguien hizo bump mientras cargábamos, no guardamos datos viejos
+        if _versions.get(table, 0) == current:
+            _entries[key] = (current, items)
+    return list(items)
+
+
+def peek(table: str, library_id: int | None = None) -> list | None:
+    """Copia de los items si están en caché y al día; None si habría que cargarlos."""
+    with _lock:
+        hit = _entries.get((table, library_id))
+        if hit is not None and hit[0] == _versions.get(table, 0):
+            return list(hit[1])
+        return None
+
+
+def store(table: str, items: list, library_id: int | None = None, loaded_version: int | None = None):
+    """
+    Guarda items cargados por otra vía (p. ej. varias tablas en una sola
+    consulta). loaded_version: version(table) leída ANTES de la consulta; si
+    hubo un bump entre medias no se guarda (mismo criterio que get_cached).
+    """
+    with _lock:
+        current = _versions.get(table, 0)
+        if loaded_version is None or loaded_version == current:
+            _entries[(table, library_id)] = (current, list(items))
+
+
+def is_fresh(table: str, library_id: int | None = None) -> bool:
+    with _lock:
+        hit = _entries.get((table, library_id))
+        return hit is not None and hit[0] == _versions.get(table, 0)
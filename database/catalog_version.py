@@ -0,0 +1,127 @@
+# database/catalog_version.py
+"""
+Contador de cambios por biblioteca (libraries.catalog_version).
+
+Cualquier cambio del ORM que toque libros (alta, edición, borrado), sus
+préstamos o renombre algo que se ve en la tabla de libros incrementa el
+contador de la biblioteca afectada, en la misma transacción: cada flush solo apunta las
+bibliotecas afectadas y al confirmar se hace UN UPDATE por transacción (no
+uno por flush). Con (catalog_version, nº de libros) se sabe en una consulta
+mínima si un catálogo guardado en memoria sigue valiendo.
+
+Las escrituras con Core (insert() masivos) no pasan por aquí: deben llamar a
+bump_catalog_version() ellas mismas (y marcar su sesión con mark_bulk()).
+"""
+from itertools import chain
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from models.libraries import Library
+
+# tablas cuyos nombres se muestran en el catálogo de TODAS las bibliotecas
+_GLOBAL_LOOKUPS = {"authors", "publishers", "themes"}
+# tablas de referencia propias de una biblioteca
+_LIBRARY_LOOKUPS = {"collections", "locations"}
+
+ALL = object()  # marca: todas las bibliotecas
+
+
+# ¿la BD tiene ya la columna? (migration/add_catalog_version.sql) por URL de engine
+_has_counter: dict[str, bool] = {}
+
+
+def has_catalog_version(conn) -> bool:
+    key = str(conn.engine.url)
+    if key not in _has_counter:
+        cols = inspect(conn).get_columns(Library.__tablename__)
+        _has_counter[key] = any(c["name"] == "catalog_version" for c in cols)
+    return _has_counter[key]
+
+
+def bump_catalog_version(conn, library_ids):
+    """Incrementa el contador de esas bibliotecas (o de todas con ALL)."""
+    if not has_catalog_version(conn):
+        return  # BD sin migrar: sin contador, los catálogos en memoria no se reutilizan
+    stmt = update(Library).values(catalog_version=Library.catalog_version + 1)
+    if library_ids is not ALL:
+        ids = sorted({i for i in library_ids if i is not None})
+        if not ids:
+            return
+        stmt = stmt.where(Library.id.in_(ids))
+    conn.execute(stmt)
+
+
+def _library_ids(obj) -> set:
+    """library_id actual y, si ha cambiado, también el anterior."""
+    state = inspect(obj)
+    hist = state.attrs.library_id.history
+    return {obj.library_id, *hist.deleted}
+
+
+# session.info: bibliotecas pendientes de incrementar (o ALL), libros con
+# préstamos tocados (su biblioteca se busca al confirmar) y marca de sesión masiva
+_PENDING = "catalog_version_pending"
+_LOAN_BOOKS = "catalog_version_loan_books"
+_BULK = "catalog_version_bulk"
+
+
+def mark_bulk(session):
+    """La sesión escribe en bloque y llama a bump_catalog_version() ella misma: sin seguimiento."""
+    session.info[_BULK] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_on_flush(session, flush_context):
+    if session.info.get(_BULK):
+        return
+    pending = session.info.get(_PENDING)
+    if pending is ALL:
+        return
+    affected = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table == "books":
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            affected |= _library_ids(obj)
+        elif table == "borrow_books":
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            session.info.setdefault(_LOAN_BOOKS, set()).add(obj.book_id)
+        elif table in _GLOBAL_LOOKUPS or table in _LIBRARY_LOOKUPS:
+            # una fila nueva no cambia ningún libro ya mostrado
+            if obj in session.new or (obj in session.dirty and not session.is_modified(obj)):
+                continue
+            if table in _GLOBAL_LOOKUPS:
+                session.info[_PENDING] = ALL
+                return
+            affected |= _library_ids(obj)
+
+    if affected:
+        session.info[_PENDING] = (pending or set()) | affected
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_on_commit(session):
+    if session.info.get(_BULK):
+        return
+    session.flush()  # lo que aún no se haya volcado también cuenta
+    pending = session.info.pop(_PENDING, None)
+    loan_books = session.info.pop(_LOAN_BOOKS, None)
+    if loan_books and pending is not ALL:
+        from models.book import Book  # models.book importa este módulo
+
+        rows = session.execute(select(Book.library_id).where(Book.id.in_(sorted(loan_books))))
+        pending = (pending or set()) | set(rows.scalars())
+    if pending:
+        bump_catalog_version(session.connection(), pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_on_rollback(session, previous_transaction):
+    # solo al deshacer la transacción entera (un savepoint deshecho puede dejar
+    # cambios anteriores: mejor incrementar de más que de menos)
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING, None)
+        session.info.pop(_LOAN_BOOKS, None)
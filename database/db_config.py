@@ -1,29 +1,124 @@
+import os
+import threading
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+# -------- Configuración --------
+# Motor de BD:
+#   "mysql"  -> servidor MySQL/MariaDB (por defecto)
+#   "sqlite" -> fichero local, sin servidor (instalación de un solo puesto)
+# Se puede cambiar sin tocar el código con variables de entorno:
+#   LIBRARY_DB_BACKEND=sqlite
+#   LIBRARY_SQLITE_PATH=/ruta/a/library.db
+#   LIBRARY_DB_URL=<URL de SQLAlchemy completa> (tiene prioridad sobre lo demás)
+DB_BACKEND = os.environ.get("LIBRARY_DB_BACKEND", "mysql").strip().lower()
+
 USER = "root"
 PASSWORD = ""
 HOST = "localhost"
 PORT = "3306"
 DB_NAME = "library"
 
-# String of connection (MySQL + mysql-connector)
-if PASSWORD == "":
-    DATABASE_URL = f"mysql+mysqlconnector://{USER}@{HOST}:{PORT}/{DB_NAME}"
-else:
-    DATABASE_URL = f"mysql+mysqlconnector://{USER}:{PASSWORD}@{HOST}:{PORT}/{DB_NAME}"
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SQLITE_PATH = os.environ.get("LIBRARY_SQLITE_PATH", os.path.join(_ROOT, "library.db"))
+
+# PRAGMAs de cada conexión SQLite
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",      # los hilos de consulta leen sin bloquear al que escribe
+    "synchronous": "NORMAL",    # con WAL no corrompe; como mucho, un corte de luz pierde la última transacción
+    "cache_size": -65536,       # 64 MB de caché de páginas (negativo = KiB)
+    "mmap_size": 268435456,     # 256 MB del fichero mapeados en memoria
+    "temp_store": "MEMORY",     # ORDER BY / índices temporales en RAM
+    "foreign_keys": "ON",       # ON DELETE CASCADE de borrow_books
+    "busy_timeout": 5000,       # esperar (ms) si otro hilo está escribiendo
+}
+
+# Esquema de una BD SQLite nueva (se aplica al crearla)
+SQLITE_SCHEMA = ("create_sqlite.sql", "add_fts5_sqlite.sql")
+
+
+def database_url() -> str:
+    if url := os.environ.get("LIBRARY_DB_URL"):
+        return url
+    if DB_BACKEND == "sqlite":
+        return f"sqlite:///{SQLITE_PATH}"
+    # String of connection (MySQL + mysql-connector)
+    if PASSWORD == "":
+        return f"mysql+mysqlconnector://{USER}@{HOST}:{PORT}/{DB_NAME}"
+    return f"mysql+mysqlconnector://{USER}:{PASSWORD}@{HOST}:{PORT}/{DB_NAME}"
+
+
+# -------- Engine (se crea en el primer uso) --------
+
+def _create_sqlite_schema(engine):
+    migrations = os.path.join(_ROOT, "migration")
+    raw = engine.raw_connection()
+    try:
+        for name in SQLITE_SCHEMA:
+            with open(os.path.join(migrations, name), encoding="utf-8") as f:
+                raw.driver_connection.executescript(f.read())
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def _create_engine(url: str):
+    if not url.startswith("sqlite"):
+        return create_engine(
+            url,
+            pool_pre_ping=True,  # evita conexiones muertas
+            echo=False           # pon True si quieres ver el SQL que se ejecuta
+        )
+
+    # las consultas corren en hilos (views/query_runner.py): cada hilo coge su
+    # conexión del pool, pero pueden acabar devolviéndose desde otro hilo
+    engine = create_engine(url, connect_args={"check_same_thread": False}, echo=False)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cur.execute(f"PRAGMA {name}={value}")
+        cur.close()
+
+    if not inspect(engine).has_table("books"):
+        _create_sqlite_schema(engine)
+    return engine
+
+
+class _LazySessionMaker(sessionmaker):
+    """sessionmaker que crea el engine al abrir la primera sesión (no al importar)."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and local_kw.get("bind") is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
+
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    Engine de la app. Se crea la primera vez que hace falta; si alguien ya
+    hizo SessionLocal.configure(bind=...) (scripts, benchmarks) se usa ese.
+    """
+    with _engine_lock:
+        if SessionLocal.kw.get("bind") is None:
+            SessionLocal.configure(bind=_create_engine(database_url()))
+    return SessionLocal.kw["bind"]
+
 
-# Create engine
+def __getattr__(name):
+    # compatibilidad con `from database.db_config import engine`
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,  # evita conexiones muertas
-    echo=False           # pon True si quieres ver el SQL que se ejecuta
-)
 
 # Create session
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionMaker(autocommit=False, autoflush=False)
 
 # Basis for the models
 Base = declarative_base()
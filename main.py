@@ -1,6 +1,22 @@
+import threading
+
 import customtkinter as ctk
 from views.library_select_modal import LibrarySelectModal
-from views.main_window import MainWindow
+
+# Arranque: solo customtkinter y el modal de biblioteca antes de mostrar nada.
+# SQLAlchemy, modelos, controllers y la ventana principal se importan en
+# segundo plano mientras el usuario elige biblioteca (el engine se crea con
+# la primera consulta, ver database/db_config.py).
+# Para medir el arranque: python -m scripts.startup_report
+
+
+def _preload():
+    try:
+        import database.db_config  # noqa: F401  (el modal lo necesita enseguida)
+        import views.main_window   # noqa: F401
+    except Exception:
+        pass  # el import de on_selected volverá a fallar y mostrará el error
+
 
 def main():
     ctk.set_appearance_mode("System")
@@ -9,7 +25,11 @@ def main():
     root = ctk.CTk()
     root.withdraw()
 
+    threading.Thread(target=_preload, name="preload", daemon=True).start()
+
     def on_selected(lib_id, lib_name):
+        from views.main_window import MainWindow  # normalmente ya importado por _preload
+
         root.destroy()
         app = MainWindow(library_id=lib_id, library_name=lib_name)
         app.mainloop()
@@ -0,0 +1,18 @@
+/* =========================================================
+   Contador de cambios del catálogo de cada biblioteca
+   (lo incrementa database/catalog_version.py una vez por
+   transacción que toca libros o préstamos, al confirmar).
+   Permite revalidar con una consulta mínima los catálogos
+   que la app guarda en memoria.
+   ========================================================= */
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+  version VARCHAR(50) NOT NULL,
+  applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (version)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+ALTER TABLE libraries
+  ADD COLUMN catalog_version INT UNSIGNED NOT NULL DEFAULT 0;
+
+INSERT INTO schema_migrations (version) VALUES ('add_catalog_version');
@@ -0,0 +1,95 @@
+/* =========================================================
+   Equivalente SQLite de add_fulltext_indexes.sql: tablas FTS5
+   (tokenizer trigram = búsqueda "contiene", sin distinguir
+   mayúsculas) sincronizadas con triggers.
+   Requiere SQLite >= 3.34.
+   ========================================================= */
+
+/* ---------- books.title ---------- */
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts
+  USING fts5(title, content='books', content_rowid='id', tokenize='trigram');
+
+CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+  INSERT INTO books_fts(rowid, title) VALUES (new.id, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+  INSERT INTO books_fts(books_fts, rowid, title) VALUES ('delete', old.id, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title ON books BEGIN
+  INSERT INTO books_fts(books_fts, rowid, title) VALUES ('delete', old.id, old.title);
+  INSERT INTO books_fts(rowid, title) VALUES (new.id, new.title);
+END;
+
+INSERT INTO books_fts(books_fts) VALUES ('rebuild');
+
+
+/* ---------- authors.name ---------- */
+CREATE VIRTUAL TABLE IF NOT EXISTS authors_fts
+  USING fts5(name, content='authors', content_rowid='id', tokenize='trigram');
+
+CREATE TRIGGER IF NOT EXISTS authors_fts_ai AFTER INSERT ON authors BEGIN
+  INSERT INTO authors_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS authors_fts_ad AFTER DELETE ON authors BEGIN
+  INSERT INTO authors_fts(authors_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS authors_fts_au AFTER UPDATE OF name ON authors BEGIN
+  INSERT INTO authors_fts(authors_fts, rowid, name) VALUES ('delete', old.id, old.name);
+  INSERT INTO authors_fts(rowid, name) VALUES (new.id, new.name);
+END;
+
+INSERT INTO authors_fts(authors_fts) VALUES ('rebuild');
+
+
+/* ---------- publishers.name ---------- */
+CREATE VIRTUAL TABLE IF NOT EXISTS publishers_fts
+  USING fts5(name, content='publishers', content_rowid='id', tokenize='trigram');
+
+CREATE TRIGGER IF NOT EXISTS publishers_fts_ai AFTER INSERT ON publishers BEGIN
+  INSERT INTO publishers_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS publishers_fts_ad AFTER DELETE ON publishers BEGIN
+  INSERT INTO publishers_fts(publishers_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS publishers_fts_au AFTER UPDATE OF name ON publishers BEGIN
+  INSERT INTO publishers_fts(publishers_fts, rowid, name) VALUES ('delete', old.id, old.name);
+  INSERT INTO publishers_fts(rowid, name) VALUES (new.id, new.name);
+END;
+
+INSERT INTO publishers_fts(publishers_fts) VALUES ('rebuild');
+
+
+/* ---------- themes.name ---------- */
+CREATE VIRTUAL TABLE IF NOT EXISTS themes_fts
+  USING fts5(name, content='themes', content_rowid='id', tokenize='trigram');
+
+CREATE TRIGGER IF NOT EXISTS themes_fts_ai AFTER INSERT ON themes BEGIN
+  INSERT INTO themes_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS themes_fts_ad AFTER DELETE ON themes BEGIN
+  INSERT INTO themes_fts(themes_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS themes_fts_au AFTER UPDATE OF name ON themes BEGIN
+  INSERT INTO themes_fts(themes_fts, rowid, name) VALUES ('delete', old.id, old.name);
+  INSERT INTO themes_fts(rowid, name) VALUES (new.id, new.name);
+END;
+
+INSERT INTO themes_fts(themes_fts) VALUES ('rebuild');
+
+
+/* ---------- collections.name ---------- */
+CREATE VIRTUAL TABLE IF NOT EXISTS collections_fts
+  USING fts5(name, content='collections', content_rowid='id', tokenize='trigram');
+
+CREATE TRIGGER IF NOT EXISTS collections_fts_ai AFTER INSERT ON collections BEGIN
+  INSERT INTO collections_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS collections_fts_ad AFTER DELETE ON collections BEGIN
+  INSERT INTO collections_fts(collections_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS collections_fts_au AFTER UPDATE OF name ON collections BEGIN
+  INSERT INTO collections_fts(collections_fts, rowid, name) VALUES ('delete', old.id, old.name);
+  INSERT INTO collections_fts(rowid, name) VALUES (new.id, new.name);
+END;
+
+INSERT INTO collections_fts(collections_fts) VALUES ('rebuild');
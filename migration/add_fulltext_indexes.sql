@@ -0,0 +1,37 @@
+/* =========================================================
+   Índices FULLTEXT para los filtros de texto de list_books
+   (título, autor, editorial, tema, colección)
+
+   - Parser ngram: indexa fragmentos de ngram_token_size (2 por
+     defecto), así que sirve para búsquedas "contiene", igual
+     que el ILIKE '%x%' que sustituye.
+   - Sin stopwords: con ngram, InnoDB descarta todo fragmento
+     que contenga una stopword ("a", "de", "la", "en"...), así
+     que MATCH no encontraría "casa" (sus bigramas "ca", "as",
+     "sa" contienen "a") y el ILIKE de encima ya no vería esas
+     filas. La lista se fija
+     al crear cada índice, por eso se desactiva antes en esta
+     sesión. Si un índice se vuelve a crear más tarde, hay que
+     hacerlo también con innodb_ft_enable_stopword=0 (o
+     ponerlo en my.cnf).
+   - Si estos índices no existen, la app vuelve al ILIKE.
+   ========================================================= */
+
+SET SESSION innodb_ft_enable_stopword = 0;
+
+ALTER TABLE books
+  ADD FULLTEXT INDEX ftx_books_title (title) WITH PARSER ngram;
+
+ALTER TABLE authors
+  ADD FULLTEXT INDEX ftx_authors_name (name) WITH PARSER ngram;
+
+ALTER TABLE publishers
+  ADD FULLTEXT INDEX ftx_publishers_name (name) WITH PARSER ngram;
+
+ALTER TABLE themes
+  ADD FULLTEXT INDEX ftx_themes_name (name) WITH PARSER ngram;
+
+ALTER TABLE collections
+  ADD FULLTEXT INDEX ftx_collections_name (name) WITH PARSER ngram;
+
+SET SESSION innodb_ft_enable_stopword = DEFAULT;
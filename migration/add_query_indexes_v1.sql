@@ -0,0 +1,51 @@
+/* =========================================================
+   Índices v1: las consultas que lanza la app
+   (mismos nombres que los Index(...) de models/)
+
+   - books(library_id, title): list_books filtra por biblioteca
+     y ordena por título -> sin filesort.
+   - books(<FK>): claves ajenas de books (InnoDB descarta su
+     índice implícito al encontrar uno que ya le sirve).
+   - borrow_books(book_id, returned, date_of_loan): list_loans.
+   - locations(library_id, place, furniture, module, shelf):
+     búsqueda de duplicados de create_location.
+   - collections(library_id, name): combos y create_collection.
+
+   Comprobar que se usan:
+     python -m scripts.explain_queries
+   ========================================================= */
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+  version VARCHAR(50) NOT NULL,
+  applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (version)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+
+/* ---------- books ---------- */
+ALTER TABLE books
+  ADD INDEX ix_books_library_title (library_id, title),
+  ADD INDEX ix_books_author_id (author_id),
+  ADD INDEX ix_books_publisher_id (publisher_id),
+  ADD INDEX ix_books_theme_id (theme_id),
+  ADD INDEX ix_books_location_id (location_id),
+  ADD INDEX ix_books_collection_id (collection_id);
+
+
+/* ---------- borrow_books ---------- */
+ALTER TABLE borrow_books
+  ADD INDEX ix_borrow_books_book_returned_date (book_id, returned, date_of_loan);
+
+
+/* ---------- locations ---------- */
+ALTER TABLE locations
+  ADD INDEX ix_locations_library_place (library_id, place, furniture, module, shelf);
+
+
+/* ---------- collections ---------- */
+ALTER TABLE collections
+  ADD INDEX ix_collections_library_name (library_id, name);
+
+
+/* Si algo falló arriba no se llega aquí: la versión no queda marcada */
+INSERT INTO schema_migrations (version) VALUES ('add_query_indexes_v1');
@@ -0,0 +1,21 @@
+/* =========================================================
+   Índices para ordenar el catálogo por años (cabeceras de
+   MainWindow): el listado siempre filtra por library_id, así
+   que el índice compuesto cubre el filtro y el orden.
+   Ordenan por (año IS NULL, año), como book_controller._sort_keys
+   (los años vacíos al final en las dos direcciones): la parte
+   (año IS NULL) es un índice funcional, MySQL 8.0.13 o posterior.
+   ========================================================= */
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+  version VARCHAR(50) NOT NULL,
+  applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (version)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+ALTER TABLE books
+  ADD INDEX ix_books_library_publication_year (library_id, (publication_year IS NULL), publication_year),
+  ADD INDEX ix_books_library_edition_year (library_id, (edition_year IS NULL), edition_year);
+
+/* Si algo falló arriba no se llega aquí: la versión no queda marcada */
+INSERT INTO schema_migrations (version) VALUES ('add_sort_indexes');
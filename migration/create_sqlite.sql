@@ -0,0 +1,101 @@
+/* =========================================================
+   Esquema completo para el modo SQLite (un solo puesto)
+
+   Equivale a create_libraries_table.sql + create_borrow_books.sql
+   + add_sort_indexes.sql + add_query_indexes_v1.sql
+   + add_catalog_version.sql de MySQL.
+   La búsqueda de texto (FTS5) va en add_fts5_sqlite.sql.
+
+   database/db_config.py aplica los dos ficheros al crear la BD
+   (LIBRARY_DB_BACKEND=sqlite); a mano:
+     sqlite3 library.db < migration/create_sqlite.sql
+     sqlite3 library.db < migration/add_fts5_sqlite.sql
+   ========================================================= */
+
+PRAGMA foreign_keys = ON;
+
+
+/* ---------- libraries ---------- */
+CREATE TABLE IF NOT EXISTS libraries (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  code VARCHAR(50) NOT NULL UNIQUE,
+  name VARCHAR(100) NOT NULL UNIQUE,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  catalog_version INTEGER NOT NULL DEFAULT 0
+);
+
+/* Seed inicial (mismas bibliotecas que en MySQL) */
+INSERT OR IGNORE INTO libraries (code, name) VALUES
+  ('melendo_iglesias', 'Melendo-Iglesias'),
+  ('iglesias_hurtado', 'Iglesias-Hurtado');
+
+
+/* ---------- tablas de referencia ---------- */
+CREATE TABLE IF NOT EXISTS authors (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name VARCHAR(150) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS publishers (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name VARCHAR(50) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS themes (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name VARCHAR(50) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS collections (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  library_id INTEGER NOT NULL REFERENCES libraries(id),
+  name VARCHAR(20) NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_collections_library_name ON collections (library_id, name);
+
+CREATE TABLE IF NOT EXISTS locations (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  library_id INTEGER NOT NULL REFERENCES libraries(id),
+  place VARCHAR(30),
+  furniture VARCHAR(30),
+  module VARCHAR(30),
+  shelf INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_locations_library_place
+  ON locations (library_id, place, furniture, module, shelf);
+
+
+/* ---------- books ---------- */
+CREATE TABLE IF NOT EXISTS books (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  library_id INTEGER NOT NULL REFERENCES libraries(id),
+  title VARCHAR(255) NOT NULL,
+  author_id INTEGER REFERENCES authors(id),
+  publisher_id INTEGER REFERENCES publishers(id),
+  theme_id INTEGER REFERENCES themes(id),
+  location_id INTEGER REFERENCES locations(id),
+  collection_id INTEGER REFERENCES collections(id),
+  publication_year INTEGER,
+  edition_year INTEGER
+);
+/* el listado ordena por título con COLLATE NOCASE (ver _sort_keys) */
+CREATE INDEX IF NOT EXISTS ix_books_library_title ON books (library_id, title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_books_library_publication_year ON books (library_id, publication_year);
+CREATE INDEX IF NOT EXISTS ix_books_library_edition_year ON books (library_id, edition_year);
+CREATE INDEX IF NOT EXISTS ix_books_author_id ON books (author_id);
+CREATE INDEX IF NOT EXISTS ix_books_publisher_id ON books (publisher_id);
+CREATE INDEX IF NOT EXISTS ix_books_theme_id ON books (theme_id);
+CREATE INDEX IF NOT EXISTS ix_books_location_id ON books (location_id);
+CREATE INDEX IF NOT EXISTS ix_books_collection_id ON books (collection_id);
+
+
+/* ---------- borrow_books ---------- */
+CREATE TABLE IF NOT EXISTS borrow_books (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  book_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE ON UPDATE CASCADE,
+  date_of_loan DATE NOT NULL,
+  name_person VARCHAR(100) NOT NULL,
+  returned BOOLEAN NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_borrow_books_book_returned_date
+  ON borrow_books (book_id, returned, date_of_loan);
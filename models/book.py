@@ -1,11 +1,20 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database.db_config import Base
 from . import borrow_book
+from database import catalog_version  # noqa: F401  (registra el contador de cambios)
 
 
 class Book(Base):
     __tablename__ = 'books'
+    __table_args__ = (
+        # claves ajenas: joins inversos y comprobaciones de FK al borrar
+        Index("ix_books_author_id", "author_id"),
+        Index("ix_books_publisher_id", "publisher_id"),
+        Index("ix_books_theme_id", "theme_id"),
+        Index("ix_books_location_id", "location_id"),
+        Index("ix_books_collection_id", "collection_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -29,3 +38,14 @@ class Book(Base):
 
     def __repr__(self):
         return f"<Book(id={self.id}, library_id={self.library_id}, title='{self.title}')>"
+
+
+# listado por biblioteca ordenado por título (ver migration/add_query_indexes_v1.sql).
+# En SQLite el orden va con COLLATE NOCASE, así que el índice también.
+Index("ix_books_library_title", Book.library_id, Book.title).ddl_if(dialect="mysql")
+Index("ix_books_library_title", Book.library_id, Book.title.collate("NOCASE")).ddl_if(dialect="sqlite")
+
+# orden por años en MainWindow, vacíos al final (ver migration/add_sort_indexes.sql)
+Index("ix_books_library_publication_year",
+      Book.library_id, Book.publication_year.is_(None), Book.publication_year)
+Index("ix_books_library_edition_year", Book.library_id, Book.edition_year.is_(None), Book.edition_year)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from database.db_config import Base
 
 
 class BorrowBook(Base):
     __tablename__ = "borrow_books"
+    __table_args__ = (
+        # list_loans: préstamos de los libros de la biblioteca, pendientes primero
+        Index("ix_borrow_books_book_returned_date", "book_id", "returned", "date_of_loan"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     book_id = Column(Integer, ForeignKey(
         "books.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from database.db_config import Base
 
 class Collection(Base):
     __tablename__ = 'collections'
+    __table_args__ = (
+        # colecciones de una biblioteca por nombre (combos y create_collection)
+        Index("ix_collections_library_name", "library_id", "name"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
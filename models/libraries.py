@@ -10,6 +10,8 @@ class Library(Base):
     code = Column(String(50), nullable=False, unique=True)
     name = Column(String(100), nullable=False, unique=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    # cambios en su catálogo (ver database/catalog_version.py)
+    catalog_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     def __repr__(self):
         return f"<Library(id={self.id}, code='{self.code}', name='{self.name}')>"
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from database.db_config import Base
 
 class Location(Base):
     __tablename__ = 'locations'
+    __table_args__ = (
+        # create_location busca duplicados por la combinación completa
+        Index("ix_locations_library_place", "library_id", "place", "furniture", "module", "shelf"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
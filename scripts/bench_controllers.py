@@ -0,0 +1,201 @@
+"""
+Benchmark de los controllers con líneas base: p50/p95 de latencia y pico de
+memoria por operación. Sale con código 1 si algo empeora más del umbral.
+
+Uso:
+    python -m scripts.bench_controllers                      # SQLite en memoria, 20k libros
+    python -m scripts.bench_controllers --books 200000 --repeat 20
+    python -m scripts.bench_controllers --url sqlite:///catalog.db   # BD de gen_catalog
+    python -m scripts.bench_controllers --only filtro
+    python -m scripts.bench_controllers --save-baseline      # guarda la línea base
+
+Las líneas base (scripts/bench_baselines.json) solo se comparan con el mismo
+dataset (libros, bibliotecas, semilla) y dependen de la máquina: hay que
+regrabarlas al cambiar de equipo.
+"""
+import argparse
+import contextlib
+import gc
+import itertools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from database.db_config import SessionLocal
+from controllers import lookup_cache
+from controllers.book_controller import (
+    list_books, list_book_rows, list_book_rows_page, count_books, book_change,
+    get_all_authors, get_all_locations, create_location, create_author,
+)
+from controllers.borrow_controller import list_loans
+from scripts.gen_catalog import generate, make_engine, write_books_excel
+
+BASELINE_PATH = Path(__file__).with_name("bench_baselines.json")
+LIBRARY_ID = 1
+EXCEL_ROWS = 1_000
+
+
+def _uncached(fn):
+    def run():
+        lookup_cache.invalidate()
+        return fn()
+    return run
+
+
+def _quiet(fn):
+    """Los seeders imprimen una línea por fila: eso no es lo que se mide."""
+    def run():
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            return fn()
+    return run
+
+
+def cases(workdir: str, engine):
+    """(nombre, función, repeticiones relativas). Todas usan la biblioteca LIBRARY_ID."""
+    from scripts.seed_books_from_excel import insert_books_from_excel
+
+    lib = LIBRARY_ID
+    new_names = (f"Autor benchmark {i}" for i in itertools.count())
+    some_book = list_book_rows_page(None, library_id=lib, limit=1)[0][0].id
+
+    excel = os.path.join(workdir, "libros.xlsx")
+    write_books_excel(engine, excel, EXCEL_ROWS, library_id=lib)
+
+    filters = {
+        "título": {"title": "jardín"},
+        "autor": {"author_name": "garcía"},
+        "años rango": {"pub_year_min": 1980, "pub_year_max": 1999},
+        "ubicación": {"place": "Salón", "module": "Módulo 2"},
+        "combinado": {"title": "historia", "theme_name": "nov", "edi_year_min": 2000},
+    }
+
+    yield "list_books (ORM)", lambda: list_books(None, library_id=lib), 0.3
+    yield "list_book_rows", lambda: list_book_rows(None, library_id=lib), 0.5
+    yield "list_book_rows_page", lambda: list_book_rows_page(None, library_id=lib), 1
+    yield "página ordenada autor desc", \
+        lambda: list_book_rows_page(None, library_id=lib, order_by="author", desc=True), 1
+    yield "count_books", lambda: count_books(None, library_id=lib), 1
+    for name, f in filters.items():
+        yield f"filtro {name}", lambda f=f: list_book_rows(f, library_id=lib), 1
+        yield f"filtro {name} (count)", lambda f=f: count_books(f, library_id=lib), 1
+    yield "book_change", lambda: book_change(some_book, None, lib), 1
+    yield "list_loans", lambda: list_loans(lib), 0.5
+    yield "get_all_authors (sin caché)", _uncached(get_all_authors), 1
+    yield "get_all_locations (sin caché)", _uncached(lambda: get_all_locations(lib)), 1
+    yield "create_location (duplicado)", lambda: create_location(
+        place="Salón B1", furniture="Librería", module="Módulo 1", shelf="1", library_id=lib), 1
+    yield "create_author (nuevo)", lambda: create_author(next(new_names)), 1
+    yield f"seed_books_from_excel dry-run ({EXCEL_ROWS} filas)", _quiet(
+        lambda: insert_books_from_excel(excel, None, dry=True, create_missing_locations=False)), 0.2
+
+
+def measure(fn, repeat: int) -> dict:
+    fn()  # calentamiento (caché de sentencias, páginas de la BD)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+
+    # memoria aparte: tracemalloc ralentiza mucho y falsearía los tiempos
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    res = fn()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    del res
+
+    times.sort()
+    return {
+        "p50_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, round(0.95 * (len(times) - 1)))], 3),
+        "peak_mb": round(peak / 2**20, 3),
+    }
+
+
+def regressions(result: dict, base: dict, threshold: float) -> list[str]:
+    """Qué métricas empeoran más del umbral (con un mínimo absoluto contra el ruido)."""
+    out = []
+    for metric, floor in (("p50_ms", 1.0), ("p95_ms", 2.0), ("peak_mb", 0.5)):
+        if metric in base and result[metric] > base[metric] * (1 + threshold) + floor:
+            out.append(f"{metric} {base[metric]} -> {result[metric]}")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark de controllers con líneas base.")
+    ap.add_argument("--url", default=None, help="BD ya generada con gen_catalog (por defecto SQLite en memoria)")
+    ap.add_argument("--books", type=int, default=20_000, help="Libros a generar si no se da --url")
+    ap.add_argument("--libraries", type=int, default=2)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeat", type=int, default=15, help="Repeticiones por caso (p50/p95)")
+    ap.add_argument("--only", default=None, help="Solo los casos cuyo nombre contenga este texto")
+    ap.add_argument("--threshold", type=float, default=0.30, help="Empeoramiento tolerado (0.30 = +30%%)")
+    ap.add_argument("--baseline", default=str(BASELINE_PATH))
+    ap.add_argument("--save-baseline", action="store_true", help="Guarda los resultados como línea base")
+    args = ap.parse_args()
+
+    if args.url:
+        engine = make_engine(args.url)
+        dataset = {"url": args.url}
+    else:
+        engine = make_engine("sqlite://")
+        dataset = {"books": args.books, "libraries": args.libraries, "seed": args.seed}
+        t0 = time.perf_counter()
+        generate(engine, args.books, args.libraries, seed=args.seed, progress=None)
+        print(f"Dataset: {args.books:,} libros en {time.perf_counter() - t0:.1f}s")
+    SessionLocal.configure(bind=engine)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("dataset") == dataset:
+            baseline = stored.get("cases", {})
+        elif not args.save_baseline:
+            print(f"Aviso: la línea base es de otro dataset ({stored.get('dataset')}); no se compara.")
+
+    results, failed = {}, []
+    print(f"{'caso':44} {'p50 ms':>9} {'p95 ms':>9} {'pico MB':>9}  vs base")
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, fn, weight in cases(workdir, engine):
+            if args.only and args.only.lower() not in name.lower():
+                continue
+            r = measure(fn, max(3, round(args.repeat * weight)))
+            results[name] = r
+
+            note = ""
+            if name in baseline:
+                bad = regressions(r, baseline[name], args.threshold)
+                if bad:
+                    failed.append((name, bad))
+                    note = "EMPEORA: " + "; ".join(bad)
+                else:
+                    note = f"x{baseline[name]['p50_ms'] / r['p50_ms']:.2f}" if r["p50_ms"] else "ok"
+            print(f"{name:44} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['peak_mb']:>9.2f}  {note}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            # con --only se actualizan solo esos casos
+            json.dump({"dataset": dataset, "cases": {**baseline, **results}}, f,
+                      indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Línea base guardada en {args.baseline}")
+        return
+
+    if failed:
+        print(f"\n{len(failed)} caso(s) empeoran más de un {args.threshold:.0%}:")
+        for name, bad in failed:
+            print(f"  - {name}: {'; '.join(bad)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: list_books (objetos ORM + joinedload) vs list_book_rows (proyección).
+
+Uso:
+    python -m scripts.bench_list_books --books 100000
+    python -m scripts.bench_list_books --url sqlite:///bench.db --books 200000 --repeat 5
+
+Por defecto crea una BD SQLite en memoria con datos sintéticos. Con --url se
+puede apuntar a otra BD vacía (se crean las tablas que falten).
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.pool import StaticPool
+
+from database.db_config import Base, SessionLocal
+from models.libraries import Library
+from models.author import Author
+from models.publisher import Publisher
+from models.theme import Theme
+from models.collection import Collection
+from models.location import Location
+from models.book import Book
+from controllers.book_controller import list_books, list_book_rows
+
+LIBRARY_ID = 1
+
+
+def build_dataset(engine, n_books: int, seed: int = 42):
+    rnd = random.Random(seed)
+    Base.metadata.create_all(engine)
+    n_authors = max(10, n_books // 20)
+    with engine.begin() as conn:
+        conn.execute(insert(Library), [{"id": LIBRARY_ID, "code": "bench", "name": "Bench"}])
+        conn.execute(insert(Author), [{"id": i + 1, "name": f"Autor {i}"} for i in range(n_authors)])
+        conn.execute(insert(Publisher), [{"id": i + 1, "name": f"Editorial {i}"} for i in range(200)])
+        conn.execute(insert(Theme), [{"id": i + 1, "name": f"Tema {i}"} for i in range(50)])
+        conn.execute(insert(Collection), [{"id": i + 1, "library_id": LIBRARY_ID, "name": f"Col {i}"}
+                                          for i in range(100)])
+        conn.execute(insert(Location), [{"id": i + 1, "library_id": LIBRARY_ID, "place": f"Sala {i % 5}",
+                                         "furniture": f"Mueble {i}", "module": f"M{i % 7}", "shelf": i % 9}
+                                        for i in range(300)])
+        batch = []
+        for i in range(n_books):
+            batch.append({
+                "library_id": LIBRARY_ID,
+                "title": f"Libro {rnd.randint(0, n_books * 10):08d}",
+                "author_id": rnd.randint(1, n_authors),
+                "publisher_id": rnd.randint(1, 200),
+                "theme_id": rnd.randint(1, 50),
+                "location_id": rnd.randint(1, 300),
+                "collection_id": rnd.choice([None, rnd.randint(1, 100)]),
+                "publication_year": rnd.choice([None, rnd.randint(1900, 2024)]),
+                "edition_year": rnd.choice([None, rnd.randint(1950, 2024)]),
+            })
+            if len(batch) == 10_000:
+                conn.execute(insert(Book), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Book), batch)
+
+
+def measure(fn, repeat: int):
+    """Devuelve (mejor tiempo en s, pico de memoria en MB, memoria retenida por el resultado en MB)."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        res = fn()
+        best = min(best, time.perf_counter() - t0)
+        del res
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    res = fn()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - base
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    n = len(res)
+    del res
+    return best, peak / 2**20, retained / 2**20, n
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark list_books vs list_book_rows.")
+    ap.add_argument("--books", type=int, default=50_000, help="Número de libros sintéticos")
+    ap.add_argument("--url", default=None, help="URL de BD vacía (por defecto SQLite en memoria)")
+    ap.add_argument("--repeat", type=int, default=3, help="Repeticiones (se toma la mejor)")
+    args = ap.parse_args()
+
+    if args.url:
+        engine = create_engine(args.url)
+    else:
+        engine = create_engine("sqlite://", poolclass=StaticPool,
+                               connect_args={"check_same_thread": False})
+    SessionLocal.configure(bind=engine)
+
+    t0 = time.perf_counter()
+    build_dataset(engine, args.books)
+    print(f"Dataset: {args.books:,} libros en {time.perf_counter() - t0:.1f}s")
+
+    cases = [
+        ("list_books (ORM)", lambda: list_books(None, library_id=LIBRARY_ID)),
+        ("list_book_rows (proyección)", lambda: list_book_rows(None, library_id=LIBRARY_ID)),
+    ]
+    results = []
+    print(f"{'caso':32} {'filas':>9} {'tiempo':>9} {'pico MB':>9} {'retenido MB':>12}")
+    for name, fn in cases:
+        t, peak, kept, n = measure(fn, args.repeat)
+        results.append((t, peak, kept))
+        print(f"{name:32} {n:>9,} {t:>8.3f}s {peak:>9.1f} {kept:>12.1f}")
+
+    (t_orm, p_orm, k_orm), (t_row, p_row, k_row) = results
+    print(f"\nMejora: tiempo x{t_orm / t_row:.1f} | pico x{p_orm / p_row:.1f} | retenido x{k_orm / k_row:.1f}")
+
+
+if __name__ == "__main__":
+    main()
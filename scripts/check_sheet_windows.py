@@ -0,0 +1,114 @@
+"""
+Comprueba que los tramos de sheet_stream.read_rows(..., rows=(desde, hasta))
+-lo que lee cada proceso de seed_books_from_excel --workers- dan exactamente
+las mismas filas que la lectura completa de la hoja.
+
+El filtro de tramos (_RowWindow) se engancha a un interno de openpyxl
+(ReadOnlyWorksheet._get_source): hay que pasar esta comprobación al cambiar
+la versión de openpyxl fijada en requirements.txt.
+
+Uso:
+    python -m scripts.check_sheet_windows               # libro sintético
+    python -m scripts.check_sheet_windows libros.xlsx   # además, estos libros
+
+El libro sintético tiene filas vacías, filas que no existen en el XML,
+celdas con formato y sin valor al final y varias hojas. Cada hoja se lee
+por tramos de varios tamaños, con bloques de lectura normales y diminutos
+(etiquetas partidas entre bloques). Sale con código 1 si algún tramo no
+coincide.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+import openpyxl
+from openpyxl.styles import Font
+
+from scripts import sheet_stream
+from scripts.sheet_stream import count_rows, read_rows, sheet_names
+
+
+def build_workbook(path: str, rows: int = 3000, seed: int = 1):
+    rnd = random.Random(seed)
+    wb = openpyxl.Workbook()
+    for n_sheet, ws in enumerate((wb.active, wb.create_sheet("Segunda"))):
+        ws.append(["Título", "Autor", "Editorial", "Temática", "Ubicación", "Años"])
+        r = 2
+        for i in range(rows // (n_sheet + 1)):
+            if rnd.random() < 0.01:
+                r += rnd.randint(1, 5)  # filas que no están en el XML
+            if rnd.random() < 0.02:
+                r += 1  # fila vacía
+                continue
+            values = [f"Libro {i}", f"Autor {i % 97}", rnd.choice([None, "Editorial", "NA"]),
+                      rnd.choice(["Novela", "Ensayo", None]), f"Sala {i % 3}/Estantería/M{i % 4}/{i % 6}",
+                      rnd.choice([1974, "1974/2001", 1999.0, None])]
+            for c, v in enumerate(values, start=1):
+                if v is not None:
+                    ws.cell(row=r, column=c, value=v)
+            r += 1
+        for k in range(rnd.randint(3, 30)):  # formato sin valor al final
+            ws.cell(row=r + k, column=1).font = Font(bold=True)
+    wb.save(path)
+
+
+def _windows(n: int, rnd: random.Random) -> list[tuple[int, int]]:
+    out = [(0, n), (0, 0), (n, n)]
+    for k in (2, 3, 7):
+        bounds = [n * j // k for j in range(k + 1)]
+        out += list(zip(bounds, bounds[1:]))
+    for _ in range(10):
+        a = rnd.randint(0, n)
+        out.append((a, rnd.randint(a, n)))
+    return out
+
+
+def check(path: str, verbose: bool = False) -> bool:
+    ok = True
+    rnd = random.Random(path)
+    for sheet in sheet_names(path):
+        headers, full = read_rows(path, sheet)
+        full = list(full)
+        n = count_rows(path, sheet)
+        if n is None:
+            print(f"[SKIP] {path} [{sheet}]: la hoja no declara su tamaño (se lee sin tramos)")
+            continue
+        width = len(headers)
+        expected = full + [(None,) * width] * (n - len(full))  # los tramos no recortan las vacías del final
+        bad = 0
+        for block in (sheet_stream._RowWindow.BLOCK, 61):
+            saved, sheet_stream._RowWindow.BLOCK = sheet_stream._RowWindow.BLOCK, block
+            try:
+                for start, stop in _windows(n, rnd):
+                    h, rows = read_rows(path, sheet, rows=(start, stop))
+                    if h != headers or rows != expected[start:stop]:
+                        bad += 1
+                        if verbose or bad == 1:
+                            print(f"[FAIL] {path} [{sheet}] filas {start}-{stop} (bloque {block})")
+            finally:
+                sheet_stream._RowWindow.BLOCK = saved
+        print(f"[{'OK' if not bad else 'FAIL'}] {path} [{sheet}]: {n} filas")
+        ok = ok and not bad
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Tramos de sheet_stream frente a la lectura completa.")
+    ap.add_argument("excel", nargs="*", help="Libros .xlsx que comprobar además del sintético")
+    ap.add_argument("-v", "--verbose", action="store_true", help="Mostrar todos los tramos que fallan")
+    args = ap.parse_args()
+
+    print(f"openpyxl {openpyxl.__version__}")
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic = os.path.join(tmp, "sintetico.xlsx")
+        build_workbook(synthetic)
+        ok = check(synthetic, args.verbose)
+    for path in args.excel:
+        ok = check(path, args.verbose) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
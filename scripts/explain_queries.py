@@ -0,0 +1,165 @@
+"""
+Comprueba con EXPLAIN que las consultas de los controllers usan los índices
+de migration/add_query_indexes_v1.sql.
+
+Uso:
+    python -m scripts.explain_queries                    # BD de la app (db_config)
+    python -m scripts.explain_queries --library-id 2
+    python -m scripts.explain_queries --url sqlite://    # SQLite en memoria con datos sintéticos
+
+Cada caso ejecuta la función real del controller, captura el SQL que lanza
+(evento before_cursor_execute) y lo pasa por EXPLAIN (MySQL) o
+EXPLAIN QUERY PLAN (SQLite) con los mismos parámetros. Sale con código 1 si
+algún caso no usa el índice esperado.
+"""
+import argparse
+import re
+import sys
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import create_engine, event, inspect, insert
+from sqlalchemy.pool import StaticPool
+
+from database.db_config import SessionLocal, get_engine
+from models.book import Book
+from models.borrow_book import BorrowBook
+from models.collection import Collection
+from models.location import Location
+from controllers import lookup_cache
+from controllers.book_controller import (
+    list_books, list_book_rows_page, count_books, get_all_collections,
+    create_location, create_collection,
+)
+from controllers.borrow_controller import list_loans
+
+_SQLITE_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+
+@contextmanager
+def capture_selects(engine):
+    """Recoge (sql, parámetros) de cada SELECT que se ejecute en el engine."""
+    captured = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+
+
+def explain(engine, statement, parameters) -> list[tuple[str, str | None]]:
+    """Plan de la consulta: [(línea legible, índice usado o None), ...]."""
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            plan = []
+            for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters):
+                detail = row[-1]
+                m = _SQLITE_INDEX.search(detail)
+                plan.append((detail, m.group(1) if m else None))
+            return plan
+
+        plan = []
+        for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings():
+            line = f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row['Extra'] or ''}"
+            plan.append((line.strip(), row["key"]))
+        return plan
+
+
+def cases(library_id: int):
+    """(nombre, función del controller, índice o índices válidos que deben aparecer en el plan)."""
+    with SessionLocal() as s:
+        loc = s.query(Location).filter(Location.library_id == library_id).first()
+        col = s.query(Collection).filter(Collection.library_id == library_id).first()
+        dialect = s.get_bind().dialect.name
+
+    def load_collections():
+        lookup_cache.invalidate("collections")  # forzar la consulta
+        return get_all_collections(library_id)
+
+    yield "list_books", lambda: list_books(None, library_id=library_id), "ix_books_library_title"
+    yield "list_book_rows_page", lambda: list_book_rows_page(None, library_id=library_id), \
+        "ix_books_library_title"
+    # para contar vale cualquier índice que empiece por library_id
+    yield "count_books", lambda: count_books(None, library_id=library_id), \
+        ("ix_books_library_title", "ix_books_library_publication_year", "ix_books_library_edition_year")
+    if dialect in ("mysql", "mariadb"):
+        # palabras más cortas que ngram_token_size: sin MATCH, solo el ILIKE (no ftx_books_title)
+        yield "list_books (título 'a b')", \
+            lambda: list_books({"title": "a b"}, library_id=library_id), "ix_books_library_title"
+    yield "list_loans", lambda: list_loans(library_id), "ix_borrow_books_book_returned_date"
+    yield "get_all_collections", load_collections, "ix_collections_library_name"
+
+    # con valores existentes create_* solo hace la búsqueda de duplicados (no inserta)
+    if loc is not None:
+        yield "create_location (duplicado)", lambda: create_location(
+            place=loc.place, furniture=loc.furniture, module=loc.module,
+            shelf=None if loc.shelf is None else str(loc.shelf), library_id=library_id,
+        ), "ix_locations_library_place"
+    if col is not None:
+        yield "create_collection (duplicado)", lambda: create_collection(col.name, library_id), \
+            "ix_collections_library_name"
+
+
+def run(engine, library_id: int, verbose: bool) -> bool:
+    ok = True
+    for name, fn, expected in cases(library_id):
+        with capture_selects(engine) as captured:
+            fn()
+
+        plans = [explain(engine, sql, params) for sql, params in captured]
+        used = {idx for plan in plans for _, idx in plan if idx}
+        expected = (expected,) if isinstance(expected, str) else expected
+        hit = bool(used.intersection(expected))
+        ok &= hit
+        print(f"[{'OK' if hit else 'FALLA'}] {name}: espera {' | '.join(expected)}; "
+              f"usa {', '.join(sorted(used)) or '-'}")
+        if verbose or not hit:
+            for plan in plans:
+                for line, _ in plan:
+                    print(f"        {line}")
+    return ok
+
+
+def _seed(engine, n_books: int):
+    """Datos sintéticos (los del benchmark, biblioteca 1) + algunos préstamos."""
+    from scripts.bench_list_books import build_dataset
+
+    build_dataset(engine, n_books)
+    with engine.begin() as conn:
+        conn.execute(insert(BorrowBook), [
+            {"book_id": i, "date_of_loan": date(2024, 1 + i % 12, 1 + i % 28),
+             "name_person": f"Persona {i}", "returned": i % 3 == 0}
+            for i in range(1, n_books + 1, 7)
+        ])
+
+
+def main():
+    ap = argparse.ArgumentParser(description="EXPLAIN de las consultas de los controllers.")
+    ap.add_argument("--library-id", type=int, default=1)
+    ap.add_argument("--url", default=None, help="Otra BD (sqlite:// = en memoria con datos sintéticos)")
+    ap.add_argument("--books", type=int, default=5_000, help="Libros sintéticos si la BD no tiene tablas")
+    ap.add_argument("-v", "--verbose", action="store_true", help="Mostrar siempre el plan completo")
+    args = ap.parse_args()
+
+    if args.url:
+        if args.url in ("sqlite://", "sqlite:///:memory:"):
+            engine = create_engine(args.url, poolclass=StaticPool,
+                                   connect_args={"check_same_thread": False})
+        else:
+            engine = create_engine(args.url)
+        SessionLocal.configure(bind=engine)
+        if not inspect(engine).has_table(Book.__tablename__):
+            _seed(engine, args.books)
+    else:
+        engine = get_engine()
+
+    sys.exit(0 if run(engine, args.library_id, args.verbose) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Genera un catálogo sintético grande (varias bibliotecas, préstamos) para
+medir rendimiento.
+
+Uso:
+    python -m scripts.gen_catalog --url sqlite:///catalog.db --books 100000
+    python -m scripts.gen_catalog --url mysql+mysqlconnector://root@localhost:3306/library_bench \\
+        --books 1000000 --libraries 3
+    python -m scripts.gen_catalog --url sqlite:///catalog.db --books 20000 --excel libros.xlsx
+
+La BD de destino debe estar vacía (se crean las tablas que falten).
+- Autores con distribución Zipf: unos pocos tienen muchísimos libros y la
+  mayoría solo uno o dos, como en una biblioteca real.
+- Ubicaciones y colecciones propias de cada biblioteca.
+- Historial de préstamos: varios por libro, todos devueltos salvo quizá el último.
+Con la misma --seed se obtiene siempre el mismo catálogo.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from itertools import accumulate
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.pool import StaticPool
+
+from database.db_config import Base
+from models.libraries import Library
+from models.author import Author
+from models.publisher import Publisher
+from models.theme import Theme
+from models.collection import Collection
+from models.location import Location
+from models.book import Book
+from models.borrow_book import BorrowBook
+
+BATCH = 20_000
+
+_FIRST = ["María", "José", "Carmen", "Antonio", "Lucía", "Manuel", "Ana", "Francisco", "Isabel",
+          "Javier", "Pilar", "Miguel", "Elena", "Ángel", "Rocío", "Jesús", "Teresa", "Íñigo",
+          "Begoña", "Raúl", "Nuria", "Sergio", "Marta", "Óscar", "Julia", "Tomás", "Irene"]
+_LAST = ["García", "Fernández", "González", "Rodríguez", "López", "Martínez", "Sánchez", "Pérez",
+         "Gómez", "Martín", "Jiménez", "Ruiz", "Hernández", "Díaz", "Moreno", "Muñoz", "Álvarez",
+         "Romero", "Alonso", "Gutiérrez", "Navarro", "Torres", "Domínguez", "Vázquez", "Ramos",
+         "Gil", "Ramírez", "Serrano", "Blanco", "Molina", "Morales", "Suárez", "Ortega", "Delgado",
+         "Castro", "Ortiz", "Rubio", "Marín", "Sanz", "Núñez", "Iglesias", "Medina", "Garrido"]
+_TITLE_A = ["El", "La", "Los", "Las", "Un", "Una", "Historia de", "Breve historia de",
+            "Manual de", "Cartas sobre", "Crónica de", "Memorias de", "Diccionario de"]
+_TITLE_B = ["jardín", "ciudad", "mar", "tiempo", "silencio", "camino", "sombra", "río", "noche",
+            "casa", "invierno", "guerra", "montaña", "biblioteca", "isla", "viaje", "cosmos",
+            "corazón", "frontera", "memoria", "música", "luz", "lengua", "mundo", "ciencia"]
+_TITLE_C = ["", "", "perdido", "olvidada", "del norte", "de los sueños", "en llamas",
+            "y otros relatos", "para principiantes", "en España", "de la Antigüedad",
+            "secreto", "infinito", "del siglo XX", "ilustrado", "(edición crítica)"]
+_THEMES = ["Novela", "Poesía", "Ensayo", "Historia", "Ciencia", "Filosofía", "Arte", "Viajes",
+           "Infantil", "Juvenil", "Biografía", "Cocina", "Religión", "Derecho", "Economía",
+           "Psicología", "Teatro", "Cómic", "Música", "Deporte", "Naturaleza", "Técnica",
+           "Medicina", "Política", "Idiomas", "Referencia", "Humor", "Mitología", "Fotografía",
+           "Arquitectura"]
+_PLACES = ["Salón", "Despacho", "Dormitorio", "Pasillo", "Buhardilla", "Sótano", "Estudio", "Biblioteca"]
+_FURNITURE = ["Librería", "Estantería", "Vitrina", "Armario", "Aparador", "Cómoda", "Baúl", "Mesa"]
+
+
+def _zipf_cum_weights(n: int, s: float) -> list[float]:
+    return list(accumulate(1.0 / (k ** s) for k in range(1, n + 1)))
+
+
+def _author_names(rnd, n: int):
+    """Nombres únicos (authors.name es UNIQUE); si se repite, se le añade un número."""
+    seen = set()
+    for i in range(n):
+        name = f"{rnd.choice(_FIRST)} {rnd.choice(_LAST)} {rnd.choice(_LAST)}"
+        if name in seen:
+            name = f"{name} ({i})"
+        seen.add(name)
+        yield name
+
+
+def _year(rnd):
+    if rnd.random() < 0.08:
+        return None, None
+    pub = min(2025, max(1850, int(rnd.gauss(1990, 22))))
+    if rnd.random() < 0.45:
+        return pub, None
+    return pub, min(2025, pub + int(rnd.expovariate(1 / 8)))
+
+
+def _title(rnd):
+    t = f"{rnd.choice(_TITLE_A)} {rnd.choice(_TITLE_B)} {rnd.choice(_TITLE_C)}".strip()
+    if rnd.random() < 0.3:
+        t += f" {rnd.randint(1, 12)}"
+    return t
+
+
+def _insert_batches(conn, table, rows, progress=None, label=""):
+    batch, done = [], 0
+    for r in rows:
+        batch.append(r)
+        if len(batch) == BATCH:
+            conn.execute(insert(table), batch)
+            done += len(batch)
+            batch = []
+            if progress:
+                progress(f"  {label}: {done:,}")
+    if batch:
+        conn.execute(insert(table), batch)
+        done += len(batch)
+    return done
+
+
+def generate(engine, books: int, libraries: int = 2, loan_ratio: float = 0.35,
+             zipf: float = 1.1, seed: int = 42, progress=print) -> dict:
+    """
+    Rellena una BD vacía. Devuelve el número de filas creadas por tabla.
+    loan_ratio: fracción de libros que se han prestado alguna vez.
+    """
+    rnd = random.Random(seed)
+    Base.metadata.create_all(engine)
+
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Book)).scalar_one():
+            raise ValueError("La BD ya tiene libros: usa una BD vacía.")
+
+    n_authors = max(50, books // 8)
+    n_publishers = min(5_000, max(20, books // 400))
+    counts = {}
+
+    with engine.begin() as conn:
+        counts["libraries"] = _insert_batches(conn, Library, (
+            {"id": i, "code": f"bench_{i}", "name": f"Biblioteca {i}"} for i in range(1, libraries + 1)))
+
+        counts["authors"] = _insert_batches(conn, Author, (
+            {"id": i, "name": name} for i, name in enumerate(_author_names(rnd, n_authors), 1)))
+        counts["publishers"] = _insert_batches(conn, Publisher, (
+            {"id": i, "name": f"Ediciones {rnd.choice(_LAST)} {i}"} for i in range(1, n_publishers + 1)))
+        counts["themes"] = _insert_batches(conn, Theme, (
+            {"id": i + 1, "name": name} for i, name in enumerate(_THEMES)))
+
+        # colecciones y ubicaciones: ids propios de cada biblioteca
+        coll_ids, loc_ids = {}, {}
+        colls, locs = [], []
+        for lib in range(1, libraries + 1):
+            coll_ids[lib] = []
+            for j in range(40):
+                colls.append({"id": len(colls) + 1, "library_id": lib, "name": f"Colección {j} B{lib}"})
+                coll_ids[lib].append(len(colls))
+            loc_ids[lib] = []
+            for place in _PLACES:
+                for furniture in _FURNITURE[:rnd.randint(3, len(_FURNITURE))]:
+                    for module in range(1, rnd.randint(2, 5)):
+                        for shelf in range(1, rnd.randint(3, 7)):
+                            locs.append({"id": len(locs) + 1, "library_id": lib,
+                                         "place": f"{place} B{lib}", "furniture": furniture,
+                                         "module": f"Módulo {module}", "shelf": shelf})
+                            loc_ids[lib].append(len(locs))
+        counts["collections"] = _insert_batches(conn, Collection, colls)
+        counts["locations"] = _insert_batches(conn, Location, locs)
+
+    author_cw = _zipf_cum_weights(n_authors, zipf)
+    author_ids = range(1, n_authors + 1)
+    theme_ids = range(1, len(_THEMES) + 1)
+
+    def book_rows():
+        # la primera biblioteca es la grande; el resto se reparte a partes iguales
+        lib_cw = list(accumulate([2.0] + [1.0] * (libraries - 1)))
+        for i in range(0, books, BATCH):
+            n = min(BATCH, books - i)
+            authors = rnd.choices(author_ids, cum_weights=author_cw, k=n)
+            libs = rnd.choices(range(1, libraries + 1), cum_weights=lib_cw, k=n)
+            for k in range(n):
+                lib = libs[k]
+                pub, edi = _year(rnd)
+                yield {
+                    "id": i + k + 1,
+                    "library_id": lib,
+                    "title": _title(rnd),
+                    "author_id": authors[k] if rnd.random() > 0.03 else None,
+                    "publisher_id": rnd.randint(1, n_publishers) if rnd.random() > 0.05 else None,
+                    "theme_id": rnd.choice(theme_ids),
+                    "location_id": rnd.choice(loc_ids[lib]) if rnd.random() > 0.1 else None,
+                    "collection_id": rnd.choice(coll_ids[lib]) if rnd.random() < 0.3 else None,
+                    "publication_year": pub,
+                    "edition_year": edi,
+                }
+
+    def loan_rows():
+        start = date(2015, 1, 1)
+        for book_id in range(1, books + 1):
+            if rnd.random() >= loan_ratio:
+                continue
+            day = start + timedelta(days=rnd.randint(0, 3000))
+            n = 1 + int(rnd.expovariate(0.8))
+            for k in range(n):
+                last = k == n - 1
+                yield {
+                    "book_id": book_id,
+                    "date_of_loan": day,
+                    "name_person": f"{rnd.choice(_FIRST)} {rnd.choice(_LAST)}",
+                    "returned": (not last) or rnd.random() < 0.8,
+                }
+                day += timedelta(days=rnd.randint(15, 400))
+
+    t0 = time.perf_counter()
+    with engine.begin() as conn:
+        counts["books"] = _insert_batches(conn, Book, book_rows(), progress, "libros")
+    with engine.begin() as conn:
+        counts["borrow_books"] = _insert_batches(conn, BorrowBook, loan_rows(), progress, "préstamos")
+    if progress:
+        progress(f"Libros y préstamos en {time.perf_counter() - t0:.1f}s")
+    return counts
+
+
+def write_books_excel(engine, path: str, rows: int, library_id: int = 1, seed: int = 7) -> int:
+    """
+    Excel con el formato de seed_books_from_excel a partir de nombres que ya
+    están en la BD (así un dry-run no crea nada). Devuelve las filas escritas.
+    """
+    import pandas as pd
+
+    rnd = random.Random(seed)
+    with engine.connect() as conn:
+        authors = conn.execute(select(Author.name).limit(5_000)).scalars().all()
+        publishers = conn.execute(select(Publisher.name).limit(1_000)).scalars().all()
+        themes = conn.execute(select(Theme.name)).scalars().all()
+        locs = conn.execute(
+            select(Location.place, Location.furniture, Location.module, Location.shelf)
+            .where(Location.library_id == library_id)
+        ).all()
+
+    data = []
+    for _ in range(rows):
+        pub, edi = _year(rnd)
+        place, furniture, module, shelf = rnd.choice(locs)
+        data.append({
+            "Título": _title(rnd),
+            "Autor": rnd.choice(authors),
+            "Editorial": rnd.choice(publishers),
+            "Temática": rnd.choice(themes),
+            "Ubicación": f"{place}/{furniture}/{module}/Balda {shelf}",
+            "Años": "" if pub is None else (f"{pub}/{edi}" if edi else str(pub)),
+        })
+    pd.DataFrame(data).to_excel(path, index=False)
+    return rows
+
+
+def make_engine(url: str):
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        return create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    return create_engine(url)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Catálogo sintético para pruebas de rendimiento.")
+    ap.add_argument("--url", required=True, help="BD vacía de destino (sqlite:///x.db, mysql+mysqlconnector://...)")
+    ap.add_argument("--books", type=int, default=100_000, help="Número de libros (10k - 5M)")
+    ap.add_argument("--libraries", type=int, default=2)
+    ap.add_argument("--loan-ratio", type=float, default=0.35, help="Fracción de libros prestados alguna vez")
+    ap.add_argument("--zipf", type=float, default=1.1, help="Exponente Zipf de libros por autor")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--excel", default=None, help="Además, escribe un Excel para seed_books_from_excel")
+    ap.add_argument("--excel-rows", type=int, default=2_000)
+    args = ap.parse_args()
+
+    engine = make_engine(args.url)
+    t0 = time.perf_counter()
+    counts = generate(engine, args.books, args.libraries, args.loan_ratio, args.zipf, args.seed)
+    print(" | ".join(f"{k}: {v:,}" for k, v in counts.items()))
+    print(f"Total: {time.perf_counter() - t0:.1f}s")
+
+    if args.excel:
+        write_books_excel(engine, args.excel, args.excel_rows)
+        print(f"Excel: {args.excel} ({args.excel_rows:,} filas)")
+
+
+if __name__ == "__main__":
+    main()
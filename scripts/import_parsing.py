@@ -0,0 +1,284 @@
+"""
+Parseo de años y ubicaciones para los seeders (Excel/CSV).
+
+- to_none, nz_str, nz_year, split_years, parse_location: las funciones por
+  celda de siempre (las del antiguo modo fila a fila de seed_books_from_excel):
+  son la referencia de lo que debe salir.
+- split_years_column(valores) y LocationParser(variante).parse_many(valores):
+  lo mismo sobre una columna entera con operaciones de texto de pandas
+  (str.split / str.contains / str.extractall con los patrones compilados).
+  Solo se parsea cada texto distinto una vez: miles de libros comparten la
+  misma balda, así que LocationParser recuerda lo ya visto entre bloques.
+
+Variantes de ubicación (cada seeder tenía su bucle, casi igual):
+  - "books":     seed_books_from_excel.parse_location (tramos "0" fuera, balda 0 -> None)
+  - "locations": seed_locations_from_excel (balda 0 se queda)
+  - "library2":  seed_locations_library2 (además "nan"/"none"/"null" -> None
+                 y las celdas así se descartan: devuelve None)
+"""
+import math
+import numbers
+import re
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+PARSE_CHUNK = 5000  # filas que los seeders en streaming parsean juntas
+
+# --------------------------
+# Por celda (referencia)
+# --------------------------
+def to_none(x):
+    if x is None: return None
+    if isinstance(x, float) and math.isnan(x): return None
+    s = str(x).strip()
+    return None if s == "" or s == "0" else x
+
+def nz_str(x, maxlen=255):
+    x = to_none(x)
+    if x is None:
+        return None
+    s = str(x).strip()
+    return s[:maxlen] if s else None
+
+def nz_year(x):
+    """
+    Converts x to year:
+    - If it's int/float -> int(x)
+    - If it's string -> searchs 4 digits (1500-2099). If not, 2 digits -> 19xx/20xx.
+    - '', '0', None -> None
+    """
+    x = to_none(x)
+    if x is None:
+        return None
+
+    # Numérico puro
+    if isinstance(x, numbers.Integral):
+        return int(x)
+    if isinstance(x, numbers.Real):
+        return int(x)  # 1974.0 -> 1974
+
+    # Texto
+    s = str(x).strip()
+
+    # Primero intenta 4 dígitos razonables (1500–2099, ajusta si quieres otro rango)
+    m = re.search(r"\b(1[5-9]\d{2}|20\d{2})\b", s)
+    if m:
+        return int(m.group(1))
+
+    # Si no hay 4 dígitos, intenta 2 dígitos y normaliza
+    m2 = re.search(r"\b(\d{2})\b", s)
+    if m2:
+        y = int(m2.group(1))
+        return 1900 + y if y >= 50 else 2000 + y
+
+    return None
+
+_YEAR_TOKENS = re.compile(r"(1[5-9]\d{2}|20\d{2}|\b\d{2}\b)")
+
+def split_years(value):
+    """
+    Separa una celda tipo '1974', '1974/2001', '1974-2001', '1974.0 / 2001.0', etc.
+    Devuelve (publication_year, edition_year)
+    """
+    v = to_none(value)
+    if v is None:
+        return (None, None)
+
+    s = str(v)
+    # Extrae hasta dos tokens que parezcan años (4 dígitos o 2 dígitos)
+    tokens = _YEAR_TOKENS.findall(s)
+    pub = nz_year(tokens[0]) if len(tokens) >= 1 else None
+    edi = nz_year(tokens[1]) if len(tokens) >= 2 else None
+    return (pub, edi)
+
+mod_re = re.compile(r"(m[oó]dulo|modulo|^m\d+$|^m[_\-\s]?\d+$)", re.IGNORECASE)
+shelf_hint_re = re.compile(r"(balda|estante|shelf)", re.IGNORECASE)
+
+def parse_location(text: Optional[str]) -> tuple[Optional[str], Optional[str], Optional[str], Optional[int]]:
+    text = to_none(text)
+    if text is None:
+        return (None, None, None, None)
+    parts = [p.strip() for p in str(text).split("/") if to_none(p)]
+    if not parts:
+        return (None, None, None, None)
+
+    place = nz_str(parts[0], 30)
+    rest = parts[1:]
+
+    shelf_token = None
+    if rest:
+        last = rest[-1]
+        if shelf_hint_re.search(last) or any(ch.isdigit() for ch in last):
+            shelf_token = last
+            rest = rest[:-1]
+
+    module_token = None
+    module_idx = None
+    for i, t in enumerate(rest):
+        if mod_re.search(t):
+            module_token = t; module_idx = i; break
+
+    furn_tokens = rest[:module_idx] if module_token is not None else rest
+    furniture = nz_str(" / ".join(furn_tokens) if furn_tokens else None, 30)
+    module = nz_str(module_token, 30)
+
+    shelf = None
+    if shelf_token:
+        digits = "".join(ch for ch in shelf_token if ch.isdigit())
+        shelf = int(digits) if digits and int(digits) != 0 else None
+
+    return (place, furniture, module, shelf)
+
+
+# --------------------------
+# Por columna (vectorizado)
+# --------------------------
+# mismos patrones, sin grupos de captura (str.contains avisa si los hay)
+_MOD = re.compile(r"(?:m[oó]dulo|modulo|^m\d+$|^m[_\-\s]?\d+$)", re.IGNORECASE)
+_SHELF_HINT = re.compile(r"(?:balda|estante|shelf)", re.IGNORECASE)
+
+_isdigit_class = None
+
+
+def _digit_class() -> str:
+    """Clase regex con los caracteres para los que str.isdigit() es True (lo que miraban los bucles)."""
+    global _isdigit_class
+    if _isdigit_class is None:
+        # \d (decimales Unicode) + los pocos "dígitos" que no lo son (², ①...)
+        extra = "".join(c for c in map(chr, range(0x110000)) if c.isdigit() and not c.isdecimal())
+        _isdigit_class = r"[\d" + re.escape(extra) + "]"
+    return _isdigit_class
+
+
+def split_years_column(values: Iterable) -> tuple[list, list]:
+    """split_years sobre una columna: (años de publicación, años de edición)."""
+    keys = [None if to_none(v) is None else str(v) for v in values]
+    uniques = [k for k in dict.fromkeys(keys) if k is not None]
+    parsed = {}
+    if uniques:
+        found = pd.Series(uniques, dtype=object).str.extractall(_YEAR_TOKENS)[0]
+        pos = found.index.get_level_values(0).to_numpy()
+        match = found.index.get_level_values(1).to_numpy()
+        pubs = np.full(len(uniques), None, dtype=object)
+        edis = np.full(len(uniques), None, dtype=object)
+        tokens = found.to_numpy(dtype=object)
+        years = {t: nz_year(t) for t in dict.fromkeys(tokens)}  # pocos tokens distintos
+        first, second = match == 0, match == 1
+        pubs[pos[first]] = [years[t] for t in tokens[first]]
+        edis[pos[second]] = [years[t] for t in tokens[second]]
+        parsed = {k: (p, e) for k, p, e in zip(uniques, pubs, edis)}
+    out = [parsed.get(k, (None, None)) if k is not None else (None, None) for k in keys]
+    return [p for p, _ in out], [e for _, e in out]
+
+
+def _location_key(value, variant: str):
+    """Texto que parsea cada variante (None = celda vacía: sin ubicación)."""
+    if variant == "books":
+        return None if to_none(value) is None else str(value)
+    if variant == "library2":
+        raw = str(value).strip()
+        return None if raw == "" or raw.lower() in ("nan", "none", "null") else raw
+    return None if value is None else str(value)
+
+
+def _clean_library2(x, maxlen=30):
+    if x is None:
+        return None
+    s = str(x).strip()
+    if s == "" or s.lower() in ("nan", "none", "null"):
+        return None
+    return s[:maxlen]
+
+
+def _parse_unique(raws: list, variant: str) -> list:
+    """Parsea textos distintos de una vez (pandas): lista de (place, furniture, module, shelf)."""
+    n = len(raws)
+    tok = pd.Series(raws, dtype=object).str.split("/").explode().str.strip()
+    keep = (tok != "") & tok.notna()
+    if variant == "books":
+        keep &= tok != "0"
+    tok = tok[keep]
+
+    rows = tok.index.to_numpy(dtype=np.int64)
+    t = tok.to_numpy(dtype=object)
+    ts = pd.Series(t, dtype=object)
+    pos = ts.groupby(rows).cumcount().to_numpy()
+    size = np.bincount(rows, minlength=n)[rows]
+
+    # balda: último tramo (si hay más de uno) con "balda/estante/shelf" o algún dígito
+    shelf_mask = (pos == size - 1) & (size >= 2)
+    last = ts[shelf_mask]
+    shelf_mask[shelf_mask] = (last.str.contains(_SHELF_HINT)
+                              | last.str.contains(_digit_class(), regex=True)).to_numpy(dtype=bool)
+    has_shelf = np.zeros(n, dtype=np.int64)
+    has_shelf[rows[shelf_mask]] = 1
+
+    # módulo: primer tramo intermedio que lo parezca; mueble: lo anterior (o todo el resto)
+    rest = (pos >= 1) & (pos < size - has_shelf[rows])
+    mod_mask = rest.copy()
+    mod_mask[rest] = ts[rest].str.contains(_MOD).to_numpy(dtype=bool)
+    mod_pos = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(mod_pos, rows[mod_mask], pos[mod_mask])
+    mod_mask &= pos == mod_pos[rows]
+    furn_mask = rest & (pos < mod_pos[rows])
+
+    place = np.full(n, None, dtype=object)
+    place[rows[pos == 0]] = t[pos == 0]
+    module = np.full(n, None, dtype=object)
+    module[rows[mod_mask]] = t[mod_mask]
+    furniture = np.full(n, None, dtype=object)
+    if furn_mask.any():
+        # " / ".join por fila: los tramos ya van en orden, se suman con su separador
+        f_rows, f_tok = rows[furn_mask], t[furn_mask]
+        starts = np.flatnonzero(np.r_[True, f_rows[1:] != f_rows[:-1]])
+        sep = np.full(len(f_tok), " / ", dtype=object)
+        sep[starts] = ""
+        furniture[f_rows[starts]] = np.add.reduceat(sep + f_tok, starts)
+    shelf = np.full(n, None, dtype=object)
+    if shelf_mask.any():
+        digits = ts[shelf_mask].str.replace("[^" + _digit_class()[1:], "", regex=True)
+        shelf[rows[shelf_mask]] = digits.to_numpy(dtype=object)
+
+    out = []
+    for p, f, m, d in zip(place, furniture, module, shelf):
+        if p is None:
+            out.append((None, None, None, None))
+            continue
+        if variant == "books":
+            out.append((p[:30], f[:30] if f else None, m[:30] if m else None,
+                        int(d) if d and int(d) != 0 else None))
+        elif variant == "library2":
+            out.append((_clean_library2(p), _clean_library2(f), _clean_library2(m), int(d) if d else None))
+        else:
+            out.append((p[:30], f[:30] if f else None, m[:30] if m else None, int(d) if d else None))
+    return out
+
+
+class LocationParser:
+    """
+    Ubicaciones de una columna -> (place, furniture, module, shelf), como los
+    bucles de cada seeder (ver variantes arriba). Recuerda los textos ya
+    parseados: con streaming, cada bloque solo parsea lo que no había visto.
+    """
+
+    MAX_CACHE = 200_000
+
+    def __init__(self, variant: str = "books"):
+        if variant not in ("books", "locations", "library2"):
+            raise ValueError(f"Variante de ubicación desconocida: {variant!r}")
+        self.variant = variant
+        self._cache: dict[str, tuple] = {}
+
+    def parse_many(self, values: Iterable) -> list:
+        """Una tupla por valor; None (solo "library2") = celda a descartar."""
+        keys = [_location_key(v, self.variant) for v in values]
+        missing = [k for k in dict.fromkeys(keys) if k is not None and k not in self._cache]
+        if missing:
+            if len(self._cache) + len(missing) > self.MAX_CACHE:
+                self._cache.clear()
+            self._cache.update(zip(missing, _parse_unique(missing, self.variant)))
+        empty = None if self.variant == "library2" else (None, None, None, None)
+        cache = self._cache
+        return [cache[k] if k is not None else empty for k in keys]
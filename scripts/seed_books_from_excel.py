@@ -1,10 +1,12 @@
 import argparse
-import re, math, numbers
-import pandas as pd
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from typing import Optional, Tuple
 
 from database.db_config import SessionLocal
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, func, insert, update, bindparam
 from sqlalchemy.exc import SQLAlchemyError
 
 from models.author import Author
@@ -13,277 +15,364 @@ from models.theme import Theme
 from models.collection import Collection
 from models.location import Location
 from models.book import Book
+from database.catalog_version import bump_catalog_version, mark_bulk
+from scripts.sheet_stream import chunked, count_rows, pick_column, read_rows, sheet_names
 
 # --------------------------
-# Standardization helpers
+# Standardization helpers / Parse Location
 # --------------------------
-def to_none(x):
-    if x is None: return None
-    if isinstance(x, float) and math.isnan(x): return None
-    s = str(x).strip()
-    return None if s == "" or s == "0" else x
-
-def nz_str(x, maxlen=255):
-    x = to_none(x)
-    if x is None:
-        return None
-    s = str(x).strip()
-    return s[:maxlen] if s else None
-
-def nz_year(x):
-    """
-    Converts x to year:
-    - If it's int/float -> int(x)
-    - If it's string -> searchs 4 digits (1500-2099). If not, 2 digits -> 19xx/20xx.
-    - '', '0', None -> None
-    """
-    x = to_none(x)
-    if x is None:
-        return None
-
-    # Numérico puro
-    if isinstance(x, numbers.Integral):
-        return int(x)
-    if isinstance(x, numbers.Real):
-        return int(x)  # 1974.0 -> 1974
-
-    # Texto
-    s = str(x).strip()
-
-    # Primero intenta 4 dígitos razonables (1500–2099, ajusta si quieres otro rango)
-    m = re.search(r"\b(1[5-9]\d{2}|20\d{2})\b", s)
-    if m:
-        return int(m.group(1))
-
-    # Si no hay 4 dígitos, intenta 2 dígitos y normaliza
-    m2 = re.search(r"\b(\d{2})\b", s)
-    if m2:
-        y = int(m2.group(1))
-        return 1900 + y if y >= 50 else 2000 + y
-
-    return None
-    
-def split_years(value):
+# por columna (vectorizado), en scripts/import_parsing.py
+from scripts.import_parsing import PARSE_CHUNK, LocationParser, nz_str, split_years_column
+
+# --------------------------
+# Main insertion
+# --------------------------
+def insert_books_from_excel(path: str, sheet: Optional[str], dry: bool, create_missing_locations: bool,
+                            library_id: Optional[int] = None):
     """
-    Separa una celda tipo '1974', '1974/2001', '1974-2001', '1974.0 / 2001.0', etc.
-    Devuelve (publication_year, edition_year)
+    Importación por defecto: la del modo masivo (bulk_insert_books_from_excel).
+    Antes iba fila a fila (df.iterrows(), un SELECT por tabla y fila y un
+    flush por alta); el modo masivo da los mismos libros, ids y salida de dry-run.
     """
-    v = to_none(value)
-    if v is None:
-        return (None, None)
+    return bulk_insert_books_from_excel(path, sheet, dry, create_missing_locations, library_id=library_id)
 
-    s = str(v)
-    # Extrae hasta dos tokens que parezcan años (4 dígitos o 2 dígitos)
-    tokens = re.findall(r"(1[5-9]\d{2}|20\d{2}|\b\d{2}\b)", s)
-    pub = nz_year(tokens[0]) if len(tokens) >= 1 else None
-    edi = nz_year(tokens[1]) if len(tokens) >= 2 else None
-    return (pub, edi)
 
 # --------------------------
-# Parse Location
+# Bulk import (--bulk, y el modo por defecto)
 # --------------------------
-mod_re = re.compile(r"(m[oó]dulo|modulo|^m\d+$|^m[_\-\s]?\d+$)", re.IGNORECASE)
-shelf_hint_re = re.compile(r"(balda|estante|shelf)", re.IGNORECASE)
-
-def parse_location(text: Optional[str]) -> tuple[Optional[str], Optional[str], Optional[str], Optional[int]]:
-    text = to_none(text)
-    if text is None:
-        return (None, None, None, None)
-    parts = [p.strip() for p in str(text).split("/") if to_none(p)]
-    if not parts:
-        return (None, None, None, None)
-
-    place = nz_str(parts[0], 30)
-    rest = parts[1:]
-
-    shelf_token = None
-    if rest:
-        last = rest[-1]
-        if shelf_hint_re.search(last) or any(ch.isdigit() for ch in last):
-            shelf_token = last
-            rest = rest[:-1]
-
-    module_token = None
-    module_idx = None
-    for i, t in enumerate(rest):
-        if mod_re.search(t):
-            module_token = t; module_idx = i; break
-
-    furn_tokens = rest[:module_idx] if module_token is not None else rest
-    furniture = nz_str(" / ".join(furn_tokens) if furn_tokens else None, 30)
-    module = nz_str(module_token, 30)
-
-    shelf = None
-    if shelf_token:
-        digits = "".join(ch for ch in shelf_token if ch.isdigit())
-        shelf = int(digits) if digits and int(digits) != 0 else None
-
-    return (place, furniture, module, shelf)
+# Mismo resultado que la importación fila a fila de antes (get-or-create de
+# autores, editoriales... y un flush por libro), pero:
+#   - el fichero se lee en streaming (sheet_stream) y se procesa por bloques
+#   - autores, editoriales, temas, colecciones y ubicaciones se leen UNA vez a
+#     diccionarios (en vez de un SELECT por fila y tabla)
+#   - los que faltan se crean con INSERT multi-fila, en el mismo orden en que
+#     aparecen en el Excel (mismos ids que creando de uno en uno); en
+#     dry-run no se insertan: se les da el id que recibirían (max(id) + 1...)
+#   - los libros van en lotes de BULK_BATCH filas con un commit cada
+#     BULK_COMMIT_EVERY lotes. conn.execute(insert(T), filas) manda INSERT
+#     multi-fila (insertmanyvalues de SQLAlchemy) con el SQL compilado una sola
+#     vez; insert().values([...]) recompilaría un VALUES enorme en cada lote
+BULK_BATCH = 1000
+BULK_COMMIT_EVERY = 20
+
+
+def _name_key(dialect: str):
+    """Cómo compara la BD dos nombres con '=' (lo que hacía get_or_create_by_name)."""
+    if dialect in ("mysql", "mariadb"):
+        # collation *_ci: sin mayúsculas ni acentos y sin espacios finales (PAD SPACE)
+        from controllers.catalog_index import fold_ci
+        return lambda v: fold_ci(v.rstrip(" ")) if isinstance(v, str) else v
+    return lambda v: v
+
+
+class _LookupMap:
+    """Valores de una tabla de referencia -> id, cargados una vez."""
+
+    def __init__(self, conn, Model, fields: tuple, key, library_id: Optional[int]):
+        self.Model = Model
+        self.fields = fields
+        self.key = key
+        # colecciones y ubicaciones son de una biblioteca (sin --library-id: todas, como antes)
+        self.library_id = library_id if hasattr(Model, "library_id") else None
+        self.ids: dict[tuple, int] = {}
+        self.pending: dict[tuple, tuple] = {}  # que faltan, en orden de aparición
+        self._last_dry_id = 0  # dry-run: último id dado sin insertar
+        self.dry_values: dict[int, tuple] = {}  # dry-run: id -> valores de los no insertados
+        self._load(conn)
+
+    def _where(self, stmt):
+        if self.library_id is not None:
+            stmt = stmt.where(self.Model.library_id == self.library_id)
+        return stmt
+
+    def _load(self, conn, after_id: int = 0):
+        cols = [getattr(self.Model, f) for f in self.fields]
+        stmt = self._where(select(self.Model.id, *cols).where(self.Model.id > after_id)).order_by(self.Model.id)
+        for row in conn.execute(stmt):
+            self.ids.setdefault(self._key(row[1:]), row[0])  # duplicados: el primero
+
+    def _key(self, values) -> tuple:
+        return tuple(self.key(v) for v in values)
+
+    def want(self, values: tuple):
+        k = self._key(values)
+        if k not in self.ids and k not in self.pending:
+            self.pending[k] = values
+
+    def get(self, values: tuple) -> Optional[int]:
+        return self.ids.get(self._key(values))
+
+    def create_pending(self, conn, library_id: Optional[int], dry: bool = False) -> int:
+        """
+        Inserta los que faltan en bloque y recoge sus ids. Devuelve cuántos.
+        dry=True: no escribe nada; les da los ids que les daría el INSERT.
+        """
+        if not self.pending:
+            return 0
+        last_id = conn.execute(select(func.max(self.Model.id))).scalar() or 0
+        if dry:
+            last_id = max(last_id, self._last_dry_id)
+            for new_id, (k, values) in enumerate(self.pending.items(), start=last_id + 1):
+                self.ids[k] = self._last_dry_id = new_id
+                self.dry_values[new_id] = values
+            n = len(self.pending)
+            self.pending.clear()
+            return n
+        extra = {"library_id": library_id} if hasattr(self.Model, "library_id") else {}
+        rows = [{**dict(zip(self.fields, v)), **extra} for v in self.pending.values()]
+        for k in range(0, len(rows), BULK_BATCH):
+            conn.execute(insert(self.Model), rows[k:k + BULK_BATCH])
+        self._load(conn, after_id=last_id)
+        n = len(self.pending)
+        self.pending.clear()
+        return n
+
+
+def _book_columns(headers: list[str]) -> dict:
+    """Posición de cada columna del Excel (None si no está)."""
+    cols = {
+        "title": pick_column(headers, "título", "titulo", "title"),
+        "author": pick_column(headers, "autor", "author"),
+        "publisher": pick_column(headers, "editorial", "publisher"),
+        "collection": pick_column(headers, "colección", "coleccion", "collection"),
+        "location": pick_column(headers, "ubicación", "ubicacion", "location"),
+        "theme": pick_column(headers, "temática", "tematica", "theme"),
+        "years": pick_column(headers, "añopublicación_añoedición", "añopublicacion_añoedicion", "años", "years", "anio", "año"),
+    }
+    if cols["title"] is None:
+        raise KeyError("Falta la columna de Título (título/titulo/title).")
+    return cols
+
+
+def _book_records(rows, cols: dict, first: int = 0):
+    """(fila, registro) de cada fila; first = número de la primera fila (para los mensajes)."""
+    def get(values, col):
+        return values[col] if col is not None else None
+
+    parser = LocationParser("books")  # recuerda las ubicaciones entre bloques
+    i = first
+    for block in chunked(rows, PARSE_CHUNK):
+        # años y ubicaciones por columna (vectorizado), el resto fila a fila
+        locs = parser.parse_many([get(values, cols["location"]) for values in block])
+        pubs, edis = split_years_column([get(values, cols["years"]) for values in block])
+        for values, loc, pub, edi in zip(block, locs, pubs, edis):
+            title = nz_str(values[cols["title"]])
+            if not title:
+                yield i, None
+            else:
+                yield i, (title, nz_str(get(values, cols["author"])), nz_str(get(values, cols["publisher"])),
+                          nz_str(get(values, cols["theme"])), nz_str(get(values, cols["collection"])),
+                          loc if any([loc[0], loc[1], loc[2], loc[3] is not None]) else None,
+                          pub, edi)
+            i += 1
+
+
+def iter_book_records(path: str, sheet: Optional[str]):
+    """
+    Filas del Excel/CSV ya normalizadas, sin cargar el fichero entero (ver
+    scripts/sheet_stream.py). Produce (fila, registro) con registro =
+    (title, author, publisher, theme, collection, location|None, pub_year, edi_year),
+    o (fila, None) si el título está vacío. Mismas reglas que load_books_excel.
+    """
+    headers, rows = read_rows(path, sheet)
+    yield from _book_records(rows, _book_columns(headers))
 
-# --------------------------
-# DAOs simple (get-or-create)
-# --------------------------
-def get_or_create_by_name(session, Model, name_field: str, value: Optional[str]):
-    value = nz_str(value)
-    if value is None:
-        return None
-    stmt = select(Model).where(getattr(Model, name_field) == value)
-    obj = session.execute(stmt).scalar_one_or_none()
-    if obj:
-        return obj
-    obj = Model(**{name_field: value})
-    session.add(obj)
-    session.flush()
-    return obj
-
-
-def find_location(session, place, furniture, module, shelf):
-    def cond(col, val):
-        return (col.is_(None) if val is None else col == val)
-    
-    stmt = (
-        select(Location)
-        .where(
-            and_(
-                cond(Location.place, place),
-                cond(Location.furniture, furniture),
-                cond(Location.module, module),
-                cond(Location.shelf, shelf)
-            )
-        )
-    )
-    return session.execute(stmt).scalar_one_or_none()
-
-def get_or_create_location(session, place, furniture, module, shelf, allow_create: bool):
-    loc = find_location(session, place, furniture, module, shelf)
-    if loc:
-        return loc
-    if not allow_create:
-        return None
-    loc = Location(place=place, furniture=furniture, module= module, shelf=shelf)
-    session.add(loc)
-    session.flush()
-    return loc
-
-def book_exists_by_title(session, title: str) -> bool:
-    stmt = select(func.count()).select_from(Book).where(Book.title == title)
-    return session.execute(stmt).scalar_one() > 0
 
 # --------------------------
-# Load Excel
+# Parallel parse (--workers)
 # --------------------------
-def load_books_excel(path: str, sheet: str | None) -> pd.DataFrame:
-    df = pd.read_excel(path, sheet_name=(sheet if sheet is not None else 0))
-    cols = {c.lower().strip(): c for c in df.columns}
-
-    def pick(*options):
-        for k in options:
-            if k in cols:
-                return cols[k]
-        return None
-
-    col_title = pick("título", "titulo", "title")
-    if not col_title:
-        raise KeyError("Falta la columna de Título (título/titulo/title).")
+# Leer y normalizar el Excel es CPU pura (openpyxl convierte celda a celda):
+# con --workers N cada hoja se parte en tramos de filas que leen N procesos
+# (sheet_stream solo convierte las filas del tramo). Los resultados se juntan
+# EN ORDEN en el proceso principal, que es el único que busca/crea autores,
+# ubicaciones... e inserta: mismos ids y misma salida que sin --workers.
+PART_MIN_ROWS = 2000  # por debajo no compensa arrancar otro proceso
+PART_MAX_ROWS = 20_000  # cada tramo vuelve entero al proceso principal: acota su memoria
+
+
+def _plan_parts(path: str, sheets: list, workers: int) -> list[tuple]:
+    """
+    (hoja, desde, hasta) de cada tramo. Hojas de tamaño desconocido: (hoja,
+    None, None), que se leen en streaming en el proceso principal.
+    """
+    parts = []
+    for sheet in sheets:
+        n = count_rows(path, sheet)
+        if n is None:
+            parts.append((sheet, None, None))
+            continue
+        if n == 0:
+            continue
+        k = max(1, min(workers, n // PART_MIN_ROWS), -(-n // PART_MAX_ROWS))
+        bounds = [n * j // k for j in range(k + 1)]
+        parts.extend((sheet, bounds[j], bounds[j + 1]) for j in range(k))
+    return parts
+
+
+def _parse_part(path: str, sheet: Optional[str], start: int, stop: int):
+    """
+    En un proceso hijo: registros de un tramo y cuántas filas vacías tiene al
+    final (solo cuentan si la hoja sigue con datos en el tramo siguiente).
+    """
+    headers, rows = read_rows(path, sheet, rows=(start, stop))
+    n = len(rows)
+    while n and all(v is None for v in rows[n - 1]):
+        n -= 1
+    return list(_book_records(rows[:n], _book_columns(headers), first=start)), len(rows) - n
 
-    col_author = pick("autor", "author")
-    col_pub    = pick("editorial", "publisher")
-    col_coll   = pick("colección", "coleccion", "collection")
-    col_loc    = pick("ubicación", "ubicacion", "location")
-    col_theme  = pick("temática", "tematica", "theme")
-    col_years  = pick("añopublicación_añoedición", "añopublicacion_añoedicion", "años", "years", "anio", "año")
-
-    out = pd.DataFrame({
-        "title": df[col_title].apply(nz_str),
-        "author_name": df[col_author].apply(nz_str) if col_author else None,
-        "publisher_name": df[col_pub].apply(nz_str) if col_pub else None,
-        "collection_name": df[col_coll].apply(nz_str) if col_coll else None,
-        "location_raw": df[col_loc] if col_loc else None,
-        "theme_name": df[col_theme].apply(nz_str) if col_theme else None,
-        "years_raw": df[col_years] if col_years else None,
-    })
-
-    # Años: separar si viene combinado, y mapear “0” a None
-    pubs, eds = [], []
-    years_series = out["years_raw"] if "years_raw" in out.columns else None
-
-    if years_series is not None:
-        for v in years_series:
-            y1, y2 = split_years(v)
-            pubs.append(y1); eds.append(y2)
-    else:
-        pubs = [None] * len(out); eds = [None] * len(out)
-
-    out["publication_year"] = pubs
-    out["edition_year"] = eds
-    return out
 
+def iter_workbook_records(path: str, sheets: list, workers: int = 1):
+    """
+    Como iter_book_records pero de varias hojas (la fila va como "hoja:fila"
+    si hay más de una) y, con workers > 1, leyendo en paralelo.
+    """
+    def label(sheet, i):
+        return f"{sheet}:{i}" if len(sheets) > 1 else i
+
+    parts = _plan_parts(path, sheets, workers) if workers > 1 else [(sh, None, None) for sh in sheets]
+    if workers <= 1 or len(parts) <= 1:
+        for sheet in sheets:
+            for i, r in iter_book_records(path, sheet):
+                yield label(sheet, i), r
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # como mucho workers + 1 tramos (de PART_MAX_ROWS filas) en vuelo:
+        # la memoria no crece con el fichero
+        def submit(part):
+            return part, None if part[1] is None else pool.submit(_parse_part, path, *part)
+
+        todo = iter(parts)
+        running = deque(submit(part) for part in islice(todo, workers + 1))
+        blank, prev_sheet = [], object()
+        while running:
+            (sheet, start, stop), fut = running.popleft()
+            running.extend(submit(part) for part in islice(todo, 1))
+            if fut is None:  # tamaño desconocido: en streaming, aquí mismo
+                blank, prev_sheet = [], sheet
+                for i, r in iter_book_records(path, sheet):
+                    yield label(sheet, i), r
+                continue
+            records, trailing = fut.result()
+            if sheet != prev_sheet:
+                blank, prev_sheet = [], sheet  # las vacías del final de la hoja anterior no cuentan
+            if records:
+                for i in blank:
+                    yield label(sheet, i), None
+                blank = []
+                for i, r in records:
+                    yield label(sheet, i), r
+            if trailing:
+                blank.extend(range(stop - trailing, stop))
+
+
+def _lookup_maps(conn, key, library_id: Optional[int]) -> dict:
+    return {
+        "authors": _LookupMap(conn, Author, ("name",), key, library_id),
+        "publishers": _LookupMap(conn, Publisher, ("name",), key, library_id),
+        "themes": _LookupMap(conn, Theme, ("name",), key, library_id),
+        "collections": _LookupMap(conn, Collection, ("name",), key, library_id),
+        "locations": _LookupMap(conn, Location, ("place", "furniture", "module", "shelf"), key, library_id),
+    }
 
-# --------------------------
-# Main insertion
-# --------------------------
-def insert_books_from_excel(path: str, sheet: Optional[str], dry: bool, create_missing_locations: bool):
-    df = load_books_excel(path, sheet)
+
+def _create_missing(conn, maps: dict, chunk, create_missing_locations: bool, library_id, created: dict,
+                    dry: bool = False):
+    """Crea en bloque los autores, editoriales... del bloque que aún no existen (dry: sin escribir)."""
+    for _i, r in chunk:
+        if r is None:
+            continue
+        for table, value in zip(("authors", "publishers", "themes", "collections"), r[1:5]):
+            if value is not None:
+                maps[table].want((value,))
+        if r[5] is not None and create_missing_locations:
+            maps["locations"].want(r[5])
+    for table, m in maps.items():
+        created[table] += m.create_pending(conn, library_id, dry)
+
+
+def _book_values(maps: dict, r: tuple) -> dict:
+    """Registro de iter_book_records -> columnas de books (con los ids ya resueltos)."""
+    title, author, publisher, theme, collection, loc, pub, edi = r
+    return {
+        "title": title,
+        "author_id": maps["authors"].get((author,)) if author else None,
+        "publisher_id": maps["publishers"].get((publisher,)) if publisher else None,
+        "theme_id": maps["themes"].get((theme,)) if theme else None,
+        "collection_id": maps["collections"].get((collection,)) if collection else None,
+        "location_id": maps["locations"].get(loc) if loc else None,
+        "publication_year": pub,
+        "edition_year": edi,
+    }
+
+
+def bulk_insert_books_from_excel(path: str, sheet: Optional[str], dry: bool, create_missing_locations: bool,
+                                 library_id: Optional[int] = None, batch_size: int = BULK_BATCH,
+                                 workers: int = 1, all_sheets: bool = False):
+    """
+    Modo masivo. library_id: biblioteca de los libros (obligatorio salvo en
+    dry-run); también acota la búsqueda de colecciones y ubicaciones.
+    El fichero se procesa en streaming, bloque a bloque de batch_size filas
+    (leer -> normalizar -> resolver ids -> insertar): la memoria no crece con
+    el tamaño del Excel y los primeros libros entran enseguida.
+    workers > 1: leer y normalizar en paralelo (ver iter_workbook_records);
+    all_sheets: todas las hojas del libro, en orden, en vez de solo sheet.
+    El dry-run no escribe nada e imprime lo mismo que la importación fila a
+    fila de antes (con los ids que recibirían los autores... nuevos).
+    """
+    if library_id is None and not dry:
+        raise ValueError("Hace falta --library-id para insertar.")
+    t0 = time.perf_counter()
+    created = {"authors": 0, "publishers": 0, "themes": 0, "collections": 0, "locations": 0}
     inserted_books = 0
     skipped_books = 0
-    created = {"authors": 0, "publishers": 0, "themes": 0, "collections": 0, "locations": 0}
+    total_rows = 0
 
     with SessionLocal() as s:
+        mark_bulk(s)  # Core: el contador se incrementa a mano (bump_catalog_version)
         try:
-            for i, row in df.iterrows():
-                title = nz_str(row["title"])
-                if not title:
-                    print(f"[SKIP] Fila {i}: título vacío -> omitida")
-                    skipped_books += 1
-                    continue
-
-                author = get_or_create_by_name(s, Author, "name", row.get("author_name") if "author_name" in row else None)
-                publisher = get_or_create_by_name(s, Publisher, "name", row.get("publisher_name") if "publisher_name" in row else None)
-                theme = get_or_create_by_name(s, Theme, "name", row.get("theme_name") if "theme_name" in row else None)
-                collection = get_or_create_by_name(s, Collection, "name", row.get("collection_name") if "collection_name" in row else None)
-
-                # count of creted ones
-                # (opcional)
-
-                # Ubicación opcional
-                location = None
-                if "location_raw" in row:
-                    place, furniture, module, shelf = parse_location(row["location_raw"])
-                    if any([place, furniture, module, shelf is not None]):
-                        location = get_or_create_location(s, place, furniture, module, shelf, allow_create=create_missing_locations)
-
-                book = Book(
-                    title=title,  # ya normalizado con nz_str
-                    author_id=(author.id if author else None),
-                    publisher_id=(publisher.id if publisher else None),
-                    theme_id=(theme.id if theme else None),
-                    collection_id=(collection.id if collection else None),
-                    location_id=(location.id if location else None),
-                    publication_year=nz_year(row.get("publication_year")),
-                    edition_year=nz_year(row.get("edition_year")),
-                )
-
-
-                if dry:
-                    print("[DRY] Would Insert BOOK:", {
-                        "title": book.title,
-                        "author_id": book.author_id,
-                        "publisher_id": book.publisher_id,
-                        "theme_id": book.theme_id,
-                        "collection_id": book.collection_id,
-                        "location_id": book.location_id,
-                        "publication_year": book.publication_year,
-                        "edition_year": book.edition_year,
-                    })
-                    inserted_books += 1
-                else:
-                    s.add(book)
+            conn = s.connection()
+            key = _name_key(conn.dialect.name)
+            maps = _lookup_maps(conn, key, library_id)
+            batches = 0
+
+            sheets = sheet_names(path) if all_sheets else [sheet]
+            for chunk in chunked(iter_workbook_records(path, sheets, workers), batch_size):
+                total_rows += len(chunk)
+
+                # 1) lo que falta en este bloque, en orden de aparición, creado en bloque
+                _create_missing(conn, maps, chunk, create_missing_locations, library_id, created, dry)
+
+                # 2) libros del bloque
+                books = []
+                for i, r in chunk:
+                    if r is None:
+                        print(f"[SKIP] Fila {i}: título vacío -> omitida")
+                        skipped_books += 1
+                        continue
+                    book = _book_values(maps, r)
+                    if dry:
+                        print("[DRY] Would Insert BOOK:", book)
+                    else:
+                        books.append({"library_id": library_id, **book})
                     inserted_books += 1
 
-            if not dry:
+                if books:
+                    conn.execute(insert(Book), books)
+                    batches += 1
+                    if batches % BULK_COMMIT_EVERY == 0:
+                        # insert() de Core: el hook del ORM no lo ve
+                        bump_catalog_version(conn, {library_id})
+                        s.commit()
+                        conn = s.connection()
+
+            if dry:
+                s.rollback()  # nada que deshacer: solo se ha leído
+            else:
+                bump_catalog_version(conn, {library_id})
                 s.commit()
 
-        except Exception as e:
+        except Exception:
             s.rollback()
             raise
 
@@ -291,10 +380,163 @@ def insert_books_from_excel(path: str, sheet: Optional[str], dry: bool, create_m
         "inserted_books": inserted_books,
         "skipped_books": skipped_books,
         "created": created,
-        "total_rows": len(df),
+        "total_rows": total_rows,
         "mode": "DRY-RUN" if dry else "INSERT",
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+# --------------------------
+# Re-import (--reimport)
+# --------------------------
+# Volver a importar un Excel ya importado (corregido o ampliado) sin duplicar.
+# No hay clave única en books (los ejemplares se repiten) ni un id de origen
+# en el Excel, así que cada fila se empareja con un libro de la biblioteca
+# por pasadas, de la más estricta a la más laxa (cada libro, una sola vez):
+#   1) mismo contenido (todos los campos): sin cambios
+#   2) mismo (título, autor), sin numerar repeticiones: cambian otros campos
+#   3) solo con fix_authors (--fix-authors): mismo título y resto de campos,
+#      otro autor -> autor corregido
+# Nunca se empareja sin el título: un Excel con parte de la biblioteca (u otra
+# hoja de la misma) no debe reescribir libros distintos del mismo autor.
+# Los cambios de título (mayúsculas/acentos) y de autor se listan uno a uno;
+# lo que no empareja es un alta. Los libros de la BD que ya no están en el Excel no se borran (pueden
+# tener préstamos): solo se cuentan. El título se compara como la BD (_name_key).
+# Solo se escribe lo que cambia: INSERT multi-fila para las altas y UPDATE por
+# id (executemany) para los cambios.
+_BOOK_FIELDS = ("title", "author_id", "publisher_id", "theme_id", "collection_id",
+                "location_id", "publication_year", "edition_year")
+
+
+def _pair_books(rows, books, match_key):
+    """
+    Empareja filas del Excel [(fila, contenido)] con libros de la BD
+    [(id, contenido)] de igual match_key(contenido), por orden de fila y de id.
+    Devuelve (parejas [(fila, contenido, id, contenido_bd)], filas sin pareja, libros sin pareja).
+    """
+    pool: dict[tuple, deque] = {}
+    for book in books:
+        pool.setdefault(match_key(book[1]), deque()).append(book)
+    pairs, rest = [], []
+    for row in rows:
+        q = pool.get(match_key(row[1]))
+        if q:
+            pairs.append((*row, *q.popleft()))
+        else:
+            rest.append(row)
+    return pairs, rest, sorted(b for q in pool.values() for b in q)
+
+
+def reimport_books_from_excel(path: str, sheet: Optional[str], dry: bool, create_missing_locations: bool,
+                              library_id: int, workers: int = 1, all_sheets: bool = False,
+                              batch_size: int = BULK_BATCH, fix_authors: bool = False):
+    """
+    Re-importación idempotente de los libros de library_id: inserta los que
+    faltan, actualiza los que han cambiado y no toca el resto (volver a
+    ejecutarla con el mismo fichero no escribe nada).
+    fix_authors: emparejar también libros iguales salvo el autor (autor corregido).
+    """
+    if library_id is None:
+        raise ValueError("--reimport necesita --library-id.")
+    t0 = time.perf_counter()
+    created = {"authors": 0, "publishers": 0, "themes": 0, "collections": 0, "locations": 0}
+    skipped_books = 0
+    total_rows = 0
+
+    with SessionLocal() as s:
+        mark_bulk(s)  # Core: el contador se incrementa a mano (bump_catalog_version)
+        try:
+            conn = s.connection()
+            key = _name_key(conn.dialect.name)
+            maps = _lookup_maps(conn, key, library_id)
+
+            # 1) Excel -> [(fila, contenido)], resolviendo/creando autores... por bloques
+            rows = []
+            sheets = sheet_names(path) if all_sheets else [sheet]
+            for chunk in chunked(iter_workbook_records(path, sheets, workers), batch_size):
+                total_rows += len(chunk)
+                _create_missing(conn, maps, chunk, create_missing_locations, library_id, created, dry)
+                for i, r in chunk:
+                    if r is None:
+                        print(f"[SKIP] Fila {i}: título vacío -> omitida")
+                        skipped_books += 1
+                        continue
+                    book = _book_values(maps, r)
+                    rows.append((i, tuple(book[f] for f in _BOOK_FIELDS)))
+
+            # 2) BD -> [(id, contenido)], en una consulta
+            cols = [getattr(Book, f) for f in _BOOK_FIELDS]
+            stmt = select(Book.id, *cols).where(Book.library_id == library_id).order_by(Book.id)
+            books = [(r[0], tuple(r[1:])) for r in conn.execute(stmt)]
+
+            # 3) emparejar por pasadas (ver arriba)
+            same, rows, books = _pair_books(rows, books, lambda c: c)
+            match_keys = [lambda c: (key(c[0]), c[1])]  # otros campos
+            if fix_authors:
+                match_keys.append(lambda c: (key(c[0]), *c[2:]))  # autor
+            changed = []
+            for match_key in match_keys:
+                pairs, rows, books = _pair_books(rows, books, match_key)
+                changed += pairs
+            inserts = [dict(zip(_BOOK_FIELDS, content), library_id=library_id) for _, content in rows]
+            updates = [{"b_id": book_id, **dict(zip(_BOOK_FIELDS, content))}
+                       for _, content, book_id, _ in changed]
+
+            # cambios de título/autor, explícitos
+            title_changes = author_changes = 0
+            author_ids = {a for _, c, _, old in changed if c[1] != old[1] for a in (c[1], old[1]) if a is not None}
+            names = {}
+            if author_ids:
+                stmt = select(Author.id, Author.name).where(Author.id.in_(author_ids))
+                names = {a_id: name for a_id, name in conn.execute(stmt)}
+                names.update({a_id: v[0] for a_id, v in maps["authors"].dry_values.items()})  # dry-run
+            for i, content, book_id, old in sorted(changed):
+                if content[0] != old[0]:
+                    title_changes += 1
+                    print(f"[TITLE] Fila {i} -> libro {book_id}: {old[0]!r} -> {content[0]!r}")
+                if content[1] != old[1]:
+                    author_changes += 1
+                    print(f"[AUTHOR] Fila {i} -> libro {book_id} ({content[0]!r}): "
+                          f"{names.get(old[1])!r} -> {names.get(content[1])!r}")
+
+            # 4) aplicar solo la diferencia
+            if dry:
+                for book in inserts:
+                    print("[DRY] Would Insert BOOK:", {f: book[f] for f in _BOOK_FIELDS})
+                for book in updates:
+                    print(f"[DRY] Would Update BOOK {book['b_id']}:", {f: book[f] for f in _BOOK_FIELDS})
+                s.rollback()
+            else:
+                for k in range(0, len(inserts), batch_size):
+                    conn.execute(insert(Book), inserts[k:k + batch_size])
+                if updates:
+                    stmt = (update(Book).where(Book.id == bindparam("b_id"))
+                            .values({f: bindparam(f) for f in _BOOK_FIELDS}))
+                    for k in range(0, len(updates), batch_size):
+                        conn.execute(stmt, updates[k:k + batch_size])
+                if inserts or updates:
+                    bump_catalog_version(conn, {library_id})  # Core: el hook del ORM no lo ve
+                s.commit()
+
+        except Exception:
+            s.rollback()
+            raise
+
+    return {
+        "inserted_books": len(inserts),
+        "updated_books": len(updates),
+        "title_changes": title_changes,
+        "author_changes": author_changes,
+        "unchanged_books": len(same),
+        "missing_in_file": len(books),
+        "skipped_books": skipped_books,
+        "created": created,
+        "total_rows": total_rows,
+        "mode": "DRY-RUN" if dry else "REIMPORT",
+        "seconds": time.perf_counter() - t0,
     }
 
+
 def main():
     ap = argparse.ArgumentParser(description="Books seeder (and related tables) from Excel.")
     ap.add_argument("excel", help="Root to libros.xlsx")
@@ -302,13 +544,45 @@ def main():
     ap.add_argument("--dry-run", action="store_true", help="Doesn't insert; Only shows what it would do.")
     ap.add_argument("--create-missing-locations", action="store_true",
                     help="If it doesn't find a existing location, it's created automatically")
+    ap.add_argument("--bulk", action="store_true",
+                    help="Kept for old scripts: lookups loaded once and batched inserts are now the default")
+    ap.add_argument("--library-id", type=int, default=None,
+                    help="Library of the imported books (required unless --dry-run)")
+    ap.add_argument("--batch-size", type=int, default=BULK_BATCH, help="Books per INSERT")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Processes that read and normalize the file (e.g. the number of cores)")
+    ap.add_argument("--all-sheets", action="store_true", help="Import every sheet of the workbook")
+    ap.add_argument("--reimport", action="store_true",
+                    help="Re-import into --library-id: insert new books, update changed ones, skip the rest")
+    ap.add_argument("--fix-authors", action="store_true",
+                    help="With --reimport: a row equal to a book except for the author corrects that author")
     args = ap.parse_args()
-
-    res = insert_books_from_excel(args.excel, args.sheet, args.dry_run, args.create_missing_locations)
+    if not (args.dry_run or args.library_id is not None):
+        ap.error("--library-id is required unless --dry-run")
+    if args.reimport and args.library_id is None:
+        ap.error("--reimport requires --library-id")
+    if args.fix_authors and not args.reimport:
+        ap.error("--fix-authors requires --reimport")
+
+    if args.reimport:
+        res = reimport_books_from_excel(args.excel, args.sheet, args.dry_run, args.create_missing_locations,
+                                        library_id=args.library_id, workers=args.workers,
+                                        all_sheets=args.all_sheets, batch_size=args.batch_size,
+                                        fix_authors=args.fix_authors)
+        print(f"[{res['mode']}] Total rows: {res['total_rows']} | New books: {res['inserted_books']} | "
+              f"Updated: {res['updated_books']} (title changes: {res['title_changes']}, "
+              f"author changes: {res['author_changes']}) | Unchanged: {res['unchanged_books']} | "
+              f"Skipped: {res['skipped_books']} | Only in DB (kept): {res['missing_in_file']}")
+        print(f"Throughput: {res['total_rows'] / max(res['seconds'], 1e-9):,.0f} rows/s ({res['seconds']:.1f}s)")
+        return
+    res = bulk_insert_books_from_excel(args.excel, args.sheet, args.dry_run, args.create_missing_locations,
+                                       library_id=args.library_id, batch_size=args.batch_size,
+                                       workers=args.workers, all_sheets=args.all_sheets)
     print(f"[{res['mode']}] Total rows: {res['total_rows']} | New books: {res['inserted_books']} | "
           f"Skipped: {res['skipped_books']} | Created -> authors:{res['created']['authors']}, "
           f"publishers:{res['created']['publishers']}, themes:{res['created']['themes']}, "
           f"collections:{res['created']['collections']}, locations:{res['created']['locations']}")
+    print(f"Throughput: {res['total_rows'] / max(res['seconds'], 1e-9):,.0f} rows/s ({res['seconds']:.1f}s)")
 
 if __name__ == "__main__":
     main()
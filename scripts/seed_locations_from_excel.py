@@ -1,9 +1,10 @@
 import argparse
-import re
 import pandas as pd
 from sqlalchemy import select, and_, func
 from database.db_config import SessionLocal
 from models.location import Location
+from scripts.import_parsing import PARSE_CHUNK, LocationParser
+from scripts.sheet_stream import chunked, pick_column, read_rows
 
 def coerce_str(x, maxlen=30):
     if x is None or (isinstance(x, float) and pd.isna(x)):
@@ -22,11 +23,13 @@ def coerce_int(x):
     except ValueError:
         raise ValueError(f"Valor no numérico en 'shelf': {x!r}")
 
-def load_df(path, sheet=None):
+def iter_locations(path, sheet=None):
+    """
+    Ubicaciones del Excel/CSV en streaming (scripts/sheet_stream.py): sin
+    cargar la hoja entera, sin filas vacías y sin duplicados.
+    """
     # Usa la hoja indicada o la primera por defecto
-    df = pd.read_excel(path, sheet_name=(sheet if sheet is not None else 0))
-
-    cols_lower = {c.lower().strip(): c for c in df.columns}
+    headers, rows = read_rows(path, sheet)
 
     # ¿archivo ya con columnas separadas?
     aliases = {
@@ -35,104 +38,40 @@ def load_df(path, sheet=None):
         "module": ("module", "modulo", "m\u00F3dulo", "módulo"),
         "shelf": ("shelf", "estante", "balda"),
     }
-    has_all = all(any(a in cols_lower for a in poss) for poss in aliases.values())
-
-    if has_all:
-        mapping = {k: next(cols_lower[a] for a in poss if a in cols_lower) for k, poss in aliases.items()}
-        df = df.rename(columns={v: k for k, v in mapping.items()})
-
-        def coerce_str(x, maxlen=30):
-            if pd.isna(x): return None
-            s = str(x).strip()
-            return s[:maxlen] if s else None
-
-        def coerce_int(x):
-            if pd.isna(x): return None
-            s = str(x).strip()
-            if not s: return None
-            try: return int(float(s))
-            except ValueError: raise ValueError(f"Valor no numérico en 'shelf': {x!r}")
-
-        df["place"] = df["place"].apply(coerce_str)
-        df["furniture"] = df["furniture"].apply(coerce_str)
-        df["module"] = df["module"].apply(coerce_str)
-        df["shelf"] = df["shelf"].apply(coerce_int)
+    idx = {k: pick_column(headers, *poss) for k, poss in aliases.items()}
 
+    if all(i is not None for i in idx.values()):
+        records = ({"place": coerce_str(r[idx["place"]]),
+                    "furniture": coerce_str(r[idx["furniture"]]),
+                    "module": coerce_str(r[idx["module"]]),
+                    "shelf": coerce_int(r[idx["shelf"]])} for r in rows)
     else:
         # Columna única con la ubicación
         # Si no hay columna "Ubicación", usa la única columna disponible
-        ubic_col = None
-        for name in ("ubicación", "ubicacion", "ubicacion ", "ubicación "):
-            if name in cols_lower:
-                ubic_col = cols_lower[name]; break
-        if not ubic_col:
-            if len(df.columns) == 1:
-                ubic_col = df.columns[0]
+        ubic_col = pick_column(headers, "ubicación", "ubicacion")
+        if ubic_col is None:
+            if len(headers) == 1:
+                ubic_col = 0
             else:
                 raise KeyError("No encuentro columna 'Ubicación' y tampoco columnas separadas.")
+        # "Lugar/Mueble/Módulo/Balda" -> columnas, por bloques (cada texto distinto se parsea una vez)
+        parser = LocationParser("locations")
+        records = ({"place": p, "furniture": f, "module": m, "shelf": sh}
+                   for block in chunked(rows, PARSE_CHUNK)
+                   for p, f, m, sh in parser.parse_many([r[ubic_col] for r in block]))
+
+    # limpiar y deduplicar
+    seen = set()
+    for rec in records:
+        key = (rec["place"], rec["furniture"], rec["module"], rec["shelf"])
+        if all(v is None for v in key) or key in seen:
+            continue
+        seen.add(key)
+        yield rec
 
-        place, furniture, module, shelf = [], [], [], []
-
-        def nz(x, maxlen=30):
-            if x is None: return None
-            s = str(x).strip()
-            return s[:maxlen] if s else None
-
-        mod_re = re.compile(r"(m[oó]dulo|modulo|^m\d+$|^m[_\-\s]?\d+$)", re.IGNORECASE)
-        shelf_hint_re = re.compile(r"(balda|estante|shelf)", re.IGNORECASE)
-
-        for raw in df[ubic_col].astype(str):
-            parts = [p.strip() for p in raw.split("/") if p.strip()]
-            if not parts:
-                place.append(None); furniture.append(None); module.append(None); shelf.append(None)
-                continue
-
-            p = parts[0]
-            rest = parts[1:]
 
-            # 1) Detectar shelf (último tramo si parece balda/estante o tiene dígitos)
-            shelf_token = None
-            if rest:
-                last = rest[-1]
-                if shelf_hint_re.search(last) or any(ch.isdigit() for ch in last):
-                    shelf_token = last
-                    rest = rest[:-1]
-
-            # 2) Detectar module por palabra clave
-            module_token = None
-            module_idx = None
-            for i, t in enumerate(rest):
-                if mod_re.search(t):
-                    module_token = t
-                    module_idx = i
-                    break
-
-            # 3) Furniture = lo que queda (si hay módulo, lo anterior al módulo; si no hay módulo, todo el resto)
-            if module_token is not None:
-                furn_tokens = rest[:module_idx]
-            else:
-                furn_tokens = rest
-
-            f = " / ".join(furn_tokens) if furn_tokens else None
-            m = module_token
-
-            # 4) shelf a número si procede (p. ej., "Balda_4")
-            shelf_num = None
-            if shelf_token:
-                digits = "".join(ch for ch in shelf_token if ch.isdigit())
-                shelf_num = int(digits) if digits else None
-
-            place.append(nz(p))
-            furniture.append(nz(f))
-            module.append(nz(m))
-            shelf.append(shelf_num)
-
-        df = pd.DataFrame({"place": place, "furniture": furniture, "module": module, "shelf": shelf})
-
-        # limpiar y deduplicar
-        df = df.dropna(how="all", subset=["place", "furniture", "module", "shelf"])
-        df = df.drop_duplicates(subset=["place", "furniture", "module", "shelf"])
-        return df
+def load_df(path, sheet=None):
+    return pd.DataFrame(list(iter_locations(path, sheet)), columns=["place", "furniture", "module", "shelf"])
 
 def exists(session, place, furniture, module, shelf):
     stmt = (
@@ -150,12 +89,11 @@ def exists(session, place, furniture, module, shelf):
     return session.execute(stmt).scalar_one() > 0
 
 def insert_locations(path, sheet=None, dry=False):
-    df = load_df(path, sheet)
-    to_insert = df.to_dict(orient="records")
-    inserted, skipped = 0, 0
+    inserted, skipped, total = 0, 0, 0
     with SessionLocal() as s:
         try:
-            for row in to_insert:
+            for row in iter_locations(path, sheet):
+                total += 1
                 if exists(s, row["place"], row["furniture"], row["module"], row["shelf"]):
                     skipped += 1
                     continue
@@ -170,7 +108,7 @@ def insert_locations(path, sheet=None, dry=False):
         except Exception:
             s.rollback()
             raise
-    return inserted, skipped, len(to_insert)
+    return inserted, skipped, total
 
 def main():
     p = argparse.ArgumentParser(description="Seed of locations from Excel")
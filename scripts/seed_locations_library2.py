@@ -1,8 +1,9 @@
 import argparse
-import re
 import pandas as pd
 from database.db_config import SessionLocal
 from models.location import Location
+from scripts.import_parsing import PARSE_CHUNK, LocationParser
+from scripts.sheet_stream import chunked, pick_column, read_rows
 
 LIBRARY_ID = 2  # Iglesias-Hurtado
 
@@ -24,87 +25,36 @@ def normalize_text(x, maxlen=30):
 
 
 def parse_locations_csv(path: str) -> list[dict]:
-    df = pd.read_csv(path)
-    cols_lower = {c.lower().strip(): c for c in df.columns}
-
-    ubic_col = None
-    for name in ("ubicación", "ubicacion", "location", "ubicacionih", "ubicacion_ih"):
-        if name in cols_lower:
-            ubic_col = cols_lower[name]
-            break
-
-    if not ubic_col:
-        if len(df.columns) == 1:
-            ubic_col = df.columns[0]
+    # en streaming: solo se guardan las ubicaciones distintas, no el CSV entero
+    headers, rows = read_rows(path)
+    ubic_col = pick_column(headers, "ubicación", "ubicacion", "location", "ubicacionih", "ubicacion_ih")
+
+    if ubic_col is None:
+        if len(headers) == 1:
+            ubic_col = 0
         else:
             raise KeyError("No encuentro columna de ubicación (Ubicacion/Ubicación).")
 
-    mod_re = re.compile(r"(m[oó]dulo|modulo|^m\d+$|^m[_\-\s]?\d+$|^m[oó]dulo[_\-\s]?\d+$)", re.IGNORECASE)
-    shelf_hint_re = re.compile(r"(balda|estante|shelf)", re.IGNORECASE)
-
+    parser = LocationParser("library2")  # cada texto distinto se parsea una vez
     out = []
-    for raw in df[ubic_col].astype(str):
-        raw = raw.strip()
-        if raw == "" or raw.lower() in ("nan", "none", "null"):
-            continue
-
-        parts = [p.strip() for p in raw.split("/") if p.strip()]
-        if not parts:
-            continue
-
-        place = parts[0]
-        rest = parts[1:]
-
-        # shelf = último tramo si tiene dígitos o "balda/estante"
-        shelf_token = None
-        if rest:
-            last = rest[-1]
-            if shelf_hint_re.search(last) or any(ch.isdigit() for ch in last):
-                shelf_token = last
-                rest = rest[:-1]
-
-        # module = primer token que parezca módulo
-        module_token = None
-        module_idx = None
-        for i, t in enumerate(rest):
-            if mod_re.search(t):
-                module_token = t
-                module_idx = i
-                break
-
-        # furniture = lo que quede antes del módulo (o todo si no hay módulo)
-        furn_tokens = rest[:module_idx] if module_token is not None else rest
-        furniture = " / ".join(furn_tokens) if furn_tokens else None
-
-        # shelf a int
-        shelf_num = None
-        if shelf_token:
-            digits = "".join(ch for ch in shelf_token if ch.isdigit())
-            shelf_num = int(digits) if digits else None
-
-        row = {
-            "place": normalize_text(place),
-            "furniture": normalize_text(furniture),
-            "module": normalize_text(module_token),
-            "shelf": shelf_num,
-        }
-
-        # descarta fila completamente vacía
-        if all(v is None for v in row.values()):
-            continue
-
-        out.append(row)
-
-    # dedupe en memoria
     seen = set()
-    uniq = []
-    for r in out:
-        key = (r["place"], r["furniture"], r["module"], r["shelf"])
-        if key not in seen:
-            seen.add(key)
-            uniq.append(r)
-
-    return uniq
+    for block in chunked(rows, PARSE_CHUNK):
+        for parsed in parser.parse_many([values[ubic_col] for values in block]):
+            if parsed is None:
+                continue
+            row = dict(zip(("place", "furniture", "module", "shelf"), parsed))
+
+            # descarta fila completamente vacía
+            if all(v is None for v in row.values()):
+                continue
+
+            # dedupe en memoria (sobre la marcha)
+            key = (row["place"], row["furniture"], row["module"], row["shelf"])
+            if key not in seen:
+                seen.add(key)
+                out.append(row)
+
+    return out
 
 
 def load_existing_keys(session) -> set:
@@ -0,0 +1,300 @@
+"""
+Lectura en streaming de hojas de cálculo para los seeders.
+
+read_rows(path, sheet) devuelve (cabeceras, iterador de filas) sin cargar el
+fichero entero:
+  - .xlsx/.xlsm: openpyxl en modo read_only (la hoja se va leyendo del zip)
+  - .csv/.txt:   pandas.read_csv por bloques de CSV_CHUNK filas
+
+Las celdas llegan como las vería pd.read_excel / pd.read_csv: vacías o con
+los textos que pandas trata como nulos ("NA", "NULL", "nan"...) -> None, y
+las filas vacías del final no cuentan. Así los seeders pueden normalizar cada
+fila igual que hacían sobre el DataFrame completo.
+
+Para importar en paralelo (un proceso por tramo de filas) están
+sheet_names(path), count_rows(path, sheet) y read_rows(..., rows=(desde, hasta)).
+"""
+import io
+import re
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+try:
+    from pandas.io.parsers.readers import STR_NA_VALUES as _NA_STRINGS
+except ImportError:  # otras versiones de pandas: la lista por defecto de read_csv
+    _NA_STRINGS = {"", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+                   "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+                   "n/a", "nan", "null"}
+
+CSV_CHUNK = 10_000
+_CSV_EXT = (".csv", ".txt")
+
+
+def _cell(v):
+    if isinstance(v, str) and v in _NA_STRINGS:
+        return None
+    if isinstance(v, float) and v != v:  # NaN
+        return None
+    return v
+
+
+def _header_name(v, i: int) -> str:
+    # como pandas: cabecera vacía -> "Unnamed: i"
+    return f"Unnamed: {i}" if v is None or (isinstance(v, float) and v != v) else str(v)
+
+
+class _RowWindow(io.RawIOBase):
+    """
+    XML de una hoja sin las filas de fuera de [first, last]. Con
+    iter_rows(min_row=...) openpyxl convierte igualmente todas las filas
+    anteriores (saltarlas cuesta casi lo mismo que leerlas); así cada proceso
+    solo convierte su tramo. Las filas se localizan por su etiqueta <row r="N">
+    sin parsear el XML. La primera fila posterior al tramo se deja pasar para
+    que openpyxl rellene los huecos del final igual que sin filtro.
+    """
+
+    _ROW = re.compile(rb"<(?:[A-Za-z_][\w.-]*:)?row[\s>/]")
+    _END = re.compile(rb"</(?:[A-Za-z_][\w.-]*:)?sheetData\s*>")
+    _NUM = re.compile(rb"\sr=[\"'](\d+)[\"']")
+    BLOCK = 1 << 20
+
+    def __init__(self, src, first: int, last: int):
+        self._src = src
+        self._first, self._last = first, last
+        self._pending = b""        # leído y aún sin entregar ni descartar
+        self._head_decided = False  # ¿la fila con la que empieza _pending ya está decidida?
+        self._out = bytearray()    # listo para entregar
+        self._keep = True          # ¿se entrega la fila actual? (lo anterior a las filas, sí)
+        self._past = False         # ¿ya pasó la primera fila posterior al tramo?
+        self._tag = None           # etiqueta de fila tal como viene ("<row ")
+        self._entered = False      # ¿ya llegó alguna fila del tramo (o posterior)?
+        self._state = "rows"       # rows -> skip (tras el tramo) -> tail (desde </sheetData>)
+        self._eof = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._out and not self._eof:
+            self._fill()
+        n = min(len(b), len(self._out))
+        b[:n] = self._out[:n]
+        del self._out[:n]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._src.close()
+        super().close()
+
+    def _fill(self):
+        data = self._src.read(self.BLOCK)
+        buf, self._pending = self._pending + data, b""
+        self._eof = not data
+        if self._state == "rows":
+            buf = self._rows(buf)
+        if self._state == "skip":
+            end = self._END.search(buf)
+            if end is None:
+                self._pending = buf[-32:]  # por si la etiqueta de cierre llega partida
+                return
+            buf, self._state = buf[end.start():], "tail"
+        if self._state == "tail":
+            self._out += buf
+
+    def _rows(self, buf: bytes) -> bytes:
+        """Decide las filas de buf; devuelve lo que sigue al tramo (para skip/tail)."""
+        end = self._END.search(buf)
+        limit = end.start() if end is not None else len(buf)
+        if self._tag is not None and not self._entered:
+            # aún antes del tramo: las filas van en orden, se salta hasta la última del bloque
+            k = buf.rfind(self._tag, 0, limit)
+            tag_end = buf.find(b">", k, limit) if k > 0 else -1
+            num = self._NUM.search(buf, k, tag_end) if tag_end > 0 else None
+            if num is not None and int(num.group(1)) < self._first:
+                buf, limit, self._head_decided = buf[k:], limit - k, True
+        pos, decided = 0, self._head_decided
+        for m in self._ROW.finditer(buf, 1 if decided else 0, limit):
+            tag_end = buf.find(b">", m.start(), limit)
+            if tag_end < 0:
+                break  # etiqueta partida: se decide con el siguiente bloque
+            num = self._NUM.search(buf, m.start(), tag_end)
+            if num is None:
+                raise _UnnumberedRows()
+            if self._keep:
+                self._out += buf[pos:m.start()]
+            pos, decided = m.start(), True
+            r = int(num.group(1))
+            if self._tag is None:
+                self._tag = m.group(0)[:-1] + b" "  # "<row " (o con prefijo de espacio de nombres)
+            self._entered = self._entered or r >= self._first
+            if r <= self._last:
+                self._keep = r >= self._first
+            elif not self._past:
+                self._keep = self._past = True  # la primera posterior sí (openpyxl se para en ella)
+            else:
+                self._keep = False
+                self._state = "skip"
+                return buf[pos:]
+        else:
+            if end is not None or self._eof:
+                if self._keep:
+                    self._out += buf[pos:limit]
+                self._state = "tail"
+                return buf[limit:]
+            # la última fila puede seguir en el siguiente bloque
+            self._pending, self._head_decided = buf[pos:], decided
+            return b""
+        # etiqueta partida: lo anterior ya está decidido
+        if self._keep:
+            self._out += buf[pos:m.start()]
+        self._pending, self._head_decided = buf[m.start():], False
+        return b""
+
+
+class _UnnumberedRows(Exception):
+    """Filas sin atributo r: no se pueden localizar sin parsear la hoja entera."""
+
+
+def _xlsx_rows(path: str, sheet: Optional[str], window: Optional[tuple[int, int]] = None):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    ws = wb[sheet] if sheet is not None else wb.worksheets[0]
+    if window is not None:
+        return _xlsx_window(wb, ws, *window)
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        wb.close()
+        return [], iter(())
+    width = len(header)
+    headers = [_header_name(v, i) for i, v in enumerate(header)]
+
+    def gen():
+        blank = 0  # filas vacías pendientes: solo cuentan si luego hay datos
+        try:
+            for raw in rows:
+                values = tuple(_cell(v) for v in raw[:width])
+                if len(values) < width:
+                    values += (None,) * (width - len(values))
+                if all(v is None for v in values):
+                    blank += 1
+                    continue
+                for _ in range(blank):
+                    yield (None,) * width
+                blank = 0
+                yield values
+        finally:
+            wb.close()
+
+    return headers, gen()
+
+
+def _xlsx_window(wb, ws, start: int, stop: int):
+    """Filas de datos [start, stop) tal cual (con las vacías): las recorta quien junta los tramos."""
+    try:
+        header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), None) or ()
+        width = len(header)
+        first, last = start + 2, stop + 1  # filas de la hoja (la 1 son las cabeceras)
+        raw = None
+        # interno de ReadOnlyWorksheet (openpyxl 3.1, fijado en requirements.txt;
+        # scripts/check_sheet_windows.py comprueba que los tramos salen iguales)
+        get_source = getattr(ws, "_get_source", None)
+        if get_source is not None:
+            ws._get_source = lambda: io.BufferedReader(_RowWindow(get_source(), first, last), _RowWindow.BLOCK)
+            try:
+                raw = list(ws.iter_rows(min_row=first, max_row=last, values_only=True))
+            except _UnnumberedRows:
+                ws._get_source = get_source
+        if raw is None:  # sin números de fila u otro openpyxl: leyendo la hoja entera hasta el tramo
+            raw = list(ws.iter_rows(min_row=first, max_row=last, values_only=True))
+    finally:
+        wb.close()
+    rows = []
+    for values in raw:
+        values = tuple(_cell(v) for v in values[:width])
+        rows.append(values + (None,) * (width - len(values)))
+    return [_header_name(v, i) for i, v in enumerate(header)], rows
+
+
+def _csv_rows(path: str):
+    import pandas as pd
+
+    # dtype=str: todo como texto, igual en todos los bloques (sin inferencia por bloque)
+    reader = pd.read_csv(path, dtype=str, chunksize=CSV_CHUNK)
+    first = next(reader, None)
+    if first is None:
+        return [], iter(())
+    headers = [str(c) for c in first.columns]
+
+    def gen():
+        for chunk in ([first], reader):
+            for df in chunk:
+                for values in df.itertuples(index=False, name=None):
+                    yield tuple(_cell(v) for v in values)
+
+    return headers, gen()
+
+
+def read_rows(path: str, sheet: Optional[str] = None,
+              rows: Optional[tuple[int, int]] = None) -> tuple[list[str], Iterator[tuple]]:
+    """
+    (cabeceras, filas) de la hoja sheet (por defecto la primera) o del CSV.
+    rows=(desde, hasta): solo esas filas de datos (0 = la primera tras las
+    cabeceras, como lista y sin recortar las vacías del final); solo Excel.
+    """
+    if path.lower().endswith(_CSV_EXT):
+        if rows is not None:
+            raise ValueError("Los tramos de filas solo se admiten en Excel.")
+        return _csv_rows(path)
+    return _xlsx_rows(path, sheet, rows)
+
+
+def sheet_names(path: str) -> list[Optional[str]]:
+    """Hojas del libro, en orden ([None] para un CSV)."""
+    if path.lower().endswith(_CSV_EXT):
+        return [None]
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def count_rows(path: str, sheet: Optional[str] = None) -> Optional[int]:
+    """
+    Filas de datos que declara la hoja (etiqueta <dimension>, sin leerla) o
+    None si no se sabe (CSV, hoja sin dimensión). Es el mismo límite que usa
+    read_rows, así que los tramos cubren exactamente lo que se leería.
+    """
+    if path.lower().endswith(_CSV_EXT):
+        return None
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        ws = wb[sheet] if sheet is not None else wb.worksheets[0]
+        return None if ws.max_row is None else max(ws.max_row - 1, 0)
+    finally:
+        wb.close()
+
+
+def pick_column(headers: list[str], *options: str) -> Optional[int]:
+    """Posición de la primera cabecera que coincide (sin mayúsculas ni espacios) con options."""
+    cols = {}
+    for i, h in enumerate(headers):
+        cols.setdefault(h.lower().strip(), i)
+    for k in options:
+        if k in cols:
+            return cols[k]
+    return None
+
+
+def chunked(it: Iterable, size: int) -> Iterator[list]:
+    """Bloques de hasta size elementos."""
+    it = iter(it)
+    while batch := list(islice(it, size)):
+        yield batch
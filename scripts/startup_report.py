@@ -0,0 +1,108 @@
+"""
+Informe de arranque en frío a partir de `python -X importtime`.
+
+Uso:
+    python -m scripts.startup_report
+    python -m scripts.startup_report --top 25 --runs 5
+    python -m scripts.startup_report --save startup_history.json --label v1.3
+
+Mide en procesos nuevos (sin nada importado) dos fases:
+  - "selector": lo que main.py importa antes de mostrar el modal de biblioteca
+  - "completo": además la ventana principal (lo que _preload carga en segundo plano)
+De cada fase se toma la mejor de --runs ejecuciones. Con --save se añade una
+línea al histórico JSON para comparar entre versiones.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = [
+    ("selector", "import main"),
+    ("completo", "import main, database.db_config, views.main_window"),
+]
+FIRST_PARTY = ("main", "views", "controllers", "models", "database", "scripts")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def importtime(code: str) -> list[tuple[str, int, int, int]]:
+    """[(módulo, self µs, acumulado µs, profundidad), ...] de un proceso nuevo."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "error")
+    out = []
+    for line in proc.stderr.splitlines():
+        if m := _LINE.match(line):
+            self_us, cum_us, indent, name = m.groups()
+            out.append((name, int(self_us), int(cum_us), len(indent) // 2))
+    return out
+
+
+def total_ms(rows) -> float:
+    # el acumulado de los imports de primer nivel ya incluye a sus hijos
+    return sum(cum for _, _, cum, depth in rows if depth == 0) / 1000
+
+
+def best_of(code: str, runs: int):
+    results = [importtime(code) for _ in range(runs)]
+    return min(results, key=total_ms)
+
+
+def by_package(rows) -> dict[str, float]:
+    """Tiempo propio (ms) sumado por paquete de primer nivel (sqlalchemy, customtkinter...)."""
+    acc = defaultdict(float)
+    for name, self_us, _, _ in rows:
+        acc[name.split(".")[0]] += self_us / 1000
+    return acc
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Informe de tiempos de import al arrancar.")
+    ap.add_argument("--runs", type=int, default=3, help="Ejecuciones por fase (se toma la mejor)")
+    ap.add_argument("--top", type=int, default=15, help="Paquetes/módulos a listar")
+    ap.add_argument("--save", default=None, help="Fichero JSON de histórico al que añadir el resultado")
+    ap.add_argument("--label", default=None, help="Etiqueta de la medida (versión, rama...)")
+    args = ap.parse_args()
+
+    phases = {}
+    for name, code in PHASES:
+        rows = best_of(code, args.runs)
+        phases[name] = rows
+        print(f"{name:10} {total_ms(rows):8.1f} ms  ({len(rows)} módulos)  <- {code}")
+
+    full = phases["completo"]
+    print("\nPaquetes más lentos (tiempo propio, fase completa):")
+    for pkg, ms in sorted(by_package(full).items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {ms:8.1f} ms  {pkg}")
+
+    print("\nMódulos de la app (acumulado):")
+    own = [(n, cum) for n, _, cum, _ in full if n.split(".")[0] in FIRST_PARTY]
+    for name, cum in sorted(own, key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {cum / 1000:8.1f} ms  {name}")
+
+    if args.save:
+        history = []
+        if os.path.exists(args.save):
+            with open(args.save, encoding="utf-8") as f:
+                history = json.load(f)
+        history.append({
+            "label": args.label,
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            **{f"{name}_ms": round(total_ms(rows), 1) for name, rows in phases.items()},
+        })
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nGuardado en {args.save} ({len(history)} medidas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# views/app_state.py
+"""
+Estado local de la app entre sesiones (última biblioteca usada...), en un
+JSON dentro del perfil del usuario. Si no se puede leer o escribir, la app
+sigue funcionando igual: es solo una comodidad.
+"""
+import json
+import os
+
+APP_DIR = os.environ.get("LIBRARY_APP_DIR", os.path.join(os.path.expanduser("~"), ".library_app"))
+STATE_PATH = os.path.join(APP_DIR, "state.json")
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_PATH, encoding="utf-8") as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(**values):
+    state = load_state()
+    state.update(values)
+    try:
+        os.makedirs(APP_DIR, exist_ok=True)
+        tmp = STATE_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, STATE_PATH)  # nunca queda un fichero a medias
+    except OSError:
+        pass
@@ -0,0 +1,162 @@
+# views/catalog_prefetch.py
+"""
+Precarga de una biblioteca mientras el usuario aún está en LibrarySelectModal:
+  - lo primero que pinta MainWindow (total + primera página)
+  - las tablas de referencia (quedan en controllers/lookup_cache)
+  - el resumen de préstamos
+Todo va al pool compartido de views/query_runner. MainWindow recoge lo
+precargado con take() al abrir (o al cambiar de biblioteca).
+
+Los controllers se importan dentro de cada tarea para que el modal siga
+abriendo sin cargar SQLAlchemy.
+"""
+import threading
+from collections import OrderedDict
+
+from views.query_runner import run_in_background
+
+
+class Prefetch:
+    """Futures de la precarga de una biblioteca."""
+
+    __slots__ = ("library_id", "catalog", "loans")
+
+    def __init__(self, library_id: int, catalog, loans):
+        self.library_id = library_id
+        self.catalog = catalog  # Future -> (total, filas, cursor, stamp), como load_first_page
+        self.loans = loans      # Future -> loan_summary(library_id)
+
+
+_lock = threading.Lock()
+_pending: dict[int, Prefetch] = {}
+
+
+def load_first_page(filters: dict | None, library_id: int, order_by: str | None = None,
+                    desc: bool = False, paged: bool = True, limit: int | None = None):
+    """
+    (total, filas, cursor, stamp) con lo que MainWindow pinta al refrescar.
+    stamp (catalog_stamp) se lee antes que las filas: si algo cambia entre
+    medias, el stamp guardado ya no coincidirá y se recargará.
+    limit: filas de la primera "página" (por defecto PAGE_SIZE); al revalidar
+    una instantánea se pide de golpe todo lo que ya estaba pintado.
+    """
+    from controllers.book_controller import catalog_stamp
+    return _first_page(catalog_stamp(library_id), filters, library_id, order_by, desc, paged, limit)
+
+
+def revalidate_first_page(library_id: int, stamp, order_by: str | None = None,
+                          desc: bool = False, paged: bool = True, limit: int | None = None):
+    """
+    load_first_page sin filtros, o None si la biblioteca sigue en stamp (el
+    catalog_stamp de lo que ya está pintado): entonces basta una consulta mínima.
+    """
+    from controllers.book_controller import catalog_stamp
+    current = catalog_stamp(library_id)
+    if current is not None and current == stamp:
+        return None
+    return _first_page(current, None, library_id, order_by, desc, paged, limit)
+
+
+def _first_page(stamp, filters, library_id, order_by, desc, paged, limit):
+    from controllers.book_controller import PAGE_SIZE, list_book_rows, list_book_rows_page
+
+    if paged:
+        total = _count(stamp, filters, library_id)
+        rows, cursor = list_book_rows_page(filters, library_id=library_id, order_by=order_by,
+                                           desc=desc, limit=limit or PAGE_SIZE)
+        return total, rows, cursor, stamp
+    # ✅ filtrar por biblioteca (filas proyectadas, sin objetos ORM)
+    rows = list_book_rows(filters, library_id=library_id, order_by=order_by, desc=desc)
+    return len(rows), rows, None, stamp
+
+
+# totales ya contados: {(biblioteca, stamp, filtros): total}. Con el mismo
+# stamp la biblioteca no ha cambiado, así que el COUNT daría lo mismo.
+_COUNT_CACHE_SIZE = 64
+_counts: OrderedDict[tuple, int] = OrderedDict()
+_counts_lock = threading.Lock()
+
+
+def _count(stamp, filters: dict | None, library_id: int) -> int:
+    """
+    Total del listado: del stamp sin filtros (sin COUNT mientras la biblioteca
+    no cambie); con filtros, COUNT una vez por stamp.
+    """
+    from controllers.book_controller import count_books
+
+    if stamp is None:  # BD sin contador: no se sabe si cambió
+        return count_books(filters, library_id=library_id)
+    if not filters:
+        # el total del stamp: catalog_stamp solo cuenta cuando cambia catalog_version
+        return stamp[1]
+    key = (library_id, stamp, tuple(sorted(filters.items())))
+    with _counts_lock:
+        if key in _counts:
+            _counts.move_to_end(key)
+            return _counts[key]
+    total = count_books(filters, library_id=library_id)
+    with _counts_lock:
+        _counts[key] = total
+        while len(_counts) > _COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return total
+
+
+# último resumen de préstamos por biblioteca: {biblioteca: (stamp, resumen)}.
+# Los préstamos también incrementan catalog_version, así que vale lo mismo que _counts.
+_loans: dict[int, tuple] = {}
+
+
+def load_loan_summary(library_id: int) -> dict:
+    """loan_summary(library_id), sin repetir la consulta mientras no cambie el stamp."""
+    from controllers.book_controller import catalog_stamp
+    from controllers.borrow_controller import loan_summary
+
+    stamp = catalog_stamp(library_id)
+    if stamp is None:
+        return loan_summary(library_id)
+    with _counts_lock:
+        cached = _loans.get(library_id)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    summary = loan_summary(library_id)
+    with _counts_lock:
+        _loans[library_id] = (stamp, summary)
+    return summary
+
+
+def _warm_lookups(library_id: int):
+    # las cinco tablas en una sola consulta (lo que ya esté en caché no se pide)
+    from controllers.book_controller import load_book_form
+    load_book_form(library_id)
+
+
+def prefetch(library_id: int):
+    """Empieza a precargar library_id (si no se está precargando ya)."""
+    with _lock:
+        if library_id in _pending:
+            return
+        _pending[library_id] = Prefetch(
+            library_id,
+            catalog=run_in_background(load_first_page, None, library_id),
+            loans=run_in_background(load_loan_summary, library_id),
+        )
+    run_in_background(_warm_lookups, library_id)
+
+
+def take(library_id: int) -> Prefetch | None:
+    """Devuelve la precarga de library_id (o None) y olvida todas las demás."""
+    with _lock:
+        pre = _pending.pop(library_id, None)
+    discard()
+    return pre
+
+
+def discard():
+    """Olvida lo precargado (p. ej. si se cierra el modal sin elegir)."""
+    with _lock:
+        stale = list(_pending.values())
+        _pending.clear()
+    for pre in stale:
+        pre.catalog.cancel()  # solo si aún no había empezado
+        pre.loans.cancel()
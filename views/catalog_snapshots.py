@@ -0,0 +1,206 @@
+# views/catalog_snapshots.py
+"""
+Catálogos ya pintados, uno por biblioteca, para no tener que esperar a la BD:
+
+- En memoria (LRU con presupuesto): MainWindow deja aquí lo que mostraba al
+  cambiar de biblioteca y, al volver, lo pinta al instante.
+- En disco (APP_DIR/catalog/library_<id>.snap): el último catálogo de cada
+  biblioteca sobrevive al cierre, así el siguiente arranque pinta sin esperar
+  a la primera consulta (lo que más se nota con la BD en una red lenta).
+
+MainWindow saca la de memoria con snapshots.pop() y lee la del disco con
+read_snapshot() en segundo plano. En ambos casos la revalida con
+catalog_stamp() (una consulta mínima) y, si la biblioteca cambió, aplica solo
+las diferencias.
+
+Presupuesto en memoria: LIBRARY_SNAPSHOT_MB (256 MB por defecto). La memoria
+de cada catálogo se estima por muestreo, así que es aproximada (por exceso).
+
+Formato del fichero (columnar): cabecera "LIBSNAP1" y, comprimido con zlib,
+una serie de bloques [longitud u32][bytes]:
+  1. JSON con los metadatos (biblioteca, BD, orden, stamp, cursor, totales...)
+  2. ids de los libros (array de int64, en el orden de la tabla)
+  3. por cada columna de la tabla: JSON con sus valores distintos + array de
+     códigos u32 (uno por fila). Autores, editoriales, ubicaciones... se
+     repiten muchísimo, así que cada texto se guarda una vez.
+"""
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from itertools import islice
+
+from views.app_state import APP_DIR
+
+BUDGET_MB = float(os.environ.get("LIBRARY_SNAPSHOT_MB", "256"))
+SNAPSHOT_DIR = os.path.join(APP_DIR, "catalog")
+
+_MAGIC = b"LIBSNAP1"
+_LEN = struct.Struct("<I")
+
+
+class CatalogSnapshot:
+    """Estado de la tabla de MainWindow para una biblioteca (vista sin filtros)."""
+
+    __slots__ = ("library_id", "order", "stamp", "iids", "values", "key_columns",
+                 "cursor", "all_loaded", "total", "loans", "nbytes")
+
+    def __init__(self, library_id, order, stamp, iids, values, key_columns,
+                 cursor, all_loaded, total, loans):
+        self.library_id = library_id
+        self.order = order              # (order_by, desc) con el que se cargó
+        self.stamp = stamp              # catalog_stamp() de cuando se cargó
+        self.iids = iids                # filas en el orden de la tabla
+        self.values = values            # iid -> values
+        self.key_columns = key_columns  # col -> {iid: clave de orden}
+        self.cursor = cursor
+        self.all_loaded = all_loaded
+        self.total = total
+        self.loans = loans
+        self.nbytes = estimate_nbytes(self)
+
+    def frozen_rows(self) -> list[tuple[str, tuple]]:
+        """[(iid, values)] en orden; copia para escribirla desde otro hilo."""
+        return [(iid, self.values[iid]) for iid in self.iids]
+
+
+def estimate_nbytes(snap: CatalogSnapshot, sample: int = 256) -> int:
+    n = len(snap.values)
+    if not n:
+        return 0
+    rows = list(islice(snap.values.values(), sample))
+    per_row = sum(sys.getsizeof(v) + sum(sys.getsizeof(x) for x in v) for v in rows) / len(rows)
+    # dict de filas + tupla de orden + una entrada (iid, clave) por columna de orden
+    per_row += 100 + 8 + len(snap.key_columns) * 120
+    return int(n * per_row)
+
+
+class SnapshotLRU:
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._items: OrderedDict[int, CatalogSnapshot] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(s.nbytes for s in self._items.values())
+
+    def put(self, snap: CatalogSnapshot):
+        with self._lock:
+            self._items.pop(snap.library_id, None)
+            if snap.nbytes > self.budget_bytes:
+                return  # no cabe ni solo
+            self._items[snap.library_id] = snap
+            used = sum(s.nbytes for s in self._items.values())
+            while used > self.budget_bytes:
+                _, old = self._items.popitem(last=False)  # el menos usado
+                used -= old.nbytes
+
+    def pop(self, library_id: int) -> CatalogSnapshot | None:
+        """Lo saca de la caché (MainWindow pasa a ser su dueño)."""
+        with self._lock:
+            return self._items.pop(library_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+snapshots = SnapshotLRU(int(BUDGET_MB * 2**20))
+
+
+# -------- En disco --------
+
+def snapshot_path(library_id: int) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"library_{int(library_id)}.snap")
+
+
+def _db_key() -> str:
+    """Identifica la BD: una instantánea de otra BD (otro servidor, otro fichero) no vale."""
+    from database.db_config import get_engine
+    url = get_engine().url.render_as_string(hide_password=True)
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _blocks(data: bytes):
+    pos = 0
+    while pos < len(data):
+        (n,) = _LEN.unpack_from(data, pos)
+        pos += _LEN.size
+        yield data[pos:pos + n]
+        pos += n
+
+
+def write_snapshot(snap: CatalogSnapshot, rows: list[tuple[str, tuple]]):
+    """
+    Guarda rows (de snap.frozen_rows()) con los metadatos de snap. Escritura
+    atómica; si falla (disco lleno, permisos) se ignora: es solo una caché.
+    """
+    ncols = len(rows[0][1]) if rows else 0
+    header = {
+        "library_id": snap.library_id, "db": _db_key(),
+        "order": snap.order, "stamp": snap.stamp, "cursor": snap.cursor,
+        "all_loaded": snap.all_loaded, "total": snap.total, "loans": snap.loans,
+        "rows": len(rows), "columns": ncols,
+    }
+    blocks = [json.dumps(header, ensure_ascii=False).encode("utf-8"),
+              array("q", (int(iid) for iid, _ in rows)).tobytes()]
+    for c in range(ncols):
+        codes, uniques = array("I"), {}
+        for _, values in rows:
+            codes.append(uniques.setdefault(values[c], len(uniques)))
+        blocks.append(json.dumps(list(uniques), ensure_ascii=False).encode("utf-8"))
+        blocks.append(codes.tobytes())
+
+    payload = b"".join(_LEN.pack(len(b)) + b for b in blocks)
+    path = snapshot_path(snap.library_id)
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC + zlib.compress(payload, 1))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def read_snapshot(library_id: int) -> CatalogSnapshot | None:
+    """La instantánea guardada de la biblioteca, o None si no hay o no vale."""
+    try:
+        with open(snapshot_path(library_id), "rb") as f:
+            data = f.read()
+        if not data.startswith(_MAGIC):
+            return None
+        blocks = list(_blocks(zlib.decompress(data[len(_MAGIC):])))
+        header = json.loads(blocks[0])
+        if header["library_id"] != library_id or header["db"] != _db_key():
+            return None
+
+        ids = array("q")
+        ids.frombytes(blocks[1])
+        iids = [str(i) for i in ids]
+        columns = []
+        for c in range(header["columns"]):
+            uniques = json.loads(blocks[2 + 2 * c])
+            codes = array("I")
+            codes.frombytes(blocks[3 + 2 * c])
+            columns.append([uniques[k] for k in codes])
+        if len(iids) != header["rows"] or any(len(col) != len(iids) for col in columns):
+            return None
+    except (OSError, ValueError, KeyError, IndexError, TypeError, zlib.error, struct.error):
+        return None
+
+    def _tuple(v):
+        return tuple(v) if v is not None else None
+
+    return CatalogSnapshot(
+        library_id, _tuple(header["order"]), _tuple(header["stamp"]),
+        iids, dict(zip(iids, zip(*columns))), {},
+        _tuple(header["cursor"]), header["all_loaded"], header["total"], header["loans"],
+    )
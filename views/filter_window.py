@@ -1,13 +1,16 @@
 # views/filter_window.py
 import customtkinter as ctk
-import tkinter as tk
 from controllers.book_controller import (
     get_all_authors,
     get_all_publishers,
     get_all_collections,
     get_all_themes
 )
-from tkinter import ttk
+from tkinter import ttk, messagebox
+from controllers import lookup_cache
+from views.query_runner import QueryRunner
+from views.search_select_modal import SearchSelectModal
+from views.picker_index import warm_picker
 
 # --- Placeholders (sentinelas) para combos ---
 AUTHOR_PH = "— Autor —"
@@ -15,91 +18,6 @@ PUBLISHER_PH = "— Editorial —"
 THEME_PH = "— Tema —"
 COLLECTION_PH = "— Colección —"
 
-class SearchSelectModal(ctk.CTkToplevel):
-    """Modal genérico para buscar y seleccionar un item: items=[(id,label), ...]."""
-    def __init__(self, master, title: str, items, on_selected=None):
-        super().__init__(master)
-        self.withdraw()
-
-        self.title(title)
-        self.geometry("560x520")
-        self.resizable(False, False)
-        self.transient(master)
-        self.grab_set()
-        self.focus()
-
-        self.on_selected = on_selected
-        self.items_all = list(items)
-        self.items_view = self.items_all[:]
-
-        frame = ctk.CTkFrame(self)
-        frame.pack(fill="both", expand=True, padx=16, pady=16)
-        frame.grid_columnconfigure(0, weight=1)
-        frame.grid_rowconfigure(2, weight=1)
-
-        ctk.CTkLabel(frame, text="Buscar").grid(row=0, column=0, sticky="w")
-        self.search = ctk.CTkEntry(frame, placeholder_text="Escribe para filtrar…")
-        self.search.grid(row=1, column=0, sticky="ew", pady=(6, 12))
-        self.search.focus_set()
-
-        self.listbox = tk.Listbox(frame, height=18)
-        self.listbox.grid(row=2, column=0, sticky="nsew")
-        self.listbox.bind("<Double-Button-1>", lambda e: self._accept())
-        self.listbox.bind("<Return>", lambda e: self._accept())
-
-        btns = ctk.CTkFrame(frame, fg_color="transparent")
-        btns.grid(row=3, column=0, sticky="e", pady=(12, 0))
-        ctk.CTkButton(btns, text="Cancelar", width=120, command=self._cancel).pack(side="left", padx=(0, 8))
-        ctk.CTkButton(btns, text="Seleccionar", width=140, command=self._accept).pack(side="left")
-
-        self.search.bind("<KeyRelease>", self._filter)
-        self.bind("<Escape>", lambda e: self._cancel())
-
-        self._render_list()
-
-        self.update_idletasks()
-        self._center_over_master()
-        self.deiconify()
-
-    def _center_over_master(self):
-        try:
-            self.update_idletasks()
-            m = self.master
-            x = m.winfo_rootx() + (m.winfo_width() // 2) - (self.winfo_width() // 2)
-            y = m.winfo_rooty() + (m.winfo_height() // 2) - (self.winfo_height() // 2)
-            self.geometry(f"+{x}+{y}")
-        except Exception:
-            pass
-
-    def _render_list(self):
-        self.listbox.delete(0, "end")
-        for _id, label in self.items_view:
-            self.listbox.insert("end", label)
-        if self.items_view:
-            self.listbox.selection_set(0)
-            self.listbox.activate(0)
-
-    def _filter(self, _e=None):
-        q = (self.search.get() or "").strip().lower()
-        if not q:
-            self.items_view = self.items_all[:]
-        else:
-            self.items_view = [(i, t) for (i, t) in self.items_all if q in (t or "").lower()]
-        self._render_list()
-
-    def _cancel(self):
-        self.destroy()
-
-    def _accept(self):
-        sel = self.listbox.curselection()
-        if not sel:
-            return
-        idx = sel[0]
-        _id, label = self.items_view[idx]
-        if callable(self.on_selected):
-            self.on_selected(_id, label)
-        self.destroy()
-
 class FilterWindow(ctk.CTkToplevel):
     def __init__(self, master, initial=None, on_apply=None):
         super().__init__(master)
@@ -119,6 +37,9 @@ class FilterWindow(ctk.CTkToplevel):
 
         self.on_apply = on_apply
         initial = initial or {}
+
+        self.queries = QueryRunner(self)
+        self.bind("<Destroy>", lambda e: self.queries.close() if e.widget is self else None)
         self.fields = {}  # Entries de texto libre
 
         form = ctk.CTkFrame(self)
@@ -144,9 +65,8 @@ class FilterWindow(ctk.CTkToplevel):
         # ====== Fila 1: Autor ======
         ctk.CTkLabel(form, text="Autor").grid(row=1, column=0, sticky="w", padx=(0, 10), pady=6)
 
-        self.authors = get_all_authors()
-        author_values = self._unique([a.name for a in self.authors])
-        author_values = [AUTHOR_PH] + author_values
+        self.authors = []  # se rellenan en _load_lookups (segundo plano)
+        author_values = [AUTHOR_PH]
 
         self.author_var = ctk.StringVar(value=initial.get("author_name") or AUTHOR_PH)
 
@@ -176,9 +96,8 @@ class FilterWindow(ctk.CTkToplevel):
         # ====== Fila 2: Editorial ======
         ctk.CTkLabel(form, text="Editorial").grid(row=2, column=0, sticky="w", padx=(0, 10), pady=6)
 
-        self.publishers = get_all_publishers()
-        publisher_values = self._unique([p.name for p in self.publishers])
-        publisher_values = [PUBLISHER_PH] + publisher_values
+        self.publishers = []
+        publisher_values = [PUBLISHER_PH]
 
         self.publisher_var = ctk.StringVar(value=initial.get("publisher_name") or PUBLISHER_PH)
 
@@ -208,9 +127,8 @@ class FilterWindow(ctk.CTkToplevel):
         # ====== Fila 3: Tema ======
         ctk.CTkLabel(form, text="Tema").grid(row=3, column=0, sticky="w", padx=(0, 10), pady=6)
 
-        self.themes = get_all_themes()
-        theme_values = self._unique([t.name for t in self.themes])
-        theme_values = [THEME_PH] + theme_values
+        self.themes = []
+        theme_values = [THEME_PH]
 
         self.theme_var = ctk.StringVar(value=initial.get("theme_name") or THEME_PH)
 
@@ -240,9 +158,8 @@ class FilterWindow(ctk.CTkToplevel):
         # ====== Fila 4: Colección (filtrada por biblioteca) ======
         ctk.CTkLabel(form, text="Colección").grid(row=4, column=0, sticky="w", padx=(0, 10), pady=6)
 
-        self.collections = get_all_collections(self.library_id)
-        collection_values = self._unique([c.name for c in self.collections])
-        collection_values = [COLLECTION_PH] + collection_values
+        self.collections = []
+        collection_values = [COLLECTION_PH]
 
         self.collection_var = ctk.StringVar(value=initial.get("collection_name") or COLLECTION_PH)
 
@@ -331,6 +248,37 @@ class FilterWindow(ctk.CTkToplevel):
         self.deiconify()  
         self.fields["title"].focus_set()
 
+        self._load_lookups()
+
+    # ----------------- datos de los combos -----------------
+    def _load_lookups(self):
+        """Autores/editoriales/temas/colecciones: de la caché si están, si no en segundo plano."""
+        library_id = self.library_id
+
+        def load():
+            return (get_all_authors(), get_all_publishers(),
+                    get_all_themes(), get_all_collections(library_id))
+
+        cached = all(lookup_cache.is_fresh(t) for t in ("authors", "publishers", "themes")) \
+            and lookup_cache.is_fresh("collections", library_id)
+        if cached:
+            self._fill_lookups(load())
+        else:
+            self.queries.submit("lookups", load, on_done=self._fill_lookups,
+                                on_error=lambda e: messagebox.showerror(
+                                    "Error", f"No se pudieron cargar las listas.\n{e}", parent=self))
+
+    def _fill_lookups(self, data):
+        self.authors, self.publishers, self.themes, self.collections = data
+        for combo, items, ph in (
+            (self.author_combo, self.authors, AUTHOR_PH),
+            (self.publisher_combo, self.publishers, PUBLISHER_PH),
+            (self.theme_combo, self.themes, THEME_PH),
+            (self.collection_combo, self.collections, COLLECTION_PH),
+        ):
+            combo.configure(values=[ph] + self._unique([i.name for i in items]))
+            warm_picker([(i.id, i.name) for i in items])  # para el buscador 🔎
+
     # ----------------- helpers -----------------
     @staticmethod
     def _unique(values_iterable):
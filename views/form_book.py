@@ -1,16 +1,18 @@
 # views/form_book.py
 import customtkinter as ctk
-import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
 
 from controllers.book_controller import (
     get_all_authors, get_all_publishers, get_all_themes, get_all_collections,
-    get_all_locations, create_book, update_book, get_book,
+    get_all_locations, create_book, update_book, load_book_form,
 
     # funciones para los botones "+"
     create_author, create_publisher, create_theme, create_collection, create_location
 )
+from views.search_select_modal import SearchSelectModal
+from views.picker_index import warm_picker
+from views.search_combobox import ComboSearch
 
 # --- Placeholders (sentinelas) para combos ---
 AUTHOR_PH = "— Autor —"
@@ -19,91 +21,6 @@ THEME_PH = "— Tema —"
 LOCATION_PH = "— Ubicación —"
 COLLECTION_PH = "— Colección —"   # equivale a “ninguna”
 
-class SearchSelectModal(ctk.CTkToplevel):
-    """Modal genérico para buscar y seleccionar un item: items=[(id,label), ...]."""
-    def __init__(self, master, title: str, items, on_selected=None):
-        super().__init__(master)
-        self.withdraw()
-
-        self.title(title)
-        self.geometry("560x520")
-        self.resizable(False, False)
-        self.transient(master)
-        self.grab_set()
-        self.focus()
-
-        self.on_selected = on_selected
-        self.items_all = list(items)
-        self.items_view = self.items_all[:]
-
-        frame = ctk.CTkFrame(self)
-        frame.pack(fill="both", expand=True, padx=16, pady=16)
-        frame.grid_columnconfigure(0, weight=1)
-        frame.grid_rowconfigure(2, weight=1)
-
-        ctk.CTkLabel(frame, text="Buscar").grid(row=0, column=0, sticky="w")
-        self.search = ctk.CTkEntry(frame, placeholder_text="Escribe para filtrar…")
-        self.search.grid(row=1, column=0, sticky="ew", pady=(6, 12))
-        self.search.focus_set()
-
-        self.listbox = tk.Listbox(frame, height=18)
-        self.listbox.grid(row=2, column=0, sticky="nsew")
-        self.listbox.bind("<Double-Button-1>", lambda e: self._accept())
-        self.listbox.bind("<Return>", lambda e: self._accept())
-
-        btns = ctk.CTkFrame(frame, fg_color="transparent")
-        btns.grid(row=3, column=0, sticky="e", pady=(12, 0))
-        ctk.CTkButton(btns, text="Cancelar", width=120, command=self._cancel).pack(side="left", padx=(0, 8))
-        ctk.CTkButton(btns, text="Seleccionar", width=140, command=self._accept).pack(side="left")
-
-        self.search.bind("<KeyRelease>", self._filter)
-        self.bind("<Escape>", lambda e: self._cancel())
-
-        self._render_list()
-
-        self.update_idletasks()
-        self._center_over_master()
-        self.deiconify()
-
-    def _center_over_master(self):
-        try:
-            self.update_idletasks()
-            m = self.master
-            x = m.winfo_rootx() + (m.winfo_width() // 2) - (self.winfo_width() // 2)
-            y = m.winfo_rooty() + (m.winfo_height() // 2) - (self.winfo_height() // 2)
-            self.geometry(f"+{x}+{y}")
-        except Exception:
-            pass
-
-    def _render_list(self):
-        self.listbox.delete(0, "end")
-        for _id, label in self.items_view:
-            self.listbox.insert("end", label)
-        if self.items_view:
-            self.listbox.selection_set(0)
-            self.listbox.activate(0)
-
-    def _filter(self, _e=None):
-        q = (self.search.get() or "").strip().lower()
-        if not q:
-            self.items_view = self.items_all[:]
-        else:
-            self.items_view = [(i, t) for (i, t) in self.items_all if q in (t or "").lower()]
-        self._render_list()
-
-    def _cancel(self):
-        self.destroy()
-
-    def _accept(self):
-        sel = self.listbox.curselection()
-        if not sel:
-            return
-        idx = sel[0]
-        _id, label = self.items_view[idx]
-        if callable(self.on_selected):
-            self.on_selected(_id, label)
-        self.destroy()
-
 class SimpleCreateModal(ctk.CTkToplevel):
     """Modal genérico para crear entidades simples (solo 1 campo: name)."""
     def __init__(self, master, title: str, label: str, placeholder: str,
@@ -267,6 +184,7 @@ class LocationCreateModal(ctk.CTkToplevel):
 class FormBook(ctk.CTkToplevel):
     """
     Formulario para crear/editar libros.
+    on_saved(book_id) se llama tras guardar con el id del libro creado/editado.
     Uso:
       - Crear:  FormBook(self, on_saved=callback)
       - Editar: FormBook(self, on_saved=callback, mode="edit", book_id=123)  o  FormBook(self, on_saved=callback, mode="edit", book=book_obj)
@@ -281,7 +199,6 @@ class FormBook(ctk.CTkToplevel):
 
         self.on_saved = on_saved
         self.mode = mode
-        self.book = book or (get_book(book_id) if (mode == "edit" and book_id) else None)
 
         self.title("Editar libro" if self.mode == "edit" else "Nuevo libro")
         self.geometry("560x520")
@@ -304,8 +221,12 @@ class FormBook(ctk.CTkToplevel):
             self.destroy()
             return
 
-        # === Datos para combos ===
-        self._reload_combo_data()
+        # === Libro + datos para combos: una sola consulta (lo que no esté ya en caché) ===
+        wanted_id = book_id if (mode == "edit" and book_id and book is None) else None
+        data = load_book_form(self.library_id, wanted_id)
+        self.book = book or data.book
+        self._reload_combo_data(data=data)
+        self._combo_searches: list[ComboSearch] = []  # combos con búsqueda al teclear
 
         # === LAYOUT ===
         form = ctk.CTkFrame(self)
@@ -326,14 +247,15 @@ class FormBook(ctk.CTkToplevel):
 
         self.cb_autor = ttk.Combobox(
             form,
-            values=list(self.map_author.keys()),
-            state="readonly",          # ✅ vuelve a readonly (evita valores inválidos)
+            values=[],                 # los MAX_RESULTS primeros los pone ComboSearch
+            state="normal",            # editable: ComboSearch corrige los valores inválidos
             height=10,
             style="Dark.TCombobox",
         )
         self.cb_autor.set(AUTHOR_PH)
         self.cb_autor.grid(row=r, column=1, sticky="ew", pady=6)
         self._ttk_combo_apply_placeholder(self.cb_autor, AUTHOR_PH)
+        self._combo_attach_search(self.cb_autor, AUTHOR_PH, lambda: self._picker_items("author"))
 
         btns = ctk.CTkFrame(form, fg_color="transparent")
         btns.grid(row=r, column=2, sticky="e", padx=(10, 0), pady=6)
@@ -348,14 +270,15 @@ class FormBook(ctk.CTkToplevel):
 
         self.cb_pub = ttk.Combobox(
             form,
-            values=list(self.map_pub.keys()),
-            state="readonly",
+            values=[],
+            state="normal",
             height=10,
             style="Dark.TCombobox"
         )
         self.cb_pub.set(PUBLISHER_PH)
         self.cb_pub.grid(row=r, column=1, sticky="ew", pady=6)
         self._ttk_combo_apply_placeholder(self.cb_pub, PUBLISHER_PH)
+        self._combo_attach_search(self.cb_pub, PUBLISHER_PH, lambda: self._picker_items("pub"))
 
         btns = ctk.CTkFrame(form, fg_color="transparent")
         btns.grid(row=r, column=2, sticky="e", padx=(10, 0), pady=6)
@@ -392,14 +315,15 @@ class FormBook(ctk.CTkToplevel):
 
         self.cb_loc = ttk.Combobox(
             form,
-            values=list(self.map_loc.keys()),
-            state="readonly",
+            values=[],
+            state="normal",
             height=10,
             style="Dark.TCombobox"
         )
         self.cb_loc.set(LOCATION_PH)
         self.cb_loc.grid(row=r, column=1, sticky="ew", pady=6)
         self._ttk_combo_apply_placeholder(self.cb_loc, LOCATION_PH)
+        self._combo_attach_search(self.cb_loc, LOCATION_PH, lambda: self._picker_items("location"))
 
         btns = ctk.CTkFrame(form, fg_color="transparent")
         btns.grid(row=r, column=2, sticky="e", padx=(10, 0), pady=6)
@@ -459,32 +383,48 @@ class FormBook(ctk.CTkToplevel):
         self.title_entry.focus_set()
 
     # ---------- Combos: datos / refresh ----------
-    def _reload_combo_data(self):
-        self.authors = get_all_authors()
-        self.pubs = get_all_publishers()
-        self.thms = get_all_themes()
-
-        self.colls = get_all_collections(self.library_id)
-        self.locs = get_all_locations(self.library_id)
+    def _reload_combo_data(self, kinds=None, data=None):
+        """
+        Recarga los datos de los combos (por defecto todos).
+        kinds: subconjunto de ("author", "pub", "theme", "collection", "location").
+        Los get_all_* van por la caché de proceso: solo la tabla que cambió toca la BD.
+        data: BookFormData ya cargado (al abrir el formulario); se usan sus listas.
+        """
+        kinds = kinds or ("author", "pub", "theme", "collection", "location")
 
         def map_items(items):
             return {i.name: i.id for i in items}
 
-        self.map_author = {AUTHOR_PH: None, **map_items(self.authors)}
-        self.map_pub = {PUBLISHER_PH: None, **map_items(self.pubs)}
-        self.map_thm = {THEME_PH: None, **map_items(self.thms)}
-        self.map_coll = {COLLECTION_PH: None, **map_items(self.colls)}
-
-        loc_texts = [f"{l.place}/{l.furniture} ({l.module or '-'},{l.shelf or '-'})" for l in self.locs]
-        self.map_loc = {LOCATION_PH: None, **{t: l.id for t, l in zip(loc_texts, self.locs)}}
+        if "author" in kinds:
+            self.authors = data.authors if data else get_all_authors()
+            self.map_author = {AUTHOR_PH: None, **map_items(self.authors)}
+        if "pub" in kinds:
+            self.pubs = data.publishers if data else get_all_publishers()
+            self.map_pub = {PUBLISHER_PH: None, **map_items(self.pubs)}
+        if "theme" in kinds:
+            self.thms = data.themes if data else get_all_themes()
+            self.map_thm = {THEME_PH: None, **map_items(self.thms)}
+        if "collection" in kinds:
+            self.colls = data.collections if data else get_all_collections(self.library_id)
+            self.map_coll = {COLLECTION_PH: None, **map_items(self.colls)}
+        if "location" in kinds:
+            self.locs = data.locations if data else get_all_locations(self.library_id)
+            loc_texts = [f"{l.place}/{l.furniture} ({l.module or '-'},{l.shelf or '-'})" for l in self.locs]
+            self.map_loc = {LOCATION_PH: None, **{t: l.id for t, l in zip(loc_texts, self.locs)}}
+
+        # índices de los buscadores 🔎, en segundo plano
+        for kind in kinds:
+            warm_picker(self._picker_items(kind))
 
     def _refresh_and_select(self, kind: str, selected_id):
-        self._reload_combo_data()
+        # solo se recarga la tabla que acaba de recibir un elemento nuevo
+        self._reload_combo_data((kind,))
 
         # ✅ refresca caches del buscador
-        for cb in (self.cb_autor, self.cb_pub, self.cb_thm, self.cb_loc, self.cb_coll):
-            if hasattr(cb, "_refresh_all_values"):
-                cb._refresh_all_values()
+        combo = {"author": self.cb_autor, "pub": self.cb_pub, "theme": self.cb_thm,
+                 "location": self.cb_loc, "collection": self.cb_coll}.get(kind)
+        if combo is not None and hasattr(combo, "_refresh_all_values"):
+            combo._refresh_all_values()
 
         if kind == "author":
             self.cb_autor.configure(values=list(self.map_author.keys()))
@@ -564,63 +504,19 @@ class FormBook(ctk.CTkToplevel):
         )
 
     # ---------- Buscador dentro del ttk.Combobox ----------
-    def _combo_attach_search(self, combo: ttk.Combobox, placeholder: str, get_all_values_fn):
+    def _combo_attach_search(self, combo: ttk.Combobox, placeholder: str, items_fn):
         """
-        Combobox buscable:
+        Combobox buscable (views/search_combobox.py):
         - state="normal" (editable)
         - filtra values al teclear (sin forzar abrir el desplegable)
         - si sales con valor inválido -> placeholder
+        items_fn() -> [(id, texto)], los mismos que lista el buscador 🔎.
         """
-        def norm(s: str) -> str:
-            return (s or "").strip().lower()
-
-        def refresh_all_values():
-            combo._all_values = get_all_values_fn()
-            combo.configure(values=combo._all_values)
-
-        combo._refresh_all_values = refresh_all_values
-        refresh_all_values()
-
-        def do_filter(_event=None):
-            typed = combo.get()
-
-            # placeholder / vacío -> lista completa
-            q = norm(typed)
-            if not q or typed == placeholder:
-                combo.configure(values=combo._all_values)
-                self._ttk_combo_apply_placeholder(combo, placeholder)
-                return
-
-            # filtra (manteniendo placeholder arriba)
-            matches = [v for v in combo._all_values if v != placeholder and q in norm(v)]
-            combo.configure(values=[placeholder] + matches)
-            self._ttk_combo_apply_placeholder(combo, placeholder)
-
-        def on_focus_in(_e=None):
-            if combo.get() == placeholder:
-                combo.set("")
-                self._ttk_combo_apply_placeholder(combo, placeholder)
-
-        def on_focus_out(_e=None):
-            current = (combo.get() or "").strip()
-            if not current:
-                combo.set(placeholder)
-            else:
-                # si no es un valor válido, intenta match exacto case-insensitive
-                if current not in combo._all_values:
-                    cur_norm = norm(current)
-                    exact = next((v for v in combo._all_values if norm(v) == cur_norm), None)
-                    combo.set(exact if exact else placeholder)
-
-            self._ttk_combo_apply_placeholder(combo, placeholder)
-
-        # ✅ MUY IMPORTANTE: add="+" para NO romper bindings internos
-        combo.bind("<KeyRelease>", do_filter, add="+")
-        combo.bind("<FocusIn>", on_focus_in, add="+")
-        combo.bind("<FocusOut>", on_focus_out, add="+")
-        combo.bind("<<ComboboxSelected>>",
-                lambda e: self._ttk_combo_apply_placeholder(combo, placeholder),
-                add="+")
+        search = ComboSearch(combo, placeholder, items_fn,
+                             on_change=lambda: self._ttk_combo_apply_placeholder(combo, placeholder))
+        combo._refresh_all_values = search.reload
+        self._combo_searches.append(search)
+        return search
 
     # ---------- Helpers UI ----------
     def _center_over_master(self):
@@ -705,6 +601,10 @@ class FormBook(ctk.CTkToplevel):
             messagebox.showerror("Error", str(e))
             return
 
+        # lo tecleado en un combo buscable sin salir de él aún no está validado
+        for search in self._combo_searches:
+            search.commit()
+
         data = {
             "library_id": self.library_id,
             "title": title,
@@ -720,12 +620,13 @@ class FormBook(ctk.CTkToplevel):
         try:
             if self.mode == "edit" and self.book:
                 update_book(self.book.id, data)
+                book_id = self.book.id
                 messagebox.showinfo("Información", "Libro actualizado correctamente.")
             else:
-                create_book(data)
+                book_id = create_book(data)
                 messagebox.showinfo("Información", "Libro creado correctamente.")
             if callable(self.on_saved):
-                self.on_saved()
+                self.on_saved(book_id)  # solo este libro cambió
             self.destroy()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
@@ -741,11 +642,13 @@ class FormBook(ctk.CTkToplevel):
             borderwidth=0,
             relief="flat",
         )
+        # los combos con búsqueda son editables: mismos colores que los readonly
+        states = ("readonly", "focus", "!disabled")
         style.map(
             "Dark.TCombobox",
-            foreground=[("readonly", "#111111")],
-            fieldbackground=[("readonly", "#ffffff")],
-            background=[("readonly", "#ffffff")],
+            foreground=[(st, "#111111") for st in states],
+            fieldbackground=[(st, "#ffffff") for st in states],
+            background=[(st, "#ffffff") for st in states],
         )
 
         style.configure(
@@ -761,29 +664,29 @@ class FormBook(ctk.CTkToplevel):
         combo.set(text if text else placeholder)
         self._ttk_combo_apply_placeholder(combo, placeholder)
 
+    def _picker_items(self, kind: str) -> list[tuple]:
+        """[(id, texto)] que lista el buscador 🔎 de ese combo."""
+        if kind == "location":
+            return [(l.id, f"{l.place}/{l.furniture} ({l.module or '-'},{l.shelf or '-'})") for l in self.locs]
+        items = {"author": self.authors, "pub": self.pubs, "theme": self.thms, "collection": self.colls}[kind]
+        return [(i.id, i.name) for i in items]
+
     def _search_author(self):
-        items = [(a.id, a.name) for a in self.authors]
-        SearchSelectModal(self, "Buscar autor", items,
+        SearchSelectModal(self, "Buscar autor", self._picker_items("author"),
                         on_selected=lambda _id, label: self._set_combo_text(self.cb_autor, AUTHOR_PH, label))
 
     def _search_publisher(self):
-        items = [(p.id, p.name) for p in self.pubs]
-        SearchSelectModal(self, "Buscar editorial", items,
+        SearchSelectModal(self, "Buscar editorial", self._picker_items("pub"),
                         on_selected=lambda _id, label: self._set_combo_text(self.cb_pub, PUBLISHER_PH, label))
 
     def _search_theme(self):
-        items = [(t.id, t.name) for t in self.thms]
-        SearchSelectModal(self, "Buscar tema", items,
+        SearchSelectModal(self, "Buscar tema", self._picker_items("theme"),
                         on_selected=lambda _id, label: self._set_combo_text(self.cb_thm, THEME_PH, label))
 
     def _search_collection(self):
-        items = [(c.id, c.name) for c in self.colls]
-        SearchSelectModal(self, "Buscar colección", items,
+        SearchSelectModal(self, "Buscar colección", self._picker_items("collection"),
                         on_selected=lambda _id, label: self._set_combo_text(self.cb_coll, COLLECTION_PH, label))
 
     def _search_location(self):
-        def label_loc(l):
-            return f"{l.place}/{l.furniture} ({l.module or '-'},{l.shelf or '-'})"
-        items = [(l.id, label_loc(l)) for l in self.locs]
-        SearchSelectModal(self, "Buscar ubicación", items,
+        SearchSelectModal(self, "Buscar ubicación", self._picker_items("location"),
                         on_selected=lambda _id, label: self._set_combo_text(self.cb_loc, LOCATION_PH, label))
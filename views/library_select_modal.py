@@ -1,8 +1,21 @@
 # views/library_select_modal.py
 import customtkinter as ctk
 from tkinter import messagebox
-from sqlalchemy import text
-from database.db_config import SessionLocal
+from views.query_runner import QueryRunner
+from views import app_state, catalog_prefetch
+
+
+def fetch_libraries():
+    """[(id, name, code), ...] ordenadas por id."""
+    # imports aquí: SQLAlchemy tarda en cargar y el modal ya se ve mientras tanto
+    from sqlalchemy import text
+    from database.db_config import SessionLocal
+
+    with SessionLocal() as s:
+        rows = s.execute(
+            text("SELECT id, name, code FROM libraries ORDER BY id ASC")
+        ).fetchall()
+    return [(int(r[0]), str(r[1]), str(r[2])) for r in rows]
 
 
 class LibrarySelectModal(ctk.CTkToplevel):
@@ -35,8 +48,10 @@ class LibrarySelectModal(ctk.CTkToplevel):
         self.minsize(self._W, self._H)
         self.resizable(False, False)
 
-        # Cargar bibliotecas
-        self._libraries = self._fetch_libraries()
+        # Las bibliotecas llegan en segundo plano (primer acceso a la BD)
+        self._libraries = []
+        self.queries = QueryRunner(self)
+        self.bind("<Destroy>", self._on_destroy, add="+")
 
         # UI
         ctk.CTkLabel(
@@ -46,17 +61,14 @@ class LibrarySelectModal(ctk.CTkToplevel):
         ).pack(pady=(18, 8))
 
         self.var_choice = ctk.StringVar(value="")
+        # la biblioteca marcada se va precargando mientras el usuario decide
+        self.var_choice.trace_add("write", lambda *_: self._prefetch_choice())
 
-        options_frame = ctk.CTkFrame(self)
-        options_frame.pack(fill="x", padx=18, pady=(8, 10))
+        self._options_frame = ctk.CTkFrame(self)
+        self._options_frame.pack(fill="x", padx=18, pady=(8, 10))
 
-        for lib_id, name, code in self._libraries:
-            ctk.CTkRadioButton(
-                options_frame,
-                text=name,
-                value=str(lib_id),
-                variable=self.var_choice
-            ).pack(anchor="w", padx=14, pady=6)
+        self._lbl_loading = ctk.CTkLabel(self._options_frame, text="Cargando bibliotecas…")
+        self._lbl_loading.pack(anchor="w", padx=14, pady=6)
 
         btns = ctk.CTkFrame(self, fg_color="transparent")
         btns.pack(fill="x", padx=18, pady=(6, 14))
@@ -77,6 +89,9 @@ class LibrarySelectModal(ctk.CTkToplevel):
         self.lift()
         self.focus_force()
 
+        self.queries.submit("libraries", fetch_libraries,
+                            on_done=self._fill_libraries, on_error=self._on_fetch_error)
+
     # ------------------ Geometry helpers ------------------
 
     def _apply_geometry_centered(self):
@@ -95,12 +110,34 @@ class LibrarySelectModal(ctk.CTkToplevel):
 
     # ------------------ Data ------------------
 
-    def _fetch_libraries(self):
-        with SessionLocal() as s:
-            rows = s.execute(
-                text("SELECT id, name, code FROM libraries ORDER BY id ASC")
-            ).fetchall()
-        return [(int(r[0]), str(r[1]), str(r[2])) for r in rows]
+    def _fill_libraries(self, libraries):
+        self._libraries = libraries
+        self._lbl_loading.destroy()
+        for lib_id, name, code in libraries:
+            ctk.CTkRadioButton(
+                self._options_frame,
+                text=name,
+                value=str(lib_id),
+                variable=self.var_choice
+            ).pack(anchor="w", padx=14, pady=6)
+
+        # preseleccionar la última usada (y así empieza su precarga)
+        last = app_state.load_state().get("last_library_id")
+        if any(lib_id == last for lib_id, _, _ in libraries):
+            self.var_choice.set(str(last))
+
+    def _prefetch_choice(self):
+        choice = self.var_choice.get().strip()
+        if choice:
+            catalog_prefetch.prefetch(int(choice))
+
+    def _on_fetch_error(self, exc):
+        self._lbl_loading.configure(text="No se pudieron cargar las bibliotecas.")
+        messagebox.showerror("Error", f"No se pudo conectar con la base de datos.\n{exc}", parent=self)
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.queries.close()
 
     # ------------------ Actions ------------------
 
@@ -112,6 +149,7 @@ class LibrarySelectModal(ctk.CTkToplevel):
 
         lib_id = int(choice)
         lib_name = next((n for (i, n, c) in self._libraries if i == lib_id), f"Biblioteca {lib_id}")
+        app_state.save_state(last_library_id=lib_id)
 
         try:
             self.grab_release()
@@ -131,6 +169,7 @@ class LibrarySelectModal(ctk.CTkToplevel):
             self.grab_release()
         except Exception:
             pass
+        catalog_prefetch.discard()
 
         if self.mandatory:
             # Cierra la app entera (root / parent)
@@ -2,6 +2,7 @@
 import customtkinter as ctk
 from tkinter import ttk, messagebox
 from controllers.borrow_controller import list_loans, mark_returned
+from views.query_runner import QueryRunner
 
 
 class LoansWindow(ctk.CTkToplevel):
@@ -15,6 +16,9 @@ class LoansWindow(ctk.CTkToplevel):
         self.grab_set()
         self.focus()
 
+        self.queries = QueryRunner(self)
+        self.bind("<Destroy>", lambda e: self.queries.close() if e.widget is self else None)
+
         ctk.CTkLabel(self, text="Libros prestados", font=(
             "Segoe UI", 16, "bold")).pack(pady=(10, 0))
 
@@ -60,10 +64,14 @@ class LoansWindow(ctk.CTkToplevel):
         self._center_over_master()
 
     def _load(self):
-        for r in self.table.get_children():
-            self.table.delete(r)
+        # la consulta va en segundo plano; si se pide otra antes, esta se descarta
+        self.queries.submit("loans", list_loans, self.library_id,
+                            on_done=self._render, on_error=self._on_load_error)
+
+    def _render(self, loans):
+        self.table.delete(*self.table.get_children())
 
-        for borrow, book in list_loans(self.library_id):
+        for borrow, book in loans:
             title = book.title if book else "(desconocido)"
             person = borrow.name_person or "-"
             date_s = borrow.date_of_loan.isoformat() if borrow.date_of_loan else "-"
@@ -72,6 +80,9 @@ class LoansWindow(ctk.CTkToplevel):
             self.table.insert("", "end", iid=str(borrow.id),
                               values=(borrow.id, title, person, date_s, status, action))
 
+    def _on_load_error(self, exc):
+        messagebox.showerror("Error", f"No se pudieron cargar los préstamos.\n{exc}", parent=self)
+
     def _on_click_actions(self, event):
         # detectar si la columna clicada es 'actions'
         region = self.table.identify("region", event.x, event.y)
@@ -2,14 +2,58 @@
 import customtkinter as ctk
 import tkinter.font as tkfont
 from tkinter import ttk, messagebox
-from controllers.book_controller import list_books
+from controllers.book_controller import PAGE_SIZE, list_book_rows_page, count_books, book_change, catalog_stamp
+from controllers import catalog_index
 from views.filter_window import FilterWindow
+from views.query_runner import QueryRunner, run_in_background
+from views import catalog_prefetch, catalog_snapshots
+from views.catalog_snapshots import CatalogSnapshot
 
 
 class MainWindow(ctk.CTk):
-    def __init__(self, library_id: int, library_name: str):
+    """
+    Ventana principal.
+    paged=True  -> la tabla se carga por páginas (keyset) según avanza el scroll
+    paged=False -> carga completa con list_book_rows (comportamiento clásico)
+    """
+
+    # búsqueda rápida: espera tras la última tecla antes de filtrar (ms)
+    QUICK_SEARCH_DELAY_MS = 250
+    # filas cargadas hasta las que se refina en el hilo de Tk sin consultar
+    QUICK_REFINE_MAX_ROWS = 20_000
+
+    def __init__(self, library_id: int, library_name: str, paged: bool = True):
         super().__init__()
 
+        # --- modo paginado ---
+        self.paged = paged
+        self._page_cursor = None     # claves de orden del último libro cargado
+        self._all_loaded = True      # ¿ya no quedan páginas por pedir?
+        self._loading_page = False
+        self._total = 0
+
+        # valores de cada fila (iid -> values) y claves de orden por columna,
+        # para ordenar sin volver a leer la tabla desde Tcl
+        self._row_values: dict[str, tuple] = {}
+        self._key_columns: dict[str, dict[str, object]] = {}
+        self._dialect = None  # motor de la BD y cómo compara textos (catalog_index.fold_for)
+        self._fold = None
+
+        # catalog_stamp() del listado mostrado (None = no reutilizable) y último
+        # resumen de préstamos: es lo que se guarda en views/catalog_snapshots.py
+        self._stamp = None
+        self._loans = None
+
+        # catálogo columnar de la biblioteca (controllers/catalog_index.py) para
+        # filtrar sin consultar la BD, y resultado del último filtro resuelto así
+        self._filter_index = None
+        self._local_hits = None     # posiciones que cumplen el filtro (en _local_index)
+        self._local_index = None
+        self._local_skip: set[str] = set()  # libros editados desde entonces
+
+        # consultas en segundo plano (la UI no se congela con una BD lenta)
+        self.queries = QueryRunner(self)
+
         # --- biblioteca seleccionada ---
         self.current_library_id = library_id
         self.current_library_name = library_name
@@ -20,11 +64,20 @@ class MainWindow(ctk.CTk):
 
         self.bind("<F11>", self._toggle_fullscreen)  # alterna fullscreen real
         self.bind("<Escape>", self._exit_fullscreen)  # salir de fullscreen real
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         self.current_filters = {}
 
         ctk.CTkLabel(self, text="Libros", font=("Segoe UI", 18, "bold")).pack(pady=10)
 
+        # --- Búsqueda rápida por título (filtra según se escribe) ---
+        search = ctk.CTkFrame(self, fg_color="transparent")
+        search.pack(fill="x", padx=10)
+        self._quick_job = None
+        self.quick_entry = ctk.CTkEntry(search, width=320, placeholder_text="Buscar por título…")
+        self.quick_entry.pack(side="left")
+        self.quick_entry.bind("<KeyRelease>", self._on_quick_key)
+
         cont = ctk.CTkFrame(self)
         cont.pack(fill='both', expand=True, padx=10, pady=10)
 
@@ -70,8 +123,8 @@ class MainWindow(ctk.CTk):
                 self.table.column(col, width=150, stretch=True, anchor="w")
 
         # --- Scrollbar vertical ---
-        scrollbar = ttk.Scrollbar(cont, orient="vertical", command=self.table.yview)
-        self.table.configure(yscrollcommand=scrollbar.set)
+        self._scrollbar = scrollbar = ttk.Scrollbar(cont, orient="vertical", command=self.table.yview)
+        self.table.configure(yscrollcommand=self._on_table_scroll)
 
         self.table.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
@@ -85,6 +138,8 @@ class MainWindow(ctk.CTk):
 
         self.lbl_count = ctk.CTkLabel(btns, text="Libros: 0")
         self.lbl_count.pack(side="left")
+        self.lbl_loans = ctk.CTkLabel(btns, text="")
+        self.lbl_loans.pack(side="left", padx=(16, 0))
 
         # Botones a la derecha
         ctk.CTkButton(btns, text="Añadir libro", command=self.open_form).pack(side="right", padx=6)
@@ -94,7 +149,8 @@ class MainWindow(ctk.CTk):
         ctk.CTkButton(btns, text="Menú bibliotecas", command=self.open_library_menu).pack(side="right", padx=6)
 
         # Ahora sí: ya hay biblioteca seleccionada, refrescamos
-        self.refresh()
+        # (con la instantánea guardada o lo que LibrarySelectModal haya precargado)
+        self._show_library(library_id)
 
     def _start_maximized(self):
         try:
@@ -111,65 +167,253 @@ class MainWindow(ctk.CTk):
             self.attributes("-fullscreen", False)
 
     def refresh(self):
-        # Vaciar la tabla
-        for r in self.table.get_children():
-            self.table.delete(r)
+        # Vaciar la tabla (una sola llamada a Tcl)
+        self.table.delete(*self.table.get_children())
+        self.table.yview_moveto(0)
+        self._row_values.clear()
+        self._key_columns.clear()
+
+        # cualquier página pedida para el listado anterior ya no sirve
+        self.queries.cancel("page")
+        self.queries.cancel("count")
+        self.queries.cancel("stamp")
+        self._stamp = None
+        self._local_hits = self._local_index = None
+        self._local_skip = set()
+        self._page_cursor = None
+        self._all_loaded = False
+        self._loading_page = True  # hasta que llegue la primera página
+        self.lbl_count.configure(text="Libros: cargando…")
+
+        filters = dict(self.current_filters) if self.current_filters else None
+        library_id = self.current_library_id
+        order_by, desc = self._server_order()
+
+        # lo precargado solo vale para la vista por defecto de esa biblioteca
+        pre, self._prefetched = getattr(self, "_prefetched", None), None
+        if pre is not None and (pre.library_id != library_id or filters or order_by or not self.paged):
+            pre = None
+
+        if pre is None and filters and self._filter_locally(filters):
+            pass  # en memoria, sin consulta
+        elif pre is None:
+            self.queries.submit("catalog", catalog_prefetch.load_first_page,
+                                filters, library_id, order_by, desc, self.paged,
+                                on_done=self._on_catalog_loaded, on_error=self._on_query_error)
+        elif pre.catalog.done() and pre.catalog.exception() is None:
+            self._on_catalog_loaded(pre.catalog.result())  # ya está: pintar sin esperar
+        else:
+            self.queries.submit_future("catalog", pre.catalog,
+                                       on_done=self._on_catalog_loaded, on_error=self._on_query_error)
 
-        # ✅ filtrar por biblioteca
-        try:
-            rows = list_books(self.current_filters or None, library_id=self.current_library_id)
-        except TypeError:
-            rows = list_books(self.current_filters or None)
-
-        def val(obj, attr="name", default="-"):
-            return getattr(obj, attr) if obj else default
-
-        for b in rows:
-            author = val(b.author)
-            publisher = val(b.publisher)
-            theme = val(b.theme)
-            collection = val(b.collection)
-
-            # ubicación (cada parte puede ser None)
-            if b.location:
-                place = b.location.place or "-"
-                furniture = b.location.furniture or "-"
-                module = b.location.module or "-"
-                shelf = b.location.shelf
-                loc = f"{place}/{furniture}" + (f" ({module},{shelf})" if (module or shelf is not None) else "")
-            else:
-                loc = "-"
+        self._refresh_loans(pre.loans if pre is not None else None)
+
+    # ----- filtros en memoria (catalog_index) -----
+    def _ensure_filter_index(self):
+        """Construye en segundo plano el catálogo columnar de la biblioteca, si no está."""
+        if not catalog_index.AVAILABLE:
+            return
+        library_id, order = self.current_library_id, self._server_order()
+        idx = self._filter_index
+        if idx is not None and idx.library_id == library_id and idx.order == order:
+            return
+        if self.queries.is_busy("filter_index"):
+            return
 
-            pub_year = b.publication_year if b.publication_year is not None else ""
-            edi_year = b.edition_year if b.edition_year is not None else ""
+        def done(index):
+            if index is not None and index.library_id == self.current_library_id \
+                    and index.order == self._server_order():
+                self._filter_index = index
+
+        self.queries.submit("filter_index", catalog_index.load_catalog_index,
+                            library_id, *order, on_done=done, on_error=lambda e: None)
+
+    def _filter_locally(self, filters: dict) -> bool:
+        """
+        Resuelve el filtro con el catálogo en memoria en vez de con la BD (en
+        un hilo, como una consulta más: con 1M de libros un filtro por título
+        tarda unas décimas). False si el catálogo no sirve para este filtro.
+        El cursor de página pasa a ser la posición dentro de self._local_hits.
+        """
+        idx = self._filter_index
+        if idx is None or idx.library_id != self.current_library_id \
+                or idx.order != self._server_order() or not idx.supports(filters, idx.dialect):
+            return False
+
+        def done(result):
+            hits, rows = result
+            self._local_hits, self._local_index = hits, idx
+            cursor = len(rows) if len(rows) < len(hits) else None
+            self._on_catalog_loaded((len(hits), rows, cursor, idx.stamp))
+
+        self.queries.submit("catalog", idx.first_page, filters, PAGE_SIZE if self.paged else None,
+                            on_done=done, on_error=self._on_query_error)
+
+        # comprobar en segundo plano que la biblioteca no ha cambiado
+        def check(stamp):
+            if idx is self._filter_index and (stamp is None or stamp != idx.stamp):
+                self._filter_index = None
+                self.refresh()              # esta vez por SQL
+                self._ensure_filter_index()
+
+        self.queries.submit("stamp", catalog_stamp, idx.library_id, on_done=check, on_error=lambda e: None)
+        return True
+
+    def _on_catalog_loaded(self, result):
+        total, rows, cursor, stamp = result
+        self._insert_rows(rows)
+        self._page_cursor = cursor
+        self._all_loaded = cursor is None
+        self._loading_page = False
+        self._stamp = stamp
+        self._set_total(total)
+
+    def _on_query_error(self, exc):
+        self._loading_page = False
+        self.lbl_count.configure(text="Libros: -")
+        messagebox.showerror("Error", f"No se pudo cargar el catálogo.\n{exc}")
+
+    def _insert_rows(self, rows):
+        # rows: BookRow (controllers/book_rows.py), ya con la ubicación compuesta
+        for r in rows:
+            iid = str(r.id)
+            values = r.display_values()
+            self.table.insert("", "end", iid=iid, values=values)
+            self._remember_row(iid, values)
+
+    def _remember_row(self, iid: str, values: tuple):
+        self._row_values[iid] = values
+        for col, keys in self._key_columns.items():
+            keys[iid] = self._column_key(col, values)
+
+    def _forget_row(self, iid: str):
+        self._row_values.pop(iid, None)
+        for keys in self._key_columns.values():
+            keys.pop(iid, None)
+
+    # ----- paginación (modo paged) -----
+    def _load_next_page(self):
+        if self._all_loaded or self._loading_page:
+            return
+        if self._local_hits is not None:
+            start = self._page_cursor
+            end = start + PAGE_SIZE
+            rows = [r for r in self._local_index.rows_at(self._local_hits[start:end])
+                    if str(r.id) not in self._local_skip]
+            self._on_page_loaded((rows, end if end < len(self._local_hits) else None))
+            return
+        self._loading_page = True
+        order_by, desc = self._server_order()
+        self.queries.submit(
+            "page", list_book_rows_page,
+            self.current_filters or None,
+            library_id=self.current_library_id,
+            after=self._page_cursor,
+            order_by=order_by,
+            desc=desc,
+            on_done=self._on_page_loaded,
+            on_error=self._on_query_error,
+        )
 
-            self.table.insert(
-                "", "end",
-                iid=str(b.id),
-                values=(b.title, author, publisher, theme, loc,
-                        collection, pub_year, edi_year, "✏️  🗑️  📤")
-            )
+    def _on_page_loaded(self, result):
+        rows, cursor = result
+        self._insert_rows(rows)
+        self._page_cursor = cursor
+        self._all_loaded = cursor is None
+        self._loading_page = False
 
-        self.lbl_count.configure(text=f"Libros: {len(rows):,}".replace(",", "."))
+    def _on_table_scroll(self, first, last):
+        self._scrollbar.set(first, last)
+        # cerca del final -> pedir la siguiente página
+        if self.paged and not self._all_loaded and float(last) >= 0.9:
+            self._load_next_page()
 
     # ----- filters -----
     def open_filters(self):
+        self._ensure_filter_index()  # mientras se rellenan los filtros
         FilterWindow(self, initial=self.current_filters, on_apply=self.apply_filters)
 
     def apply_filters(self, new_filters: dict):
         self.current_filters = new_filters
+        self._set_quick_text(new_filters.get("title") or "")
         self.refresh()
+        self._ensure_filter_index()  # los siguientes filtros ya en memoria
 
     def clear_filters(self):
         self.current_filters = {}
+        self._set_quick_text("")
         self.refresh()
 
+    # ----- búsqueda rápida -----
+    def _set_quick_text(self, text: str):
+        self._cancel_quick_job()
+        self.quick_entry.delete(0, "end")
+        if text:
+            self.quick_entry.insert(0, text)
+
+    def _cancel_quick_job(self):
+        if self._quick_job is not None:
+            self.after_cancel(self._quick_job)
+            self._quick_job = None
+
+    def _on_quick_key(self, _evt=None):
+        # debounce: solo se filtra cuando se deja de teclear un momento
+        self._cancel_quick_job()
+        self._quick_job = self.after(self.QUICK_SEARCH_DELAY_MS, self._apply_quick_search)
+
+    def _apply_quick_search(self):
+        """El texto de búsqueda es el filtro "title" (el mismo campo que en FilterWindow)."""
+        self._quick_job = None
+        text = self.quick_entry.get().strip()
+        old = dict(self.current_filters)
+        new = dict(old)
+        if text:
+            new["title"] = text
+        else:
+            new.pop("title", None)
+        if new == old:
+            return
+
+        self.current_filters = new
+        if not self._refine_loaded(old, new):
+            self.refresh()  # cancela lo que estuviera en marcha para el texto anterior
+            self._ensure_filter_index()
+
+    def _refine_loaded(self, old: dict, new: dict) -> bool:
+        """
+        Si solo se ha alargado el título y la tabla ya tiene todos los libros
+        del filtro anterior, el resultado nuevo es un subconjunto de lo que se
+        ve: se quitan las filas que no encajan, sin consultar nada.
+        """
+        old_title, new_title = old.get("title") or "", new.get("title") or ""
+        if {k: v for k, v in old.items() if k != "title"} != {k: v for k, v in new.items() if k != "title"}:
+            return False
+        if not self._all_loaded or self._loading_page or len(self._row_values) > self.QUICK_REFINE_MAX_ROWS:
+            return False
+        if not catalog_index.CatalogIndex.supports(new, self._db_dialect()):
+            return False
+
+        fold = self._db_fold()  # igual que ILIKE en la BD
+        needle = fold(new_title)
+        if fold(old_title) not in needle:
+            return False
+
+        for tag in ("catalog", "page", "count"):
+            self.queries.cancel(tag)
+        gone = [iid for iid, values in self._row_values.items() if needle not in fold(values[0])]
+        if gone:
+            self.table.delete(*gone)
+            for iid in gone:
+                self._forget_row(iid)
+        self._set_total(len(self._row_values))
+        return True
+
     def open_form(self):
         from views.form_book import FormBook
         try:
-            FormBook(self, on_saved=self.refresh)
+            FormBook(self, on_saved=lambda book_id: self._on_book_saved(book_id, created=True))
         except TypeError:
-            FormBook(self, on_saved=self.refresh)
+            FormBook(self, on_saved=lambda book_id: self._on_book_saved(book_id, created=True))
 
     def _on_motion(self, event):
         region = self.table.identify("region", event.x, event.y)
@@ -240,9 +484,9 @@ class MainWindow(ctk.CTk):
             return
 
         try:
-            FormBook(self, on_saved=self.refresh, mode="edit", book_id=book_id)
+            FormBook(self, on_saved=self._on_book_saved, mode="edit", book_id=book_id)
         except TypeError:
-            FormBook(self, on_saved=self.refresh, mode="edit", book_id=book_id)
+            FormBook(self, on_saved=self._on_book_saved, mode="edit", book_id=book_id)
 
     def _open_loan_modal(self, row_id: str):
         from views.form_borrow import FormBorrow
@@ -256,7 +500,8 @@ class MainWindow(ctk.CTk):
         vals = item.get("values", [])
         book_title = vals[0] if vals else "(sin título)"
 
-        FormBorrow(self, book_id=book_id, book_title=book_title, on_saved=self.refresh)
+        FormBorrow(self, book_id=book_id, book_title=book_title,
+                   on_saved=lambda: self._on_book_saved(book_id, loan=True))
 
     def _confirm_delete(self, row_id: str):
         from controllers.book_controller import delete_book
@@ -279,9 +524,9 @@ class MainWindow(ctk.CTk):
             return
 
         try:
-            delete_book(book_id)
+            change = delete_book(book_id)
             messagebox.showinfo("Eliminado", f"El libro '{title}' ha sido eliminado.")
-            self.refresh()
+            self._apply_book_change(change)
         except ValueError as e:
             messagebox.showerror("Error", str(e))
 
@@ -293,38 +538,185 @@ class MainWindow(ctk.CTk):
             self._sort_state["asc"] = True
 
         asc = self._sort_state["asc"]
-        items = list(self.table.get_children())
+        if self._all_loaded and not self._loading_page:
+            # todo está en memoria: ordenar con las claves precalculadas
+            rank, reverse = self._rank(col, asc)
+            keys = self._key_column(col)
+            # empates por id, como la BD (sorted es estable también con reverse)
+            order = sorted(sorted(self._row_values, key=int), key=lambda iid: rank(keys[iid]), reverse=reverse)
+            self.table.set_children("", *order)
+        else:
+            # tabla incompleta: ordena la BD y se vuelve a paginar desde el principio
+            self.refresh()
 
-        def to_num(v):
+        for c in self.table["columns"]:
+            base = self._headers_txt[c]
+            if c == col:
+                arrow = " ▲" if asc else " ▼"
+                self.table.heading(c, text=base + arrow)
+            else:
+                self.table.heading(c, text=base)
+
+    def _server_order(self):
+        """(order_by, desc) para las consultas del listado según la columna elegida."""
+        if self._sort_state["col"] is None:
+            return None, False
+        return self._sort_state["col"], not self._sort_state["asc"]
+
+    def _column_key(self, col: str, values: tuple):
+        """Clave de orden (independiente de la dirección) de una fila para la columna col."""
+        col_index = self.table["columns"].index(col)
+        v = values[col_index] if col_index < len(values) else ""
+        if col in self._num_columns:
             if v in (None, ""):
-                return float("inf") if asc else float("-inf")
+                return None
             try:
                 return int(v)
             except (TypeError, ValueError):
                 try:
                     return int(float(v))
                 except Exception:
-                    return float("inf") if asc else float("-inf")
+                    return None
+        return self._db_fold()(str(v or ""))
+
+    def _db_dialect(self) -> str:
+        if self._dialect is None:
+            from database.db_config import get_engine
+            self._dialect = get_engine().dialect.name
+        return self._dialect
+
+    def _db_fold(self):
+        """Pliegue de textos con el que compara la BD (mayúsculas, acentos): mismo orden que ORDER BY."""
+        if self._fold is None:
+            self._fold = catalog_index.fold_for(self._db_dialect())
+        return self._fold
+
+    def _key_column(self, col: str) -> dict:
+        """Claves de orden de todas las filas para col; se calculan una vez por columna."""
+        keys = self._key_columns.get(col)
+        if keys is None:
+            keys = {iid: self._column_key(col, vals) for iid, vals in self._row_values.items()}
+            self._key_columns[col] = keys
+        return keys
+
+    def _rank(self, col: str, asc: bool):
+        """
+        (función, reverse) para ordenar claves de col en la dirección pedida.
+        Los años vacíos van siempre al final, igual que en la BD.
+        """
+        if col in self._num_columns:
+            if asc:
+                return (lambda k: (k is None, k or 0)), False
+            return (lambda k: (k is None, -(k or 0))), False
+        return (lambda k: k), not asc
+
+    # ----- cambios puntuales (crear / editar / borrar / prestar) -----
+    def _on_book_saved(self, book_id: int, created: bool = False, loan: bool = False):
+        """
+        Pide solo la fila de ese libro (con los filtros actuales) y la parchea.
+        loan=True: venía de un préstamo, así que cambia también el resumen de préstamos.
+        """
+        filters = dict(self.current_filters) if self.current_filters else None
+        library_id = self.current_library_id
+
+        def done(change):
+            # si mientras tanto cambiaron filtros o biblioteca, refresh() ya lo cubre
+            current = dict(self.current_filters) if self.current_filters else None
+            if current == filters and library_id == self.current_library_id:
+                self._apply_book_change(change, created=created)
+
+        if loan:
+            self._refresh_loans()
+
+        self.queries.submit(f"book:{book_id}", book_change, book_id, filters, library_id,
+                            on_done=done, on_error=self._on_query_error)
+
+    def _apply_book_change(self, change, created: bool = False):
+        """Inserta, actualiza o quita la fila de change.book_id en su posición ordenada."""
+        iid = str(change.book_id)
+        self._stamp = None  # la instantánea de esta biblioteca ya no vale
+        self._filter_index = None  # ni el catálogo en memoria
+        self._local_skip.add(iid)  # sus páginas pendientes lo traerían con los datos viejos
+        shown = self.table.exists(iid)
+        selected = shown and iid in self.table.selection()
+
+        # ¿contaba ya en el total? Si la tabla está incompleta y no se ve, no lo sabemos.
+        if shown:
+            was_counted = True
+        elif created or self._all_loaded:
+            was_counted = False
+        else:
+            was_counted = None
+
+        if shown:
+            self.table.delete(iid)
+            self._forget_row(iid)
+
+        if change.row is not None:
+            values = change.row.display_values()
+            pos = self._find_position(iid, values)
+            if pos is not None:
+                self.table.insert("", pos, iid=iid, values=values)
+                self._remember_row(iid, values)
+                if selected:
+                    self.table.selection_set(iid)
+
+        if was_counted is None:
+            self._refresh_count()
+        else:
+            self._set_total(self._total + (change.row is not None) - was_counted)
+
+    def _find_position(self, iid: str, values) -> int | None:
+        """
+        Índice donde insertar una fila según el orden actual (búsqueda binaria;
+        empates por id, como la BD). None si cae detrás de lo cargado y aún
+        quedan páginas: llegará con ellas.
+        """
+        col = self._sort_state["col"] or "title"
+        asc = self._sort_state["asc"] if self._sort_state["col"] else True
+        rank, reverse = self._rank(col, asc)
+        keys = self._key_column(col)
+        target = rank(self._column_key(col, values))
+
+        book_id = int(iid)
+        children = self.table.get_children()
+        lo, hi = 0, len(children)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k = rank(keys[children[mid]])
+            if k == target:
+                before = int(children[mid]) < book_id
+            else:
+                before = (k > target) if reverse else (k < target)
+            if before:
+                lo = mid + 1
+            else:
+                hi = mid
 
-        def key(item_id):
-            vals = self.table.item(item_id, "values")
-            col_index = self.table["columns"].index(col)
-            v = vals[col_index] if col_index < len(vals) else ""
-            if col in self._num_columns:
-                return to_num(v)
-            return (v or "").lower()
+        if lo == len(children) and not self._all_loaded:
+            return None
+        return lo
 
-        items.sort(key=key, reverse=not asc)
-        for idx, iid in enumerate(items):
-            self.table.move(iid, "", idx)
+    def _refresh_loans(self, future=None):
+        """Resumen de préstamos de la barra inferior (future: el precargado, si lo hay)."""
+        if future is not None:
+            self.queries.submit_future("loans", future, on_done=self._set_loans, on_error=lambda e: None)
+        else:
+            self.queries.submit("loans", catalog_prefetch.load_loan_summary, self.current_library_id,
+                                on_done=self._set_loans, on_error=lambda e: None)
 
-        for c in self.table["columns"]:
-            base = self._headers_txt[c]
-            if c == col:
-                arrow = " ▲" if asc else " ▼"
-                self.table.heading(c, text=base + arrow)
-            else:
-                self.table.heading(c, text=base)
+    def _set_loans(self, summary: dict):
+        self._loans = summary
+        self.lbl_loans.configure(text=f"Préstamos pendientes: {summary['pending']}")
+
+    def _set_total(self, total: int):
+        self._total = max(0, total)
+        self.lbl_count.configure(text=f"Libros: {self._total:,}".replace(",", "."))
+
+    def _refresh_count(self):
+        self.queries.submit("count", count_books,
+                            self.current_filters or None, library_id=self.current_library_id,
+                            on_done=self._set_total, on_error=self._on_query_error)
 
     def open_loans(self):
         from views.loans_window import LoansWindow
@@ -349,10 +741,14 @@ class MainWindow(ctk.CTk):
         def _on_destroy(_evt=None):
             self._library_modal_open = False
 
-        modal.bind("<Destroy>", _on_destroy)
+        modal.bind("<Destroy>", _on_destroy, add="+")
 
     def _on_library_selected(self, library_id: int, library_name: str):
         """Callback cuando el usuario elige biblioteca en el modal."""
+        # lo que se estaba viendo queda en memoria por si se vuelve
+        if library_id != self.current_library_id:
+            self._save_snapshot()
+
         self.current_library_id = library_id
         self.current_library_name = library_name
 
@@ -360,5 +756,143 @@ class MainWindow(ctk.CTk):
 
         # recomendado: limpiar filtros al cambiar de biblioteca
         self.current_filters = {}
+        self._set_quick_text("")
+        self._filter_index = None
+
+        self._show_library(library_id)
+
+    def _show_library(self, library_id: int):
+        """Pinta la biblioteca: desde su instantánea si la hay (memoria o disco), si no, de la BD."""
+        self._prefetched = catalog_prefetch.take(library_id)
+        snap = catalog_snapshots.snapshots.pop(library_id)
+        if snap is not None:
+            self._show_snapshot(snap)
+            return
+
+        # la del disco se lee (y descomprime) en segundo plano, como una consulta
+        self.table.delete(*self.table.get_children())
+        self._row_values, self._key_columns = {}, {}
+        self._stamp = None
+        self._loading_page = True
+        self.lbl_count.configure(text="Libros: cargando…")
+
+        def done(snap):
+            if library_id == self.current_library_id:
+                self._show_snapshot(snap)
+
+        self.queries.submit("catalog", catalog_snapshots.read_snapshot, library_id,
+                            on_done=done, on_error=lambda e: done(None))
 
-        self.refresh()
\ No newline at end of file
+    def _show_snapshot(self, snap: CatalogSnapshot | None):
+        if snap is not None and snap.order == self._server_order() and not self.current_filters:
+            self._prefetched = None  # la instantánea es más completa
+            self._restore_snapshot(snap)
+        else:
+            self.refresh()
+
+    def _on_close(self):
+        self._save_snapshot(wait=True)
+        self.queries.close()
+        self.destroy()
+
+    # ----- instantáneas por biblioteca -----
+    def _save_snapshot(self, wait: bool = False):
+        """
+        Guarda el catálogo sin filtros que se ve ahora (si terminó de cargar):
+        en la LRU de memoria y en disco, para el próximo arranque.
+        wait=True escribe el fichero en este hilo (al cerrar la app).
+        """
+        if self.current_filters or self._stamp is None or self._loading_page:
+            return
+        snap = CatalogSnapshot(
+            self.current_library_id, self._server_order(), self._stamp,
+            self.table.get_children(), self._row_values, self._key_columns,
+            self._page_cursor, self._all_loaded, self._total, self._loans,
+        )
+        rows = snap.frozen_rows()  # copia: el hilo de escritura no toca los dicts
+        if wait:
+            catalog_snapshots.write_snapshot(snap, rows)
+            return
+        run_in_background(catalog_snapshots.write_snapshot, snap, rows)
+        catalog_snapshots.snapshots.put(snap)
+        # los dicts pasan a la instantánea: refresh() no debe vaciarlos
+        self._row_values = {}
+        self._key_columns = {}
+
+    def _restore_snapshot(self, snap: CatalogSnapshot):
+        """Pinta la instantánea al momento y comprueba en segundo plano si sigue al día."""
+        for tag in ("page", "count", "catalog", "stamp"):
+            self.queries.cancel(tag)
+        self.table.delete(*self.table.get_children())
+        self.table.yview_moveto(0)
+
+        self._row_values = snap.values
+        self._key_columns = snap.key_columns
+        for iid in snap.iids:
+            self.table.insert("", "end", iid=iid, values=snap.values[iid])
+
+        self._page_cursor = snap.cursor
+        self._all_loaded = snap.all_loaded
+        self._loading_page = False
+        self._stamp = snap.stamp
+        self._set_total(snap.total)
+        if snap.loans is not None:
+            self._set_loans(snap.loans)
+        else:
+            self._refresh_loans()
+
+        self._revalidate(len(snap.iids))  # los préstamos también cambian el stamp
+
+    def _revalidate(self, loaded: int):
+        """
+        Si otro puesto (o un import) tocó la biblioteca desde self._stamp,
+        relee de la BD el tramo ya pintado (y una página más) y aplica solo las
+        diferencias: la tabla no se vacía ni pierde el scroll o la selección.
+        Si no, se queda en la consulta del stamp.
+        """
+        order_by, desc = self._server_order()
+        self.queries.cancel("page")
+        self._loading_page = True  # el cursor actual se puede sustituir
+        self.queries.submit("catalog", catalog_prefetch.revalidate_first_page,
+                            self.current_library_id, self._stamp, order_by, desc, self.paged,
+                            loaded + PAGE_SIZE,
+                            on_done=self._on_catalog_revalidated, on_error=self._on_query_error)
+
+    def _on_catalog_revalidated(self, result):
+        if result is None:  # sigue igual que lo pintado
+            self._loading_page = False
+            return
+        if self._stamp is None or self.current_filters:
+            # mientras tanto se editó algo aquí o se filtró: lo leído ya no sirve
+            self.refresh()
+            return
+        total, rows, cursor, stamp = result
+
+        fresh = [(str(r.id), r.display_values()) for r in rows]
+        keep = {iid for iid, _ in fresh}
+        gone = [iid for iid in self._row_values if iid not in keep]
+        if gone:
+            self.table.delete(*gone)
+            for iid in gone:
+                self._forget_row(iid)
+
+        for iid, values in fresh:
+            old = self._row_values.get(iid)
+            if old is None:
+                self.table.insert("", "end", iid=iid, values=values)
+            elif old != values:
+                self.table.item(iid, values=values)
+            else:
+                continue
+            self._remember_row(iid, values)
+
+        order = [iid for iid, _ in fresh]
+        if list(self.table.get_children()) != order:
+            self.table.set_children("", *order)  # reordenar en una sola llamada
+
+        self._page_cursor = cursor
+        self._all_loaded = cursor is None
+        self._loading_page = False
+        self._stamp = stamp
+        self._set_total(total)
+        self._refresh_loans()  # el stamp cambió: quizá también los préstamos
\ No newline at end of file
@@ -0,0 +1,124 @@
+# views/picker_index.py
+"""
+Índice de búsqueda para los selectores (SearchSelectModal): autores,
+editoriales, temas, colecciones, ubicaciones... que pueden ser decenas de miles.
+
+- Las etiquetas se pliegan una vez (minúsculas y sin acentos: "garcia"
+  encuentra "García") y se indexan por trigramas.
+- Una búsqueda de 3+ letras parte de la lista de candidatos más corta de sus
+  trigramas y solo comprueba esos; con 1-2 letras se recorre todo.
+- Si la búsqueda solo se alarga (se sigue escribiendo), se parte de los
+  resultados anteriores.
+- El índice se construye en segundo plano y se guarda por dataset: quien
+  carga las listas (FilterWindow, FormBook) llama a warm_picker() y, al abrir
+  el selector, normalmente ya está hecho.
+"""
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+
+from controllers.catalog_index import fold_ci
+from views.query_runner import run_in_background
+
+_N = 3  # longitud de los n-gramas
+_CACHE_SIZE = 8
+
+
+class PickerIndex:
+    """items=[(id, label), ...]; search() devuelve posiciones en items (mismo orden)."""
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.labels = [fold_ci(label or "") for _id, label in self.items]
+
+        grams = defaultdict(list)
+        for i, text in enumerate(self.labels):
+            for g in {text[k:k + _N] for k in range(len(text) - _N + 1)}:
+                grams[g].append(i)  # en orden creciente: las listas salen ya ordenadas
+        self._grams = dict(grams)
+        self._last = ("", None)  # (búsqueda plegada, posiciones)
+
+        # por prefijo: etiquetas plegadas ordenadas (búsqueda binaria)
+        self._sorted_pos = sorted(range(len(self.labels)), key=self.labels.__getitem__)
+        self._sorted_labels = [self.labels[i] for i in self._sorted_pos]
+        self._exact: dict[str, int] = {}
+        for i, text in enumerate(self.labels):
+            self._exact.setdefault(text.strip(), i)
+
+    def __len__(self):
+        return len(self.items)
+
+    def search(self, query: str) -> list[int]:
+        q = fold_ci((query or "").strip())
+        if not q:
+            return list(range(len(self.items)))
+
+        candidates = range(len(self.items))
+        last_q, last_hits = self._last
+        if last_q and last_q in q:
+            candidates = last_hits
+        if len(q) >= _N:
+            shortest = min((self._grams.get(q[k:k + _N], ()) for k in range(len(q) - _N + 1)), key=len)
+            if len(shortest) < len(candidates):
+                candidates = shortest
+
+        labels = self.labels
+        hits = [i for i in candidates if q in labels[i]]
+        self._last = (q, hits)
+        return hits
+
+    def find_exact(self, text: str) -> int | None:
+        """Posición del item cuya etiqueta es text (sin mayúsculas ni acentos), o None."""
+        return self._exact.get(fold_ci((text or "").strip()))
+
+    def ranked(self, query: str, limit: int) -> list[int]:
+        """
+        Hasta limit posiciones: primero las que empiezan por query (orden
+        alfabético) y después las que solo la contienen (orden original).
+        """
+        q = fold_ci((query or "").strip())
+        if not q:
+            return list(range(min(limit, len(self.items))))
+
+        out = []
+        keys = self._sorted_labels
+        k = bisect_left(keys, q)
+        while k < len(keys) and len(out) < limit and keys[k].startswith(q):
+            out.append(self._sorted_pos[k])
+            k += 1
+        if len(out) < limit:
+            first = set(out)
+            for i in self.search(query):
+                if i not in first:
+                    out.append(i)
+                    if len(out) >= limit:
+                        break
+        return out
+
+
+_cache: OrderedDict[tuple, Future] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def picker_index(items) -> Future:
+    """
+    Future -> PickerIndex de items. Si ya se pidió para los mismos datos se
+    reutiliza (hecho o en marcha); si no, se construye en el pool de consultas.
+    """
+    key = tuple(items)
+    with _cache_lock:
+        future = _cache.get(key)
+        if future is None:
+            future = _cache[key] = run_in_background(PickerIndex, key)
+            while len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+        else:
+            _cache.move_to_end(key)
+    return future
+
+
+def warm_picker(items):
+    """Empieza a construir el índice de items para cuando se abra su selector."""
+    if items:
+        picker_index(items)
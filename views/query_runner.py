@@ -0,0 +1,147 @@
+# views/query_runner.py
+"""
+Ejecuta consultas fuera del hilo de Tk y devuelve el resultado a la UI.
+
+- Las funciones se ejecutan en un pool de hilos compartido. Cada controller
+  abre su propia SessionLocal() por llamada, así que cada hilo trabaja con
+  su sesión (las sesiones nunca cruzan de hilo).
+- Los resultados vuelven por una cola que se vacía con widget.after() desde
+  el hilo de Tk; los callbacks siempre corren en el hilo de la UI.
+- Cada petición va asociada a una clave (la "vista": "catalog", "loans"...).
+  Si se lanza otra petición con la misma clave, la anterior se cancela si
+  aún no empezó y, si ya estaba en marcha, su resultado se descarta.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_POOL_SIZE = 4
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=_POOL_SIZE, thread_name_prefix="query")
+        return _pool
+
+
+def run_in_background(fn, *args, **kwargs):
+    """Lanza fn en el pool compartido y devuelve el Future (sin pasar por Tk)."""
+    return _get_pool().submit(fn, *args, **kwargs)
+
+
+class QueryRunner:
+    def __init__(self, widget, poll_ms: int = 25):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._results = queue.Queue()
+        self._generation: dict[str, int] = {}
+        self._futures: dict[str, object] = {}
+        self._polling = False
+        self._closed = False
+
+    # ------------------ API ------------------
+
+    def submit(self, key: str, fn, *args, on_done=None, on_error=None, **kwargs):
+        """
+        Lanza fn(*args, **kwargs) en segundo plano.
+        on_done(resultado) / on_error(excepción) se llaman en el hilo de Tk,
+        y solo si esta sigue siendo la petición más reciente de `key`.
+        """
+        if self._closed:
+            return
+        gen = self._generation.get(key, 0) + 1
+        self._generation[key] = gen
+
+        old = self._futures.pop(key, None)
+        if old is not None:
+            old.cancel()  # si ya había empezado, su resultado se ignorará
+
+        def job():
+            try:
+                self._results.put((key, gen, True, fn(*args, **kwargs), on_done, on_error))
+            except Exception as e:
+                self._results.put((key, gen, False, e, on_done, on_error))
+
+        self._futures[key] = _get_pool().submit(job)
+        self._ensure_polling()
+
+    def submit_future(self, key: str, future, on_done=None, on_error=None):
+        """
+        Como submit, pero con un Future ya lanzado (p. ej. lo precargado): su
+        resultado se entrega al terminar, sin ocupar otro hilo del pool esperándolo.
+        """
+        if self._closed:
+            return
+        gen = self._generation.get(key, 0) + 1
+        self._generation[key] = gen
+
+        old = self._futures.pop(key, None)
+        if old is not None:
+            old.cancel()
+
+        def deliver(f):
+            if f.cancelled():
+                return
+            exc = f.exception()
+            if exc is None:
+                self._results.put((key, gen, True, f.result(), on_done, on_error))
+            else:
+                self._results.put((key, gen, False, exc, on_done, on_error))
+
+        self._futures[key] = future
+        future.add_done_callback(deliver)
+        self._ensure_polling()
+
+    def cancel(self, key: str):
+        """Descarta la petición en curso de `key` (si la hay)."""
+        self._generation[key] = self._generation.get(key, 0) + 1
+        old = self._futures.pop(key, None)
+        if old is not None:
+            old.cancel()
+
+    def is_busy(self, key: str) -> bool:
+        return key in self._futures
+
+    def close(self):
+        """Cancela todo; los resultados que lleguen después se descartan."""
+        self._closed = True
+        for key in list(self._futures):
+            self.cancel(key)
+
+    # ------------------ entrega en el hilo de Tk ------------------
+
+    def _ensure_polling(self):
+        if not self._polling and not self._closed:
+            self._polling = True
+            try:
+                self.widget.after(self.poll_ms, self._poll)
+            except Exception:
+                self._polling = False  # widget destruido
+
+    def _poll(self):
+        self._polling = False
+        if self._closed:
+            return
+        try:
+            while True:
+                try:
+                    key, gen, ok, value, on_done, on_error = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if self._generation.get(key) != gen:
+                    continue  # hay una petición más nueva para esta vista
+                self._futures.pop(key, None)
+                if ok:
+                    if callable(on_done):
+                        on_done(value)
+                elif callable(on_error):
+                    on_error(value)
+                else:
+                    raise value
+        finally:
+            if self._futures:
+                self._ensure_polling()
@@ -0,0 +1,105 @@
+# views/search_combobox.py
+"""
+Búsqueda al teclear para un ttk.Combobox editable con muchos valores
+(autores, editoriales, ubicaciones: decenas de miles).
+
+- Espera DELAY_MS tras la última tecla (debounce) antes de filtrar.
+- Busca con el PickerIndex del mismo dataset que el buscador 🔎 (compartido y
+  construido en segundo plano): primero los que empiezan por lo escrito,
+  luego los que lo contienen; en el desplegable solo van los MAX_RESULTS
+  primeros (también sin texto: no se cargan decenas de miles en el combo).
+- Al salir (o al guardar, con commit()) un texto que no es un valor exacto se
+  corrige al valor que coincide sin mayúsculas ni acentos, o al placeholder.
+"""
+from controllers.catalog_index import fold_ci
+from views.picker_index import picker_index
+
+
+class ComboSearch:
+    MAX_RESULTS = 50
+    DELAY_MS = 150
+
+    def __init__(self, combo, placeholder: str, items_fn, on_change=None):
+        """
+        items_fn() -> [(id, texto)] con los valores del combo (sin placeholder).
+        on_change(): se llama cada vez que cambia el texto (estilo de placeholder...).
+        """
+        self.combo = combo
+        self.placeholder = placeholder
+        self.items_fn = items_fn
+        self.on_change = on_change or (lambda: None)
+        self._job = None
+        self._filtered = False
+        self.reload()
+
+        # ✅ MUY IMPORTANTE: add="+" para NO romper bindings internos
+        combo.bind("<KeyRelease>", self._on_key, add="+")
+        combo.bind("<FocusIn>", self._on_focus_in, add="+")
+        combo.bind("<FocusOut>", lambda e: self.commit(), add="+")
+        combo.bind("<<ComboboxSelected>>", lambda e: self.on_change(), add="+")
+
+    def reload(self):
+        """Vuelve a leer los valores (p. ej. tras crear uno nuevo con "+")."""
+        self.items = list(self.items_fn())
+        self.values = {label for _id, label in self.items}
+        self._index = picker_index(self.items)
+        self._show_all()
+
+    def _show_all(self):
+        """Sin texto: los MAX_RESULTS primeros (ranked("") sin esperar a que el índice esté listo)."""
+        index = self.index
+        if index is not None:
+            top = index.ranked("", self.MAX_RESULTS)
+        else:
+            top = range(min(self.MAX_RESULTS, len(self.items)))
+        self._show([self.placeholder] + list(dict.fromkeys(self.items[i][1] for i in top)))
+        self._filtered = False
+
+    def _show(self, values):
+        self.combo.configure(values=values)
+
+    @property
+    def index(self):
+        return self._index.result() if self._index.done() else None
+
+    # ----- eventos -----
+    def _on_key(self, _e=None):
+        if self._job is not None:
+            self.combo.after_cancel(self._job)
+        self._job = self.combo.after(self.DELAY_MS, self._filter)
+
+    def _filter(self):
+        self._job = None
+        typed = self.combo.get()
+        if not typed.strip() or typed == self.placeholder:
+            if self._filtered:  # lista inicial solo si estaba filtrada
+                self._show_all()
+        elif (index := self.index) is not None:
+            top = index.ranked(typed, self.MAX_RESULTS)
+            self._show([self.placeholder] + list(dict.fromkeys(self.items[i][1] for i in top)))
+            self._filtered = True
+        self.on_change()
+
+    def _on_focus_in(self, _e=None):
+        if self.combo.get() == self.placeholder:
+            self.combo.set("")
+            self.on_change()
+
+    def commit(self):
+        """Deja en el combo un valor válido (o el placeholder)."""
+        if self._job is not None:
+            self.combo.after_cancel(self._job)
+            self._job = None
+        current = (self.combo.get() or "").strip()
+        if not current:
+            self.combo.set(self.placeholder)
+        elif current not in self.values and current != self.placeholder:
+            index = self.index
+            if index is not None:
+                pos = index.find_exact(current)
+            else:  # índice aún construyéndose: recorrido lineal, sin esperarlo en el hilo de Tk
+                key = fold_ci(current)
+                pos = next((i for i, (_id, label) in enumerate(self.items)
+                            if fold_ci(label or "").strip() == key), None)
+            self.combo.set(self.items[pos][1] if pos is not None else self.placeholder)
+        self.on_change()
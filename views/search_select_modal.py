@@ -0,0 +1,131 @@
+# views/search_select_modal.py
+import customtkinter as ctk
+import tkinter as tk
+
+from views.picker_index import picker_index
+
+
+class SearchSelectModal(ctk.CTkToplevel):
+    """
+    Modal genérico para buscar y seleccionar un item: items=[(id,label), ...].
+    La búsqueda va contra un PickerIndex (views/picker_index.py) y la lista
+    solo pinta los resultados por tandas de RENDER_CHUNK, según se hace scroll.
+    Si el índice aún se está construyendo, se ve la lista completa y lo
+    escrito se aplica en cuanto está listo.
+    """
+
+    RENDER_CHUNK = 200
+
+    def __init__(self, master, title: str, items, on_selected=None):
+        super().__init__(master)
+        self.withdraw()
+
+        self.title(title)
+        self.geometry("560x520")
+        self.resizable(False, False)
+        self.transient(master)
+        self.grab_set()
+        self.focus()
+
+        self.on_selected = on_selected
+        self.items = list(items)
+        self.matches = list(range(len(self.items)))  # posiciones en items
+        self._rendered = 0
+        self.index = None
+        self._index_future = picker_index(self.items)
+
+        frame = ctk.CTkFrame(self)
+        frame.pack(fill="both", expand=True, padx=16, pady=16)
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_rowconfigure(2, weight=1)
+
+        ctk.CTkLabel(frame, text="Buscar").grid(row=0, column=0, sticky="w")
+        self.search = ctk.CTkEntry(frame, placeholder_text="Escribe para filtrar…")
+        self.search.grid(row=1, column=0, sticky="ew", pady=(6, 12))
+        self.search.focus_set()
+
+        self.listbox = tk.Listbox(frame, height=18)
+        self.listbox.grid(row=2, column=0, sticky="nsew")
+        self.listbox.bind("<Double-Button-1>", lambda e: self._accept())
+        self.listbox.bind("<Return>", lambda e: self._accept())
+        self.listbox.configure(yscrollcommand=self._on_list_scroll)
+
+        self.lbl_count = ctk.CTkLabel(frame, text="")
+        self.lbl_count.grid(row=3, column=0, sticky="w", pady=(6, 0))
+
+        btns = ctk.CTkFrame(frame, fg_color="transparent")
+        btns.grid(row=4, column=0, sticky="e", pady=(12, 0))
+        ctk.CTkButton(btns, text="Cancelar", width=120, command=self._cancel).pack(side="left", padx=(0, 8))
+        ctk.CTkButton(btns, text="Seleccionar", width=140, command=self._accept).pack(side="left")
+
+        self.search.bind("<KeyRelease>", self._filter)
+        self.bind("<Escape>", lambda e: self._cancel())
+
+        self._render_list()
+        self._wait_index()
+
+        self.update_idletasks()
+        self._center_over_master()
+        self.deiconify()
+
+    def _wait_index(self):
+        if not self._index_future.done():
+            self.after(50, self._wait_index)
+            return
+        if self._index_future.exception() is None:
+            self.index = self._index_future.result()
+            self._filter()
+
+    def _center_over_master(self):
+        try:
+            self.update_idletasks()
+            m = self.master
+            x = m.winfo_rootx() + (m.winfo_width() // 2) - (self.winfo_width() // 2)
+            y = m.winfo_rooty() + (m.winfo_height() // 2) - (self.winfo_height() // 2)
+            self.geometry(f"+{x}+{y}")
+        except Exception:
+            pass
+
+    def _render_list(self):
+        self.listbox.delete(0, "end")
+        self._rendered = 0
+        self._render_more()
+        if self.matches:
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+        total = len(self.matches)
+        self.lbl_count.configure(text=f"{total:,} resultado(s)".replace(",", ".") if total != len(self.items) else "")
+
+    def _render_more(self):
+        """Añade la siguiente tanda de resultados a la lista (una sola llamada a Tcl)."""
+        chunk = self.matches[self._rendered:self._rendered + self.RENDER_CHUNK]
+        if chunk:
+            items = self.items
+            self.listbox.insert("end", *[items[i][1] for i in chunk])
+            self._rendered += len(chunk)
+
+    def _on_list_scroll(self, first, last):
+        # cerca del final -> pintar más
+        if float(last) >= 0.9 and self._rendered < len(self.matches):
+            self._render_more()
+
+    def _filter(self, _e=None):
+        if self.index is None:
+            return  # _wait_index lo aplicará
+        matches = self.index.search(self.search.get())
+        if matches == self.matches:
+            return  # teclas que no cambian nada (flechas, mayúsculas...)
+        self.matches = matches
+        self._render_list()
+
+    def _cancel(self):
+        self.destroy()
+
+    def _accept(self):
+        sel = self.listbox.curselection()
+        if not sel:
+            return
+        _id, label = self.items[self.matches[sel[0]]]
+        if callable(self.on_selected):
+            self.on_selected(_id, label)
+        self.destroy()